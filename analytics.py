@@ -0,0 +1,181 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from quote_log import LOG_DIR, segment_paths
+
+# 세그먼트 하나에서 읽는 컬럼 (나머지 컬럼은 디스크에서 읽지 않는다)
+SCAN_COLUMNS = [
+    "logged_at", "board_type", "device_type", "store_device_count",
+    "use_shinhan", "use_tanggua", "use_internet_new", "use_internet_kt",
+    "custom_commission", "per_device_tax_excluded",
+]
+GROUP_KEYS = ["month", "board_type", "device_type", "store_device_count"]
+# 합계 컬럼 (옵션은 선택 건수)
+SUM_COLUMNS = ["quotes", "shinhan", "tanggua", "internet_new", "internet_kt", "custom", "per_device_sum"]
+# 처음 읽는 세그먼트를 동시에 읽을 스레드 수
+SCAN_THREADS = min(8, os.cpu_count() or 1)
+OPTION_NAMES = {"shinhan": "신한 주거래", "tanggua": "땡겨요", "internet_new": "인터넷 신규", "internet_kt": "기존 KT 인터넷"}
+
+
+def _month_key(value):
+    return value.year * 100 + value.month
+
+
+def month_label(key):
+    return f"{key // 100}-{key % 100:02d}"
+
+
+# 세그먼트 하나의 월 범위 - 파일 끝의 통계(행 그룹별 최소/최대)만 읽는다
+def _month_range(path):
+    metadata = pq.ParquetFile(path, memory_map=True).metadata
+    column = metadata.schema.to_arrow_schema().get_field_index("logged_at")
+    low = high = None
+    for group in range(metadata.num_row_groups):
+        statistics = metadata.row_group(group).column(column).statistics
+        if statistics is None or not statistics.has_min_max:
+            return None
+        low = statistics.min if low is None else min(low, statistics.min)
+        high = statistics.max if high is None else max(high, statistics.max)
+    if low is None:
+        return None
+    return _month_key(low), _month_key(high)
+
+
+# 세그먼트 하나의 부분 집계 (월 × 알림판 × 결제방식 × 테이블 수 별 건수/합계)
+# 부분 집계끼리 더하면 전체 집계가 된다
+def _aggregate(path):
+    table = pq.read_table(path, columns=SCAN_COLUMNS, memory_map=True)
+    logged_at = table["logged_at"]
+    use_internet_new = table["use_internet_new"]
+
+    def count(mask):
+        return pc.cast(mask, pa.int64())
+
+    frame = pa.table({
+        "month": pc.add(pc.multiply(pc.year(logged_at), 100), pc.month(logged_at)),
+        "board_type": table["board_type"],
+        "device_type": table["device_type"],
+        "store_device_count": table["store_device_count"],
+        "shinhan": count(table["use_shinhan"]),
+        "tanggua": count(table["use_tanggua"]),
+        "internet_new": count(use_internet_new),
+        # 인터넷 신규는 기존 KT 를 포함하므로 기존 KT 만 선택한 건수
+        "internet_kt": count(pc.and_(table["use_internet_kt"], pc.invert(use_internet_new))),
+        "custom": count(pc.is_valid(table["custom_commission"])),
+        "per_device_sum": table["per_device_tax_excluded"],
+    })
+    groups = frame.group_by(GROUP_KEYS).aggregate(
+        [("shinhan", "count")] + [(name, "sum") for name in SUM_COLUMNS[1:]]
+    ).to_pandas()
+    groups.columns = [{"shinhan_count": "quotes"}.get(name, name.removesuffix("_sum")) for name in groups.columns]
+    return groups
+
+
+_lock = threading.Lock()
+# 경로 → ((수정 시각, 크기), 월 범위, 부분 집계 또는 None)
+_segments = {}
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+# 세그먼트별 캐시 항목 (바뀐 파일만 다시 읽는다)
+def _segment(path, load):
+    stamp = _stamp(path)
+    with _lock:
+        entry = _segments.get(path)
+    if entry is None or entry[0] != stamp:
+        entry = (stamp, _month_range(path), None)
+    if load and entry[2] is None:
+        entry = (stamp, entry[1], _aggregate(path))
+    with _lock:
+        _segments[path] = entry
+    return entry
+
+
+# 압축 도중 지워진 파일은 None
+def _load(path):
+    try:
+        return _segment(path, load=True)[2]
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def _live_segments(directory):
+    paths = segment_paths(directory)
+    # 압축 등으로 사라진 세그먼트는 캐시에서 뺀다
+    with _lock:
+        for path in set(_segments) - set(paths):
+            del _segments[path]
+    entries = []
+    for path in paths:
+        try:
+            entries.append((path,) + _segment(path, load=False))
+        except (OSError, pa.ArrowInvalid):
+            # 압축 도중 지워진 파일
+            continue
+    return entries
+
+
+# 기록에 있는 월 목록
+def available_months(directory=LOG_DIR):
+    months = set()
+    for _, _, month_range, _ in _live_segments(directory):
+        if month_range is not None:
+            months.update(range(month_range[0], month_range[1] + 1))
+    # 해가 바뀌는 범위에서 생기는 202613 같은 값은 제외
+    return sorted(month for month in months if 1 <= month % 100 <= 12)
+
+
+# 기간/알림판/결제방식 조건의 월별 집계와 테이블 수 분포
+# 기간 밖의 세그먼트는 파일 통계만 보고 건너뛴다
+def summarize(directory=LOG_DIR, start=None, end=None, board_type=None, device_type=None):
+    selected = [
+        (path, aggregates) for path, _, month_range, aggregates in _live_segments(directory)
+        if month_range is None or not ((start is not None and month_range[1] < start)
+                                       or (end is not None and month_range[0] > end))
+    ]
+    # 처음 읽는 세그먼트는 스레드로 나눠 읽는다 (pyarrow 는 읽기/집계 중 GIL 을 놓는다)
+    missing = [path for path, aggregates in selected if aggregates is None]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(SCAN_THREADS, len(missing))) as executor:
+            loaded = dict(zip(missing, executor.map(_load, missing)))
+        selected = [(path, aggregates if aggregates is not None else loaded[path]) for path, aggregates in selected]
+    frames = [aggregates for _, aggregates in selected if aggregates is not None]
+    if not frames:
+        return None
+
+    groups = pd.concat(frames, ignore_index=True)
+    mask = pd.Series(True, index=groups.index)
+    if start is not None:
+        mask &= groups["month"] >= start
+    if end is not None:
+        mask &= groups["month"] <= end
+    if board_type is not None:
+        mask &= groups["board_type"] == board_type
+    if device_type is not None:
+        mask &= groups["device_type"] == device_type
+    groups = groups[mask]
+    if groups.empty:
+        return None
+
+    monthly = groups.groupby("month")[SUM_COLUMNS].sum()
+    devices = groups.groupby("store_device_count")["quotes"].sum()
+    monthly["average_devices"] = (groups["store_device_count"] * groups["quotes"]).groupby(groups["month"]).sum() / monthly["quotes"]
+    monthly["average_per_device"] = monthly["per_device_sum"] / monthly["quotes"]
+    for name in OPTION_NAMES:
+        monthly[f"{name}_rate"] = monthly[name] / monthly["quotes"]
+    return {"monthly": monthly, "devices": devices, "quotes": int(monthly["quotes"].sum())}
+
+
+def clear_cache():
+    with _lock:
+        _segments.clear()
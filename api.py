@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+
+import numpy as np
+import tornado.web
+
+from config_store import config_version, load_config
+from metrics import registry as metrics_registry
+from policies import get_policy_store, parse_date
+from pricing import BOARD_KEYS, DEVICE_KEYS, INPUT_COLUMNS, quote_arrays
+from quote_table import get_quote
+
+API_PORT = int(os.environ.get("HIORDER_API_PORT", "8502"))
+
+# 이 건수를 넘는 일괄 계산은 별도 스레드에서 실행해 이벤트 루프를 막지 않는다
+BATCH_EXECUTOR_THRESHOLD = 5000
+MAX_BATCH_SIZE = 100000
+
+BOOL_FIELDS = ["use_shinhan", "use_tanggua", "use_internet_new", "use_internet_kt"]
+
+
+API_REQUEST_SECONDS = metrics_registry.histogram(
+    "hiorder_api_request_seconds", "API 요청 처리 시간", labels=("handler", "status"))
+
+
+class QuoteInputError(ValueError):
+    pass
+
+
+def _parse_bool(value, name):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.lower() in ("true", "false", "1", "0"):
+        return value.lower() in ("true", "1")
+    raise QuoteInputError(f"{name} 값이 올바르지 않습니다: {value!r}")
+
+
+# 요청 한 건 → calculate_quote 인자
+def parse_quote_request(data):
+    if not isinstance(data, dict):
+        raise QuoteInputError("견적 요청은 JSON 객체여야 합니다.")
+    unknown = set(data) - set(INPUT_COLUMNS)
+    if unknown:
+        raise QuoteInputError(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+
+    try:
+        store_device_count = int(data["store_device_count"])
+    except KeyError:
+        raise QuoteInputError("store_device_count 는 필수입니다.")
+    except (TypeError, ValueError):
+        raise QuoteInputError(f"store_device_count 값이 올바르지 않습니다: {data['store_device_count']!r}")
+    if store_device_count < 1:
+        raise QuoteInputError("store_device_count 는 1 이상이어야 합니다.")
+
+    board_type = data.get("board_type", INPUT_COLUMNS["board_type"])
+    if board_type not in BOARD_KEYS:
+        raise QuoteInputError(f"board_type 값이 올바르지 않습니다: {board_type!r}")
+    device_type = data.get("device_type", INPUT_COLUMNS["device_type"])
+    if device_type not in DEVICE_KEYS:
+        raise QuoteInputError(f"device_type 값이 올바르지 않습니다: {device_type!r}")
+
+    args = {
+        "store_device_count": store_device_count,
+        "board_type": board_type,
+        "device_type": device_type,
+    }
+    for name in BOOL_FIELDS:
+        args[name] = _parse_bool(data.get(name, False), name)
+
+    custom_commission = data.get("custom_commission")
+    if custom_commission is not None:
+        try:
+            custom_commission = int(custom_commission)
+        except (TypeError, ValueError):
+            raise QuoteInputError(f"custom_commission 값이 올바르지 않습니다: {custom_commission!r}")
+        if custom_commission < 0:
+            raise QuoteInputError("custom_commission 은 0 이상이어야 합니다.")
+    args["custom_commission"] = custom_commission
+    return args
+
+
+# policy_date → 그 날짜에 적용되는 정책 (지정하지 않으면 None = 현재 설정)
+def resolve_policy(value):
+    if value is None:
+        return None
+    try:
+        date = parse_date(value)
+    except (TypeError, ValueError):
+        raise QuoteInputError(f"policy_date 값이 올바르지 않습니다: {value!r}")
+    policy = get_policy_store().effective(date)
+    if policy is None:
+        raise QuoteInputError(f"{date.isoformat()} 에 적용되는 정책이 없습니다.")
+    return policy
+
+
+def policy_info(policy):
+    return {"id": policy.id, "label": policy.label, "effective_from": policy.effective_from.isoformat()}
+
+
+# 요청 여러 건 → quote_arrays 입력 배열
+def parse_batch_request(items):
+    if not isinstance(items, list):
+        raise QuoteInputError("quotes 는 배열이어야 합니다.")
+    if len(items) > MAX_BATCH_SIZE:
+        raise QuoteInputError(f"한 번에 최대 {MAX_BATCH_SIZE:,}건까지 계산할 수 있습니다.")
+
+    rows = []
+    for i, item in enumerate(items):
+        try:
+            rows.append(parse_quote_request(item))
+        except QuoteInputError as e:
+            raise QuoteInputError(f"{i}번째 견적: {e}")
+
+    inputs = {name: [row[name] for row in rows] for name in INPUT_COLUMNS if name != "custom_commission"}
+    inputs["custom_commission"] = [np.nan if row["custom_commission"] is None else row["custom_commission"] for row in rows]
+    return {name: np.asarray(values) for name, values in inputs.items()}
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def set_default_headers(self):
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+
+    def write_json(self, payload, status=200):
+        self.set_status(status)
+        self.finish(json.dumps(payload, ensure_ascii=False))
+
+    def json_body(self):
+        try:
+            return json.loads(self.request.body or b"null")
+        except ValueError:
+            raise QuoteInputError("요청 본문이 올바른 JSON 이 아닙니다.")
+
+    def write_error(self, status_code, **kwargs):
+        self.finish(json.dumps({"error": self._reason}, ensure_ascii=False))
+
+    def on_finish(self):
+        API_REQUEST_SECONDS.observe(self.request.request_time(), handler=type(self).__name__, status=self.get_status())
+
+
+class QuoteHandler(BaseHandler):
+    def _quote(self, data):
+        policy = None
+        try:
+            if isinstance(data, dict) and "policy_date" in data:
+                data = dict(data)
+                policy = resolve_policy(data.pop("policy_date"))
+            args = parse_quote_request(data)
+        except QuoteInputError as e:
+            return self.write_json({"error": str(e)}, status=400)
+        if policy is not None:
+            return self.write_json({"policy": policy_info(policy), "quote": policy.quote(**args)})
+        config = load_config()
+        quote = get_quote(config=config, **args)
+        self.write_json({"config_version": config_version(), "quote": quote})
+
+    # GET /quote?store_device_count=10&use_shinhan=true (&policy_date=2026-03-01)
+    async def get(self):
+        self._quote({name: self.get_query_argument(name) for name in self.request.query_arguments})
+
+    # POST /quote {"store_device_count": 10, ...}
+    async def post(self):
+        try:
+            data = self.json_body()
+        except QuoteInputError as e:
+            return self.write_json({"error": str(e)}, status=400)
+        self._quote(data)
+
+
+class BatchQuoteHandler(BaseHandler):
+    # POST /quote/batch {"quotes": [{...}, ...], "format": "rows" | "columns", "policy_date": "2026-03-01"}
+    async def post(self):
+        try:
+            data = self.json_body()
+            if not isinstance(data, dict):
+                raise QuoteInputError("요청 본문은 JSON 객체여야 합니다.")
+            output_format = data.get("format", "rows")
+            if output_format not in ("rows", "columns"):
+                raise QuoteInputError(f"format 값이 올바르지 않습니다: {output_format!r}")
+            inputs = parse_batch_request(data.get("quotes"))
+            policy = resolve_policy(data.get("policy_date"))
+        except QuoteInputError as e:
+            return self.write_json({"error": str(e)}, status=400)
+
+        if policy is None:
+            config = load_config()
+            version = config_version()
+        else:
+            config = policy.config
+        if len(inputs["store_device_count"]) > BATCH_EXECUTOR_THRESHOLD:
+            result = await asyncio.get_running_loop().run_in_executor(None, quote_arrays, inputs, config)
+        else:
+            result = quote_arrays(inputs, config)
+
+        columns = {name: values.tolist() for name, values in result.items()}
+        if policy is None:
+            payload = {"config_version": version, "count": len(inputs["store_device_count"])}
+        else:
+            payload = {"policy": policy_info(policy), "count": len(inputs["store_device_count"])}
+        if output_format == "columns":
+            payload["columns"] = columns
+        else:
+            payload["quotes"] = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        self.write_json(payload)
+
+
+# Prometheus 수집용 (GET /metrics)
+class MetricsHandler(BaseHandler):
+    def set_default_headers(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+
+    async def get(self):
+        self.finish(metrics_registry.render())
+
+
+class HealthHandler(BaseHandler):
+    async def get(self):
+        self.write_json({"status": "ok", "config_version": config_version()})
+
+
+def make_app():
+    return tornado.web.Application([
+        (r"/quote", QuoteHandler),
+        (r"/quote/batch", BatchQuoteHandler),
+        (r"/health", HealthHandler),
+        (r"/metrics", MetricsHandler),
+    ])
+
+
+async def main():
+    # 첫 요청 전에 설정과 견적표를 미리 준비
+    load_config()
+    app = make_app()
+    app.listen(API_PORT, address=os.environ.get("HIORDER_API_ADDRESS", "0.0.0.0"))
+    print(f"하이오더 견적 API: http://localhost:{API_PORT}/quote")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,196 +1,487 @@
+import datetime
+import time
+
 import streamlit as st
-import json
-import math
-import pandas as pd
 
-# 설정 파일 로드
-def load_config():
-    with open('config.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+from config_store import config_version, load_config, save_config, thaw
+from fragments import begin_run, fragment, rerun_tags
+from impact import impact_summary, recent_quotes, representative_inputs
+from metrics import RERUN_SECONDS, start_exporters
+from profiling import profiled
+from policies import apply_due_policy, get_policy_store, policy_label
+from pricing import commission_sweep
+from quote_cache import cache as quote_cache, normalize_inputs
+from quote_log import log_quote
+from quote_table import current_table
+from schedule import DEFAULT_TERM, DISCOUNT_RATE, contract_totals
+from sessions import quote_result, registry
+from static_assets import stylesheet_html
+from tiers import compile_tiers, config_tiers
+
+# 입력 조각이 바꾸는 세션 키
+INPUT_KEYS = ("board_type", "device_type", "store_device_count", "use_shinhan", "use_tanggua", "use_internet_new", "use_internet_kt")
+
+# 현재 브라우저 세션 ID (스크립트 실행 문맥이 없으면 "local")
+def current_session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+# 스타일시트/폰트는 static/ 의 정적 파일 (static_assets.py 참고)
+def apply_custom_css():
+    st.markdown(stylesheet_html(), unsafe_allow_html=True)
+
+
+# 입력값 변경 감지 함수
+def on_input_change():
+    if st.session_state.calculation_done:
+        st.session_state.input_changed = True
 
-def save_config(config):
-    with open('config.json', 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
 
-# 수수료 계산 함수
-def calculate_commission(total_devices, config, use_shinhan, use_internet_new, use_internet_kt, use_tanggua=False):
-    commission = 0
-    
-    # 기본 수수료
-    commission += total_devices * (config['commission']['basic1'] + config['commission']['basic2'])
-    
-    # 구간별 추가 수수료
-    if 5 <= total_devices <= 9:
-        commission += config['commission']['range']['5-9']
-    elif 10 <= total_devices <= 19:
-        commission += config['commission']['range']['10-19']
-    elif 20 <= total_devices <= 29:
-        commission += config['commission']['range']['20-29']
-    elif total_devices >= 30:
-        commission += config['commission']['range']['30+']
+# 현재 세션의 계산 결과 (조각만 다시 실행될 때도 유휴 정리 시각을 갱신)
+def session_result():
+    session_id = current_session_id()
+    registry.touch(session_id)
+    return registry.result(session_id)
+
+
+# 입력 (위젯을 바꾸면 이 조각만 다시 실행, 계산하기를 누르면 결과 조각까지 전체를 다시 실행)
+@fragment(*INPUT_KEYS, "input_changed")
+def input_section():
+    config = load_config()
+    session_id = current_session_id()
+    
+    # 알림판 선택
+    st.subheader("알림판 선택 (필수)")
+    board_type = st.radio(
+        "알림판 크기를 선택하세요:",
+        ["15인치", "10인치"],
+        format_func=lambda x: f"{x} (월 `{config['prices']['board']['inch'+x[:2]]:,}`원)",
+        horizontal=True,
+        index=0 if st.session_state.board_type == "15인치" else 1,
+        key="board_type_radio",
+        on_change=on_input_change
+    )
+    st.session_state.board_type = board_type
+    
+    st.caption(f"선택된 기기: **{board_type}** (월 `{config['prices']['board']['inch'+board_type[:2]]:,}`원)")
+    
+    st.markdown("---")
+    
+    # 입력값 변경 감지 시 경고 메시지 표시
+    if st.session_state.input_changed:
+        st.warning("⚠️ 입력값이 변경되었습니다. 변경된 값으로 다시 계산하려면 '계산하기' 버튼을 눌러주세요.")
+    
+    # 매장용 기기 종류
+    st.subheader("결제방식 선택")
+    device_type = st.radio(
+        "결제방식을 선택하세요:",
+        ["후불형", "선불형"],
+        format_func=lambda x: f"{x} (월 `{config['prices']['store_device']['normal' if x=='후불형' else 'calc']['monthly']:,}`원)",
+        horizontal=True,
+        index=0 if st.session_state.device_type == "후불형" else 1,
+        key="device_type_radio",
+        on_change=on_input_change
+    )
+    st.session_state.device_type = device_type
+    
+    device_key = "normal" if device_type == "후불형" else "calc"
+    
+    st.caption(f"선택된 결제방식: **{device_type}** (월 `{config['prices']['store_device'][device_key]['monthly']:,}`원)")
+    
+    st.markdown("---")
+    
+    # 매장용 기기 개수
+    st.subheader("테이블 개수")
+    store_device_count = st.number_input(
+        "테이블 수량을 입력하세요:",
+        min_value=1,
+        value=st.session_state.store_device_count,
+        step=1,
+        key="store_device_count_input",
+        on_change=on_input_change
+    )
+    st.session_state.store_device_count = store_device_count
+    
+    st.markdown("---")
     
     # 신한은행 주거래 통장
-    if use_shinhan:
-        commission += config['commission']['shinhan_bonus']
+    st.subheader("신한은행 주거래 통장")
+    use_shinhan = st.checkbox(
+        f"**신한은행 주거래 통장** 사용 (수수료 +`{config['commission']['shinhan_bonus']:,}`원)",
+        value=st.session_state.use_shinhan,
+        key="use_shinhan_checkbox",
+        on_change=on_input_change
+    )
+    st.session_state.use_shinhan = use_shinhan
+    
+    use_tanggua = st.checkbox(
+        f"**땡겨요어플설치** (수수료 +`{config['commission']['tanggua_bonus']:,}`원)",
+        value=st.session_state.use_tanggua,
+        key="use_tanggua_checkbox",
+        on_change=on_input_change
+    )
+    st.session_state.use_tanggua = use_tanggua
     
-    # 땡겨요 어플 설치
-    if use_tanggua:
-        commission += config['commission']['tanggua_bonus']
+    st.markdown("---")
+    
+    # 인터넷 관련 체크박스
+    st.subheader("인터넷 결합")
+    
+    internet_kt_fee = config['commission']['internet_kt']
+    internet_new_fee = config['commission']['internet_new']
+    monthly_discount = config['internet']['monthly_discount']
+    
+    use_internet_new = st.checkbox(
+        f"**인터넷 신규** 신청 (수수료 +`{internet_new_fee:,}`원, 월 `{monthly_discount:,}`원 할인)",
+        value=st.session_state.use_internet_new,
+        key="use_internet_new_checkbox",
+        on_change=on_input_change
+    )
+    st.session_state.use_internet_new = use_internet_new
+    
+    use_internet_kt = st.checkbox(
+        f"**기존 KT 인터넷** 사용 (으랏차차 패키지 +`{internet_kt_fee:,}`원, 월 `{monthly_discount:,}`원 할인)",
+        value=use_internet_new or st.session_state.use_internet_kt,
+        disabled=use_internet_new,
+        key="use_internet_kt_checkbox",
+        on_change=on_input_change
+    )
+    st.session_state.use_internet_kt = use_internet_kt
     
-    # 인터넷 신규/기존KT 수수료
     if use_internet_new:
-        commission += config['commission']['internet_new'] + config['commission']['internet_kt']
-    elif use_internet_kt:
-        commission += config['commission']['internet_kt']
+        st.caption(f"👆 인터넷 신규 신청 시 으랏차차 패키지(`{internet_kt_fee:,}`원)가 자동으로 포함됩니다.")
+    
+    st.markdown("---")
     
-    return commission
+    # 계산하기 버튼
+    if st.button("계산하기", type="primary", use_container_width=True):
+        # 입력값 변경 플래그 초기화
+        st.session_state.input_changed = False
+        
+        # 견적 계산 (같은 입력값/설정 버전이면 다른 세션과 결과 객체를 공유)
+        started = time.perf_counter()
+        result = quote_result({
+            "store_device_count": store_device_count,
+            "board_type": board_type,
+            "device_type": device_type,
+            "use_shinhan": use_shinhan,
+            "use_tanggua": use_tanggua,
+            "use_internet_new": use_internet_new,
+            "use_internet_kt": use_internet_kt
+        }, config, config_version())
+        elapsed = time.perf_counter() - started
+        registry.store(session_id, result)
+        recent_quotes.record(result.inputs)
+        log_quote(result, session_id, elapsed)
+        st.session_state.calculation_done = True
+        st.session_state.custom_commission_amount = result.commission  # 기본값 설정
+        st.session_state.calculation_count += 1
 
-def apply_custom_css():
-    st.markdown("""
-        <link rel="stylesheet" as="style" crossorigin href="https://cdn.jsdelivr.net/gh/orioncactus/pretendard@v1.3.9/dist/web/static/pretendard.min.css" />
-        <style>
-            /* 기본 폰트 설정 */
-            * {
-                font-family: 'Pretendard', -apple-system, BlinkMacSystemFont, system-ui, Roboto, sans-serif !important;
-            }
-            
-            /* 마크다운 헤더 크기 및 마진 조정 */
-            .stMarkdown h1 {
-                font-size: 1.8em !important;
-                font-weight: 700 !important;
-                margin: 0.5em 0 !important;
-            }
-            
-            .stMarkdown h2 {
-                font-size: 1.5em !important;
-                font-weight: 600 !important;
-                margin: 0.4em 0 !important;
-            }
-            
-            .stMarkdown h3 {
-                font-size: 1.2em !important;
-                font-weight: 600 !important;
-                margin: 0.3em 0 !important;
-            }
-            
-            /* 강조 색상 설정 */
-            .stMarkdown a, 
-            .stMarkdown strong,
-            .stMarkdown em {
-                color: rgb(0, 113, 255) !important;
-            }
-            
-            /* 버든 버튼 기본 스타일 (button과 download_button 모두 포함) */
-            .stButton button,
-            .stDownloadButton button {
-                background-color: rgb(0, 113, 255) !important;
-                color: white !important;
-                border: none !important;
-                padding: 0.5rem 1rem !important;
-                border-radius: 4px !important;
-                transition: all 0.3s ease !important;
-            }
-            
-            /* 버튼 호버 효과 */
-            .stButton button:hover,
-            .stDownloadButton button:hover {
-                background-color: rgb(0, 90, 204) !important;
-                color: white !important;
-                border: none !important;
-            }
-            
-            /* 사이드바 버튼 특별 스타일 */
-            .sidebar .stButton button {
-                width: 100% !important;
-                text-align: left !important;
-                background-color: transparent !important;
-                color: rgb(0, 113, 255) !important;
-                border: 1px solid rgb(0, 113, 255) !important;
-                margin-bottom: 0.2rem !important;
-            }
-            
-            /* 사이드바 버튼 호버 효과 */
-            .sidebar .stButton button:hover {
-                background-color: rgba(0, 113, 255, 0.1) !important;
-                color: rgb(0, 113, 255) !important;
-            }
-            
-            /* 선택된 항목 강조 */
-            .stSelectbox:focus,
-            .stTextInput:focus {
-                border-color: rgb(0, 113, 255) !important;
-            }
+
+# 계산 결과 (기기당 월 예상 금액, 수수료별도적용, 자세히 보기, 견적서)
+@fragment("calculation_done", "calculation_count", "contract_term")
+def result_section():
+    config = load_config()
+    
+    # 계산 결과 (세션당 하나의 읽기 전용 결과 객체)
+    result = session_result() if st.session_state.calculation_done else None
+    if st.session_state.calculation_done and result is None:
+        # 오래 사용하지 않아 정리된 세션
+        st.session_state.calculation_done = False
+        st.info("오래 사용하지 않아 계산 결과가 정리되었습니다. 다시 계산해주세요.")
+    
+    # 계산 결과 표시
+    if result is not None:
+        st.markdown("---")
+        st.subheader("계산 결과")
+        
+        quote_inputs = result.inputs
+        
+        # 기기당 월 예상 금액
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            # 부가세 포함 및 별도 금액 표시
+            st.markdown(f"### 기기당 월 예상 금액: **{result.per_device_tax_excluded:,.0f}**원 (잔여 수수료: `{result.remaining_commission:,}`원)\n**{result.per_device_monthly:,.0f}**원(부가세포함), ")
+            contract_term = st.session_state.contract_term
+            st.caption(f"{contract_term}개월 총 비용: `{contract_totals(result, (contract_term,))[contract_term]:,.0f}`원 ")
+        
+        with col2:
+            # 수수료별도적용 체크박스 상태 유지
+            custom_commission = st.checkbox(
+                "수수료별도적용", 
+                value=st.session_state.custom_commission,
+                key="custom_commission_checkbox"
+            )
+            st.session_state.custom_commission = custom_commission
             
-            /* 프로그레스 바 색상 */
-            .stProgress > div > div > div > div {
-                background-color: rgb(0, 113, 255) !important;
-            }
+            if custom_commission:
+                custom_commission_section()
+        
+        # 자세히 보기 (펼쳤을 때만 생성)
+        breakdown_section()
+        
+        # 약정 기간별 납부 일정 (펼쳤을 때만 생성)
+        schedule_section()
+        
+        # 견적서 내려받기 (작업 스레드에서 만들고, 다 만들어질 때까지 이 부분만 다시 실행)
+        if st.toggle("견적서 내려받기", key="show_export"):
+            import export
             
-            /* 체크박스, 라디오 버튼 등의 강조 색상 */
-            .stCheckbox:checked,
-            .stRadio:checked {
-                background-color: rgb(0, 113, 255) !important;
+            futures = {
+                file_format: export.request_export(file_format, quote_inputs, config, config_version())
+                for file_format in export.FORMATS
             }
             
-            /* 코드 블록 스타일링 */
-            code {
-                color: rgb(0, 113, 255) !important;
-                background-color: rgba(0, 113, 255, 0.1) !important;
-                padding: 0.2em 0.4em !important;
-                border-radius: 3px !important;
-            }
+            # 다 만들어지면 전체를 다시 실행해 내려받기 버튼을 보여준다
+            def wait_for_export():
+                if all(future.done() for future in futures.values()):
+                    st.rerun()
+                st.caption("견적서를 만드는 중입니다...")
+            
+            if not all(future.done() for future in futures.values()):
+                st.fragment(wait_for_export, run_every=0.5)()
+            else:
+                columns = st.columns(len(futures))
+                for column, (file_format, future) in zip(columns, futures.items()):
+                    label, mime = export.FORMATS[file_format]
+                    with column:
+                        if future.exception() is not None:
+                            st.error(f"{label} 견적서를 만들지 못했습니다: {future.exception()}")
+                            continue
+                        st.download_button(
+                            f"{label} 내려받기",
+                            data=future.result(),
+                            file_name=export.file_name(file_format, quote_inputs),
+                            mime=mime,
+                            use_container_width=True,
+                            key=f"download_{file_format}"
+                        )
+                st.caption("인쇄용 HTML 은 브라우저에서 열어 인쇄 메뉴로 PDF 로 저장할 수 있습니다.")
+
+
+# 수수료별도적용 (수수료 금액을 바꾸면 이 조각만 다시 실행)
+@fragment("calculation_count", "custom_commission_amount", "contract_term")
+def custom_commission_section():
+    config = load_config()
+    result = session_result()
+    if result is None:
+        return
+    quote_inputs = result.inputs
+    
+    st.markdown(f"**원래 총 수수료**: {result.commission:,}원")
+    
+    # 최대값을 더 높게 설정하여 더 큰 수수료도 입력 가능하게 함
+    max_commission = max(int(result.commission) * 2, int(result.commission) + 1000000)
+    
+    custom_commission_amount = st.number_input(
+        "적용할 수수료 금액",
+        min_value=0,
+        max_value=max_commission,
+        value=int(st.session_state.custom_commission_amount) if st.session_state.custom_commission_amount > 0 else int(result.commission),
+        step=100000,
+        key="custom_commission_amount_input"
+    )
+    st.session_state.custom_commission_amount = custom_commission_amount
+    
+    # 수수료 0원 ~ 최대값 전 구간의 기기당 월 예상 금액 (한 번에 계산)
+    import charts
+    sweep = commission_sweep(quote_inputs, config, max_commission)
+    st.vega_lite_chart(spec=charts.commission_sweep_chart(sweep, custom_commission_amount), use_container_width=True)
+    st.caption("점: 일시불 처리 대수가 바뀌는 수수료, 점선: 현재 적용 수수료")
+    
+    # 사용자 지정 수수료로 재계산
+    if custom_commission_amount != result.commission:
+        try:
+            quote_custom = quote_result(quote_inputs, config, config_version(), custom_commission_amount)
             
-            /* 로그인 폼 스타일링 */
-            .login-form {
-                max-width: 400px;
-                margin: 0 auto;
-                padding: 2rem;
-                background-color: white;
-                border-radius: 8px;
-                box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            }
+            # 결과를 색상으로 구분하여 표시
+            st.markdown(f"### 재계산된 기기당 월 예상 금액: **{quote_custom.per_device_tax_excluded:,.0f}**원 (잔여 수수료: `{quote_custom.remaining_commission:,}`원)\n**{quote_custom.per_device_monthly:,.0f}**원(부가세포함), ")
             
-            .login-form input {
-                width: 100%;
-                margin-bottom: 1rem;
-            }
-        </style>
-    """, unsafe_allow_html=True)
+            contract_term = st.session_state.contract_term
+            st.caption(f"{contract_term}개월 총 비용: `{contract_totals(quote_custom, (contract_term,))[contract_term]:,.0f}`원 ")
+        
+        except Exception as e:
+            st.error(f"계산 중 오류가 발생했습니다: {str(e)}")
+            st.info("수수료 금액을 다시 확인해주세요.")
+        
+        # 수수료별도적용 상세 내역 (펼쳤을 때만 생성)
+        if st.toggle("수수료별도적용 자세히 보기", key="show_custom_detail"):
+            import breakdown
+            with st.container(border=True):
+                breakdown.render(breakdown.custom_breakdown(quote_inputs, custom_commission_amount, config, config_version()))
 
 
-# 일시불 처리 가능 대수 계산
-def calculate_lump_sum_devices(store_device_count, device_type, commission, config):
-    if device_type == "normal":
-        lump_sum_price = config['prices']['store_device']['normal']['lump_sum']
-    else:  # calc
-        lump_sum_price = config['prices']['store_device']['calc']['lump_sum']
-    
-    possible_devices = math.floor(commission / lump_sum_price)
-    actual_devices = min(possible_devices, store_device_count)
-    remaining_commission = commission - (actual_devices * lump_sum_price)
-    
-    return actual_devices, remaining_commission
+# 기본 계산 자세히 보기 (펼치거나 접어도 이 조각만 다시 실행)
+@fragment("calculation_count")
+def breakdown_section():
+    result = session_result()
+    if result is None:
+        return
+    quote_inputs = result.inputs
+    
+    if st.toggle("기본 계산 자세히 보기", key="show_basic_detail"):
+        import breakdown
+        with st.container(border=True):
+            breakdown.render(breakdown.basic_breakdown(quote_inputs, load_config(), config_version()))
+
+
+# 약정 기간별 납부 일정 (할인율을 바꾸면 이 조각만, 약정 기간을 바꾸면 총 비용 문구까지 다시 실행)
+@fragment("calculation_count")
+def schedule_section():
+    result = session_result()
+    if result is None:
+        return
+    
+    if st.toggle("약정 기간별 납부 일정", key="show_schedule"):
+        from breakdown import markdown_table
+        from schedule import COLUMN_LABELS, COLUMNS, TERMS, monthly_schedule, schedule_arrays, term_note
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            contract_term = st.selectbox(
+                "약정 기간",
+                TERMS,
+                index=TERMS.index(st.session_state.contract_term),
+                format_func=lambda term: f"{term}개월",
+                key="contract_term_select"
+            )
+        with col2:
+            discount_rate = st.number_input(
+                "할인율 (연 %)",
+                min_value=0.0,
+                max_value=30.0,
+                value=float(st.session_state.discount_rate),
+                step=0.5,
+                key="discount_rate_input"
+            )
+        st.session_state.contract_term = contract_term
+        st.session_state.discount_rate = discount_rate
+        
+        # 약정 기간 비교 (모든 기간을 한 번에 계산)
+        comparison = schedule_arrays(result, TERMS, discount_rate / 100)
+        st.markdown(markdown_table(["약정 기간", "총 비용", "월 평균", "현재가치", "비고"], [
+            [f"{term}개월", f"`{total:,.0f}`원", f"`{average:,.0f}`원", f"`{present_value:,.0f}`원", term_note(term)]
+            for term, total, average, present_value in zip(
+                TERMS, comparison["total"][0], comparison["monthly_average"][0], comparison["present_value"][0])
+        ]))
+        
+        # 선택한 약정 기간의 월별 납부액
+        st.dataframe(
+            list(monthly_schedule(result, contract_term, discount_rate / 100)),
+            hide_index=True,
+            column_order=COLUMNS,
+            column_config={name: st.column_config.NumberColumn(label, format="%d") for name, label in COLUMN_LABELS.items()}
+        )
+        st.caption(f"부가세 포함, 매월 말 납부 기준입니다. 현재가치는 연 `{discount_rate:g}`% 로 할인한 금액입니다.")
+
+
+# 목표 금액 역산 (펼쳤을 때만 그려지고, 그동안 입력값이 바뀌면 전체를 다시 실행해 함께 갱신)
+@fragment(*INPUT_KEYS)
+def solver_section():
+    config = load_config()
+    # 인터넷 신규는 KT 패키지를 포함하므로 견적 계산과 같은 규칙으로 정리한 뒤 옵션 조합과 맞춘다
+    inputs = normalize_inputs({
+        name: st.session_state[name]
+        for name in ("store_device_count", "board_type", "device_type", "use_shinhan", "use_tanggua",
+                     "use_internet_new", "use_internet_kt")
+    })
+    store_device_count = inputs["store_device_count"]
+    board_type = inputs["board_type"]
+    device_type = inputs["device_type"]
+    
+    import solver
+    from breakdown import markdown_table
+    
+    target_price = st.number_input(
+        "목표 기기당 월 금액 (부가세별도)",
+        min_value=0,
+        value=15000,
+        step=500,
+        key="target_price_input"
+    )
+    fixed_hardware = st.checkbox("현재 알림판/결제방식 유지", value=True, key="solver_fixed_hardware")
+    
+    result = solver.solve(
+        store_device_count,
+        target_price,
+        config,
+        board_types=[board_type] if fixed_hardware else None,
+        device_types=[device_type] if fixed_hardware else None
+    )
+    
+    # 현재 선택한 옵션 기준 필요한 최소 수수료
+    matches = (
+        (result["board_type"] == board_type) & (result["device_type"] == device_type)
+        & (result["use_shinhan"] == inputs["use_shinhan"]) & (result["use_tanggua"] == inputs["use_tanggua"])
+        & (result["use_internet_new"] == inputs["use_internet_new"])
+        & (result["use_internet_kt"] == inputs["use_internet_kt"])
+    )
+    current = matches.argmax()
+    if not matches.any():
+        st.caption("현재 옵션 조합은 역산 대상에 없습니다.")
+    elif result["required_commission"][current] < 0:
+        st.warning("현재 옵션으로는 모든 기기를 일시불 처리해도 목표 금액에 도달할 수 없습니다.")
+    elif result["meets_target"][current]:
+        st.success(f"현재 옵션으로 목표 금액을 달성합니다. (기기당 월 `{result['price'][current]:,.0f}`원)")
+    else:
+        st.info(f"현재 옵션 기준 필요한 최소 수수료: `{result['required_commission'][current]:,}`원 (현재 `{result['commission'][current]:,}`원, 부족 `{result['commission_shortfall'][current]:,}`원)")
+    
+    # 목표를 만족하는 가장 저렴한 옵션 조합
+    cheapest = solver.cheapest_configurations(
+        store_device_count,
+        target_price,
+        config,
+        board_types=[board_type] if fixed_hardware else None,
+        device_types=[device_type] if fixed_hardware else None
+    )
+    if cheapest:
+        rows = []
+        for option in cheapest:
+            extras = [name for name, used in [
+                ("신한", option["use_shinhan"]),
+                ("땡겨요", option["use_tanggua"]),
+                ("인터넷 신규", option["use_internet_new"]),
+                ("기존 KT", option["use_internet_kt"] and not option["use_internet_new"])
+            ] if used]
+            rows.append([
+                f"{option['board_type']} / {option['device_type']}",
+                ", ".join(extras) or "-",
+                f"`{option['price']:,.0f}`원",
+                f"`{option['commission']:,}`원 (필요 `{option['required_commission']:,}`원)"
+            ])
+        st.markdown(markdown_table(["알림판 / 결제방식", "추가 옵션", "기기당 월", "수수료"], rows))
+    else:
+        st.caption("목표 금액을 만족하는 옵션 조합이 없습니다.")
+
 
 def main():
     st.set_page_config(page_title="하이오더 월 비용 계산기", layout="wide")
     apply_custom_css()
+    begin_run()
     
+    # 적용 시작일이 된 예약 정책을 먼저 반영
+    policy = apply_due_policy()
     config = load_config()
     
     # 사이드바에 페이지 이동 버튼 추가
     with st.sidebar:
         st.markdown("### 메뉴")
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
             if st.button("🏠 메인", use_container_width=True):
                 st.session_state.page = "main"
         with col2:
             if st.button("⚙️ 관리자", use_container_width=True):
                 st.session_state.page = "admin"
+        with col3:
+            if st.button("📊 분석", use_container_width=True):
+                st.session_state.page = "analytics"
     
     # 메인 타이틀
     st.title("하이오더 계산기")
-    st.markdown("<p style='font-size: 14px; margin-top: -15px; color: gray;'>3월정책반영</p>", unsafe_allow_html=True)
+    if policy is not None:
+        st.markdown(f"<p style='font-size: 14px; margin-top: -15px; color: gray;'>{policy.label}반영</p>", unsafe_allow_html=True)
     
     # 세션 상태 초기화
     if "board_type" not in st.session_state:
@@ -211,442 +502,128 @@ def main():
         st.session_state.custom_commission = False
     if "custom_commission_amount" not in st.session_state:
         st.session_state.custom_commission_amount = 0
-    if "commission" not in st.session_state:
-        st.session_state.commission = 0
     if "calculation_done" not in st.session_state:
         st.session_state.calculation_done = False
     if "input_changed" not in st.session_state:
         st.session_state.input_changed = False
+    if "calculation_count" not in st.session_state:
+        st.session_state.calculation_count = 0
+    if "contract_term" not in st.session_state:
+        st.session_state.contract_term = DEFAULT_TERM
+    if "discount_rate" not in st.session_state:
+        st.session_state.discount_rate = DISCOUNT_RATE * 100
     
-    # 입력값 변경 감지 함수
-    def on_input_change():
-        if st.session_state.calculation_done:
-            st.session_state.input_changed = True
+    # 세션 실행 기록 (세션 상태 크기 측정, 유휴 세션 결과 정리)
+    session_id = current_session_id()
+    registry.touch(session_id, st.session_state.to_dict())
     
     # 기본 페이지 (사용자용)
+    # 입력/계산 결과/수수료별도적용/자세히 보기는 각각 조각이라 자기 위젯이 바뀌면 그 부분만 다시 실행된다
     if "page" not in st.session_state or st.session_state.page == "main":
-        # 입력 컨테이너
-        input_container = st.container()
+        input_section()
+        result_section()
         
-        with input_container:
-            # 알림판 선택
-            st.subheader("알림판 선택 (필수)")
-            board_type = st.radio(
-                "알림판 크기를 선택하세요:",
-                ["15인치", "10인치"],
-                format_func=lambda x: f"{x} (월 `{config['prices']['board']['inch'+x[:2]]:,}`원)",
-                horizontal=True,
-                index=0 if st.session_state.board_type == "15인치" else 1,
-                key="board_type_radio",
-                on_change=on_input_change
-            )
-            st.session_state.board_type = board_type
-            
-            st.caption(f"선택된 기기: **{board_type}** (월 `{config['prices']['board']['inch'+board_type[:2]]:,}`원)")
-            
-            st.markdown("---")
-            
-            # 입력값 변경 감지 시 경고 메시지 표시
-            if st.session_state.input_changed:
-                st.warning("⚠️ 입력값이 변경되었습니다. 변경된 값으로 다시 계산하려면 '계산하기' 버튼을 눌러주세요.")
-            
-            # 매장용 기기 종류
-            st.subheader("결제방식 선택")
-            device_type = st.radio(
-                "결제방식을 선택하세요:",
-                ["후불형", "선불형"],
-                format_func=lambda x: f"{x} (월 `{config['prices']['store_device']['normal' if x=='후불형' else 'calc']['monthly']:,}`원)",
-                horizontal=True,
-                index=0 if st.session_state.device_type == "후불형" else 1,
-                key="device_type_radio",
-                on_change=on_input_change
-            )
-            st.session_state.device_type = device_type
-            
-            device_key = "normal" if device_type == "후불형" else "calc"
-            
-            st.caption(f"선택된 결제방식: **{device_type}** (월 `{config['prices']['store_device'][device_key]['monthly']:,}`원)")
-            
-            st.markdown("---")
-            
-            # 매장용 기기 개수
-            st.subheader("테이블 개수")
-            store_device_count = st.number_input(
-                "테이블 수량을 입력하세요:",
-                min_value=1,
-                value=st.session_state.store_device_count,
-                step=1,
-                key="store_device_count_input",
-                on_change=on_input_change
-            )
-            st.session_state.store_device_count = store_device_count
-            
-            st.markdown("---")
-            
-            # 신한은행 주거래 통장
-            st.subheader("신한은행 주거래 통장")
-            use_shinhan = st.checkbox(
-                f"**신한은행 주거래 통장** 사용 (수수료 +`{config['commission']['shinhan_bonus']:,}`원)",
-                value=st.session_state.use_shinhan,
-                key="use_shinhan_checkbox",
-                on_change=on_input_change
-            )
-            st.session_state.use_shinhan = use_shinhan
-            
-            use_tanggua = st.checkbox(
-                f"**땡겨요어플설치** (수수료 +`{config['commission']['tanggua_bonus']:,}`원)",
-                value=st.session_state.use_tanggua,
-                key="use_tanggua_checkbox",
-                on_change=on_input_change
-            )
-            st.session_state.use_tanggua = use_tanggua
-            
-            st.markdown("---")
-            
-            # 인터넷 관련 체크박스
-            st.subheader("인터넷 결합")
-            
-            internet_kt_fee = config['commission']['internet_kt']
-            internet_new_fee = config['commission']['internet_new']
-            monthly_discount = config['internet']['monthly_discount']
-            
-            use_internet_new = st.checkbox(
-                f"**인터넷 신규** 신청 (수수료 +`{internet_new_fee:,}`원, 월 `{monthly_discount:,}`원 할인)",
-                value=st.session_state.use_internet_new,
-                key="use_internet_new_checkbox",
-                on_change=on_input_change
+        # 목표 금액 역산 (펼쳤을 때만 계산)
+        st.markdown("---")
+        if st.toggle("목표 금액 역산", key="show_solver"):
+            solver_section()
+        
+        # 여러 매장 견적 (체인 매장 목록을 올리면 작업 스레드에서 묶음별로 계산)
+        st.markdown("---")
+        if st.toggle("여러 매장 견적", key="show_multi_store"):
+            import multi_store
+            from breakdown import markdown_table
+            
+            uploaded = st.file_uploader("매장 목록 파일 (CSV 또는 Parquet)", type=["csv", "parquet"], key="multi_store_file")
+            st.caption(
+                "컬럼: `store_device_count`(필수), `store_name`, `board_type`, `device_type`, "
+                "`use_shinhan`, `use_tanggua`, `use_internet_new`, `use_internet_kt`, `custom_commission` "
+                "- 빈 칸은 15인치/후불형/옵션 없음/수수료 자동으로 계산합니다."
             )
-            st.session_state.use_internet_new = use_internet_new
-            
-            use_internet_kt = st.checkbox(
-                f"**기존 KT 인터넷** 사용 (으랏차차 패키지 +`{internet_kt_fee:,}`원, 월 `{monthly_discount:,}`원 할인)",
-                value=use_internet_new or st.session_state.use_internet_kt,
-                disabled=use_internet_new,
-                key="use_internet_kt_checkbox",
-                on_change=on_input_change
+            st.download_button(
+                "예시 파일 내려받기",
+                data=multi_store.template_csv(),
+                file_name="매장목록_예시.csv",
+                mime="text/csv",
+                key="multi_store_template"
             )
-            st.session_state.use_internet_kt = use_internet_kt
-            
-            if use_internet_new:
-                st.caption(f"👆 인터넷 신규 신청 시 으랏차차 패키지(`{internet_kt_fee:,}`원)가 자동으로 포함됩니다.")
             
-            st.markdown("---")
-            
-            # 계산하기 버튼
-            if st.button("계산하기", type="primary", use_container_width=True):
-                # 입력값 변경 플래그 초기화
-                st.session_state.input_changed = False
-                
-                # 총 기기 수 (알림판 1대 + 매장용 기기)
-                total_devices = store_device_count + 1
-                
-                # 수수료 계산
-                commission = calculate_commission(total_devices, config, use_shinhan, use_internet_new, use_internet_kt, use_tanggua)
-                st.session_state.commission = commission
-                st.session_state.calculation_done = True
-                st.session_state.custom_commission_amount = commission  # 기본값 설정
-                
-                # 일시불 처리 가능 대수 계산
-                actual_devices, remaining_commission = calculate_lump_sum_devices(
-                    store_device_count,
-                    device_key,
-                    commission,
-                    config
-                )
-                
-                # 월 비용 계산
-                monthly_service_fee = total_devices * config['service_fee']
+            if uploaded is not None:
+                # 같은 파일/설정이면 이미 시작한 작업을 그대로 쓴다 (재실행마다 다시 계산하지 않음)
+                job_key = (uploaded.file_id, config_version())
+                if st.session_state.get("multi_store_job_key") != job_key:
+                    previous = st.session_state.get("multi_store_job")
+                    if previous is not None:
+                        previous.cancel()
+                    st.session_state.multi_store_job = None
+                    st.session_state.multi_store_error = None
+                    try:
+                        stores = multi_store.load_stores(uploaded.getvalue(), uploaded.name)
+                        st.session_state.multi_store_job = multi_store.MultiStoreJob(stores, config, config_version())
+                    except ValueError as e:
+                        st.session_state.multi_store_error = str(e)
+                    st.session_state.multi_store_job_key = job_key
+                job = st.session_state.multi_store_job
                 
-                # 알림판 월 할부금
-                board_monthly = config['prices']['board']['inch10' if board_type == "10인치" else 'inch15']
-                
-                # 매장용 기기 월 할부금 (일시불 처리 후 남은 기기만)
-                remaining_devices = store_device_count - actual_devices
-                device_monthly = config['prices']['store_device'][device_key]['monthly']
-                store_device_monthly = remaining_devices * device_monthly
-                
-                # 총 월 비용 (부가세 적용)
-                total_monthly = monthly_service_fee + board_monthly + store_device_monthly
-                total_monthly_with_tax = total_monthly * 1.1  # 부가세 10% 적용
-                
-                # 인터넷 결합 할인 적용 (부가세 적용 후 차감)
-                internet_discount = config['internet']['monthly_discount'] if (use_internet_new or use_internet_kt) else 0
-                
-                final_monthly = total_monthly_with_tax - internet_discount
-                
-                # 기기당 월 예상 금액
-                per_device_monthly = final_monthly / total_devices
-                
-                # 계산 관련 값들을 세션 상태에 저장
-                st.session_state.total_devices = total_devices
-                st.session_state.board_monthly = board_monthly
-                st.session_state.board_type = board_type
-                st.session_state.device_monthly = device_monthly
-                st.session_state.device_type = device_type
-                st.session_state.store_device_count = store_device_count
-                st.session_state.device_key = device_key
-                st.session_state.monthly_service_fee = monthly_service_fee
-                st.session_state.remaining_devices = remaining_devices
-                st.session_state.store_device_monthly = store_device_monthly
-                st.session_state.total_monthly = total_monthly
-                st.session_state.total_monthly_with_tax = total_monthly_with_tax
-                st.session_state.internet_discount = internet_discount
-                st.session_state.final_monthly = final_monthly
-                st.session_state.per_device_monthly = per_device_monthly
-                st.session_state.actual_devices = actual_devices
-                st.session_state.remaining_commission = remaining_commission
-            
-            # 계산 결과 표시 (세션 상태에 저장된 값 사용)
-            if "calculation_done" in st.session_state and st.session_state.calculation_done:
-                st.markdown("---")
-                st.subheader("계산 결과")
-                
-                # 기기당 월 예상 금액
-                col1, col2 = st.columns([3, 2])
-                with col1:
-                    # 부가세 포함 및 별도 금액 표시
-                    per_device_tax_excluded = st.session_state.per_device_monthly / 1.1
-                    st.markdown(f"### 기기당 월 예상 금액: **{per_device_tax_excluded:,.0f}**원 (잔여 수수료: `{st.session_state.remaining_commission:,}`원)\n**{st.session_state.per_device_monthly:,.0f}**원(부가세포함), ")
-                    st.caption(f"36개월 총 비용: `{st.session_state.final_monthly * 36:,.0f}`원 ")
-                
-                with col2:
-                    # 수수료별도적용 체크박스 상태 유지
-                    custom_commission = st.checkbox(
-                        "수수료별도적용", 
-                        value=st.session_state.custom_commission,
-                        key="custom_commission_checkbox"
-                    )
-                    st.session_state.custom_commission = custom_commission
-                    
-                    if custom_commission:
-                        st.markdown(f"**원래 총 수수료**: {st.session_state.commission:,}원")
-                        
-                        # 최대값을 더 높게 설정하여 더 큰 수수료도 입력 가능하게 함
-                        max_commission = max(int(st.session_state.commission) * 2, int(st.session_state.commission) + 1000000)
-                        
-                        custom_commission_amount = st.number_input(
-                            "적용할 수수료 금액",
-                            min_value=0,
-                            max_value=max_commission,
-                            value=int(st.session_state.custom_commission_amount) if st.session_state.custom_commission_amount > 0 else int(st.session_state.commission),
-                            step=100000,
-                            key="custom_commission_amount_input"
-                        )
-                        st.session_state.custom_commission_amount = custom_commission_amount
-                        
-                        # 사용자 지정 수수료로 재계산
-                        if custom_commission_amount != st.session_state.commission:
-                            try:
-                                # 일시불 처리 가능 대수 재계산
-                                actual_devices_custom, remaining_commission_custom = calculate_lump_sum_devices(
-                                    st.session_state.store_device_count,
-                                    st.session_state.device_key,
-                                    custom_commission_amount,
-                                    config
-                                )
-                                
-                                # 월 비용 재계산
-                                remaining_devices_custom = st.session_state.store_device_count - actual_devices_custom
-                                store_device_monthly_custom = remaining_devices_custom * st.session_state.device_monthly
-                                
-                                total_monthly_custom = st.session_state.monthly_service_fee + st.session_state.board_monthly + store_device_monthly_custom
-                                
-                                # 부가세 10% 적용
-                                total_monthly_with_tax_custom = total_monthly_custom * 1.1
-                                
-                                # 인터넷 결합 할인 적용 (부가세 적용 후 차감)
-                                internet_discount_custom = config['internet']['monthly_discount'] if (use_internet_new or use_internet_kt) else 0
-                                
-                                final_monthly_custom = total_monthly_with_tax_custom - internet_discount_custom
-                                
-                                per_device_monthly_custom = final_monthly_custom / st.session_state.total_devices
-                                
-                                # 수수료 차이와 월 예상금액 차이 계산
-                                commission_diff = custom_commission_amount - st.session_state.commission
-                                monthly_diff = per_device_monthly_custom - st.session_state.per_device_monthly
-                                
-                                # 부가세 별도 금액 계산
-                                per_device_tax_excluded_custom = per_device_monthly_custom / 1.1
-                                
-                                # 결과를 색상으로 구분하여 표시
-                                st.markdown(f"### 재계산된 기기당 월 예상 금액: **{per_device_tax_excluded_custom:,.0f}**원 (잔여 수수료: `{remaining_commission_custom:,}`원)\n**{per_device_monthly_custom:,.0f}**원(부가세포함), ")
-                                
-                                st.caption(f"36개월 총 비용: `{final_monthly_custom * 36:,.0f}`원 ")
-                                
-                                # 월 비용 상세 표 생성 (수수료별도적용)
-                                monthly_details_custom = [
-                                    ["구분", "계산식", "금액"],
-                                    ["1. 월 서비스 이용료", f"`{config['service_fee']:,}`원 × `{st.session_state.total_devices}`대", f"`{st.session_state.monthly_service_fee:,}`원"],
-                                    ["2. 알림판 할부금", f"{st.session_state.board_type} 할부금 (`{st.session_state.board_monthly:,}`원)", f"`{st.session_state.board_monthly:,}`원"],
-                                    ["3. 매장용 기기 할부금", f"`{st.session_state.device_monthly:,}`원 × `{remaining_devices_custom}`대", f"`{store_device_monthly_custom:,}`원"],
-                                    ["4. 부가세 10%", f"(1 + 2 + 3) × 0.1", f"`{(st.session_state.monthly_service_fee + st.session_state.board_monthly + store_device_monthly_custom) * 0.1:,.0f}`원"]
-                                ]
-                                
-                                if st.session_state.internet_discount > 0:
-                                    monthly_details_custom.append(["5. 인터넷 결합 할인", f"월 고정 할인", f"-`{st.session_state.internet_discount:,}`원"])
-                                
-                                monthly_details_custom.append(["월 총액", "(1 + 2 + 3) × 1.1 - 5", f"`{final_monthly_custom:,.0f}`원"])
-                                
-                                df_monthly_custom = pd.DataFrame(monthly_details_custom[1:], columns=monthly_details_custom[0])
-                                st.table(df_monthly_custom)
-                                
-                                st.markdown(f"""
-                                ### 5. 기기당 월 예상 금액 계산 (수수료별도적용)
-                                - 계산식: 월 총액 ÷ 총 기기 수
-                                - = `{final_monthly_custom:,.0f}`원 ÷ `{st.session_state.total_devices}`대
-                                - = `{per_device_monthly_custom:,.0f}`원(부가세포함), `{per_device_tax_excluded_custom:,.0f}`원(부가세별도)
-
-                                ### 6. 36개월 총 비용 예상 (수수료별도적용)
-                                - 월 고정 비용: `{final_monthly_custom:,.0f}`원
-                                - 36개월 총 비용: `{final_monthly_custom * 36}`원
-                                - 일시불 처리 비용: `{actual_devices_custom}`대 × `{config['prices']['store_device'][st.session_state.device_key]['lump_sum']:,}`원 = `{actual_devices_custom * config['prices']['store_device'][st.session_state.device_key]['lump_sum']:,}`원
-                                - 남은 수수료: `{remaining_commission_custom:,}`원
-                                
-                                ### 7. 원래 계산과 비교
-                                - 원래 기기당 월 예상 금액: `{st.session_state.per_device_monthly:,.0f}`원
-                                - 재계산된 기기당 월 예상 금액: `{per_device_monthly_custom:,.0f}`원
-                                - 차이: `{per_device_monthly_custom - st.session_state.per_device_monthly:,.0f}`원
-                                """)
-                            
-                            except Exception as e:
-                                st.error(f"계산 중 오류가 발생했습니다: {str(e)}")
-                                st.info("수수료 금액을 다시 확인해주세요.")
-                            
-                            # 수수료별도적용 상세 내역 표시 (새로 추가)
-                            with st.expander("수수료별도적용 자세히 보기"):
-                                st.info("이 섹션은 사용자가 직접 설정한 수수료 금액으로 계산한 결과를 보여줍니다.")
-                                st.markdown(f"""
-                                ### 1. 기본 정보 (수수료별도적용)
-                                - 총 기기 수: `{st.session_state.total_devices}`대
-                                  - 알림판: `1`대 ({st.session_state.board_type}, 월 `{st.session_state.board_monthly:,}`원)
-                                  - 매장용 기기: `{st.session_state.store_device_count}`대 ({st.session_state.device_type}, 월 `{st.session_state.device_monthly:,}`원)
-
-                                ### 2. 수수료 계산 상세 (수수료별도적용)
-                                - 적용 수수료: `{custom_commission_amount:,}`원 (원래 수수료: `{st.session_state.commission:,}`원)
-                                  - 수수료 변동액: `{custom_commission_amount - st.session_state.commission:,}`원
-                                
-                                ### 3. 일시불 처리 계산 (수수료별도적용)
-                                - 매장용 기기 일시불 가격: `{config['prices']['store_device'][st.session_state.device_key]['lump_sum']:,}`원
-                                - 총 수수료: `{custom_commission_amount:,}`원
-                                - 일시불 처리 가능 대수: `{actual_devices_custom}`대 (원래: `{st.session_state.actual_devices}`대)
-                                  - 계산식: min(⌊수수료 ÷ 일시불가격⌋, 매장용기기수)
-                                  - = min(⌊`{custom_commission_amount:,}` ÷ `{config['prices']['store_device'][st.session_state.device_key]['lump_sum']:,}`⌋, `{st.session_state.store_device_count}`)
-                                  - = min(`{math.floor(custom_commission_amount/config['prices']['store_device'][st.session_state.device_key]['lump_sum'])}`, `{st.session_state.store_device_count}`)
-                                  - = `{actual_devices_custom}`
-
-                                ### 4. 월 비용 상세 계산 (수수료별도적용)
-                                """)
-                
-                # 자세히 보기
-                with st.expander("기본 계산 자세히 보기"):
-                    st.info("이 섹션은 기본 계산 방식으로 산출된 결과를 상세하게 보여줍니다.")
-                    st.markdown(f"""
-                    ### 1. 기본 정보
-                    - 총 기기 수: `{st.session_state.total_devices}`대
-                      - 알림판: `1`대 ({st.session_state.board_type}, 월 `{st.session_state.board_monthly:,}`원)
-                      - 매장용 기기: `{st.session_state.store_device_count}`대 ({st.session_state.device_type}, 월 `{st.session_state.device_monthly:,}`원)
-
-                    ### 2. 수수료 계산 상세
-                    #### 2.1 기본 수수료
-                    - 기본 수수료 1: `{st.session_state.total_devices:,}`대 × `{config['commission']['basic1']:,}`원 = `{st.session_state.total_devices * config['commission']['basic1']:,}`원
-                    - 기본 수수료 2: `{st.session_state.total_devices:,}`대 × `{config['commission']['basic2']:,}`원 = `{st.session_state.total_devices * config['commission']['basic2']:,}`원
-                    
-                    #### 2.2 조건부 수수료
-                    """)
-
-                    # 수수료 상세 내역 표 생성
-                    commission_details = []
-                    
-                    # 기본 수수료
-                    base_commission = st.session_state.total_devices * (config['commission']['basic1'] + config['commission']['basic2'])
-                    commission_details.append(["기본 수수료", f"`{base_commission:,}`원"])
-                    
-                    # 구간별 추가 수수료
-                    range_bonus = 0
-                    range_text = ""
-                    if 5 <= st.session_state.total_devices <= 9:
-                        range_bonus = config['commission']['range']['5-9']
-                        range_text = "5-9대"
-                    elif 10 <= st.session_state.total_devices <= 19:
-                        range_bonus = config['commission']['range']['10-19']
-                        range_text = "10-19대"
-                    elif 20 <= st.session_state.total_devices <= 29:
-                        range_bonus = config['commission']['range']['20-29']
-                        range_text = "20-29대"
-                    elif st.session_state.total_devices >= 30:
-                        range_bonus = config['commission']['range']['30+']
-                        range_text = "30대 이상"
-                    
-                    if range_bonus > 0:
-                        commission_details.append([f"구간별 보너스 ({range_text})", f"`{range_bonus:,}`원"])
-                    
-                    # 신한은행 보너스
-                    if use_shinhan:
-                        commission_details.append(["신한은행 주거래 보너스", f"`{config['commission']['shinhan_bonus']:,}`원"])
-                    
-                    # 땡겨요 앱 설치 보너스
-                    if use_tanggua:
-                        commission_details.append(["땡겨요 앱 설치 보너스", f"`{config['commission']['tanggua_bonus']:,}`원"])
-                    
-                    # 인터넷 관련 수수료
-                    if use_internet_new:
-                        commission_details.append(["인터넷 신규 신청 보너스", f"`{config['commission']['internet_new']:,}`원"])
-                        commission_details.append(["KT 인터넷 기본 수수료", f"`{config['commission']['internet_kt']:,}`원"])
-                    elif use_internet_kt:
-                        commission_details.append(["기존 KT 인터넷 보너스", f"`{config['commission']['internet_kt']:,}`원"])
+                if st.session_state.multi_store_error:
+                    st.error(st.session_state.multi_store_error)
+                elif not job.done():
+                    # 진행률만 이 부분에서 다시 그리고, 끝나면 전체를 다시 실행해 결과를 보여준다
+                    def wait_for_multi_store():
+                        if job.done():
+                            st.rerun()
+                        done_rows = job.done_rows()
+                        st.progress(done_rows / job.rows, text=f"계산 중... `{done_rows:,}` / `{job.rows:,}`개 매장")
                     
-                    # 총 수수료
-                    commission_details.append(["총 수수료", f"`{st.session_state.commission:,}`원"])
+                    st.fragment(wait_for_multi_store, run_every=0.5)()
+                elif job.error() is not None:
+                    st.error(f"견적을 계산하지 못했습니다: {job.error()}")
+                else:
+                    summary = job.summary()
+                    st.subheader("체인 합계")
+                    st.markdown(markdown_table(["항목", "금액"], [
+                        ["매장 수", f"`{summary['stores']:,}`개"],
+                        ["총 기기 수", f"`{summary['total_devices']:,}`대"],
+                        ["총 수수료", f"`{summary['commission']:,.0f}`원"],
+                        ["일시불 처리", f"`{summary['actual_devices']:,}`대 (`{summary['lump_sum_amount']:,.0f}`원)"],
+                        ["남은 수수료", f"`{summary['remaining_commission']:,.0f}`원"],
+                        ["월 합계 (부가세포함)", f"`{summary['monthly']:,.0f}`원"],
+                    ] + [
+                        [f"{term}개월 총 비용", f"`{total:,.0f}`원"] for term, total in summary['contract_totals'].items()
+                    ] + [
+                        ["기기당 월 평균 (부가세별도)", f"`{summary['per_device_tax_excluded']:,.0f}`원"],
+                    ]))
                     
-                    # 표 생성 및 표시
-                    df = pd.DataFrame(commission_details, columns=["구분", "금액"])
-                    st.table(df)
-                    
-                    st.markdown(f"""
-                    ### 3. 일시불 처리 계산
-                    - 매장용 기기 일시불 가격: `{config['prices']['store_device'][st.session_state.device_key]['lump_sum']:,}`원
-                    - 총 수수료: `{st.session_state.commission:,}`원
-                    - 일시불 처리 가능 대수: `{st.session_state.actual_devices}`대
-                      - 계산식: min(⌊수수료 ÷ 일시불가격⌋, 매장용기기수)
-                      - = min(⌊`{st.session_state.commission:,}` ÷ `{config['prices']['store_device'][st.session_state.device_key]['lump_sum']:,}`⌋, `{st.session_state.store_device_count}`)
-                      - = min(`{math.floor(st.session_state.commission/config['prices']['store_device'][st.session_state.device_key]['lump_sum'])}`, `{st.session_state.store_device_count}`)
-                      - = `{st.session_state.actual_devices}`
-
-                    ### 4. 월 비용 상세 계산
-                    """)
-                    
-                    # 월 비용 상세 표 생성
-                    monthly_details = [
-                        ["구분", "계산식", "금액"],
-                        ["1. 월 서비스 이용료", f"`{config['service_fee']:,}`원 × `{st.session_state.total_devices}`대", f"`{st.session_state.monthly_service_fee:,}`원"],
-                        ["2. 알림판 할부금", f"{st.session_state.board_type} 할부금 (`{st.session_state.board_monthly:,}`원)", f"`{st.session_state.board_monthly:,}`원"],
-                        ["3. 매장용 기기 할부금", f"`{st.session_state.device_monthly:,}`원 × `{st.session_state.remaining_devices}`대", f"`{st.session_state.store_device_monthly:,}`원"],
-                        ["4. 부가세 10%", f"(1 + 2 + 3) × 0.1", f"`{st.session_state.total_monthly * 0.1:,.0f}`원"]
-                    ]
-                    
-                    if st.session_state.internet_discount > 0:
-                        monthly_details.append(["5. 인터넷 결합 할인", f"월 고정 할인", f"-`{st.session_state.internet_discount:,}`원"])
-                    
-                    monthly_details.append(["월 총액", "(1 + 2 + 3) × 1.1 - 5", f"`{st.session_state.final_monthly:,.0f}`원"])
-                    
-                    df_monthly = pd.DataFrame(monthly_details[1:], columns=monthly_details[0])
-                    st.table(df_monthly)
-                    
-                    # 부가세 별도 금액 계산
-                    per_device_tax_excluded = st.session_state.per_device_monthly / 1.1
-                    
-                    st.markdown(f"""
-                    ### 5. 기기당 월 예상 금액 계산
-                    - 계산식: 월 총액 ÷ 총 기기 수
-                    - = `{st.session_state.final_monthly:,.0f}`원 ÷ `{st.session_state.total_devices}`대
-                    - = `{st.session_state.per_device_monthly:,.0f}`원(부가세포함), `{per_device_tax_excluded:,.0f}`원(부가세별도)
-
-                    ### 6. 36개월 총 비용 예상
-                    - 월 고정 비용: `{st.session_state.final_monthly:,.0f}`원
-                    - 36개월 총 비용: `{st.session_state.final_monthly * 36:,.0f}`원
-                    - 일시불 처리 비용: `{st.session_state.actual_devices}`대 × `{config['prices']['store_device'][st.session_state.device_key]['lump_sum']:,}`원 = `{st.session_state.actual_devices * config['prices']['store_device'][st.session_state.device_key]['lump_sum']:,}`원
-                    - 남은 수수료: `{st.session_state.remaining_commission:,}`원
-                    """)
+                    st.subheader("매장별 견적")
+                    st.dataframe(
+                        job.results(),
+                        hide_index=True,
+                        column_config={
+                            "store_name": "매장",
+                            "store_device_count": "테이블 수",
+                            "board_type": "알림판",
+                            "device_type": "결제방식",
+                            "use_shinhan": "신한",
+                            "use_tanggua": "땡겨요",
+                            "use_internet_new": "인터넷 신규",
+                            "use_internet_kt": "기존 KT",
+                            "custom_commission": st.column_config.NumberColumn("수수료 지정", format="%d"),
+                            "total_devices": "총 기기 수",
+                            "commission": st.column_config.NumberColumn("수수료", format="%d"),
+                            "actual_devices": "일시불 대수",
+                            "remaining_commission": st.column_config.NumberColumn("남은 수수료", format="%d"),
+                            "final_monthly": st.column_config.NumberColumn("월 비용", format="%d"),
+                            "per_device_tax_excluded": st.column_config.NumberColumn("기기당 월 (부가세별도)", format="%d"),
+                        }
+                    )
+                    st.download_button(
+                        "매장별 견적 내려받기 (CSV)",
+                        data=job.results_csv(),
+                        file_name=f"하이오더_매장별견적_{job.rows}개.csv",
+                        mime="text/csv",
+                        key="multi_store_download"
+                    )
+                    st.caption(f"`{job.rows:,}`개 매장 계산 `{job.elapsed * 1000:,.0f}`ms")
     
     # 관리자 페이지
     elif st.session_state.page == "admin":
@@ -658,6 +635,9 @@ def main():
         if admin_code == config['admin_code']:
             st.success("인증되었습니다.")
             
+            # 공유 스냅샷은 읽기 전용이므로 편집용 사본을 만든다
+            config = thaw(config)
+            
             st.markdown("---")
             
             # 가격 설정
@@ -742,27 +722,52 @@ def main():
             # 구간별 수수료
             st.markdown("##### 구간별 추가 수수료")
             
-            # 새로운 구간별 수수료 설정
-            config['commission']['range']['5-9'] = st.number_input(
-                "5~9대", 
-                value=config['commission']['range']['5-9'], 
-                step=10000
-            )
-            config['commission']['range']['10-19'] = st.number_input(
-                "10~19대", 
-                value=config['commission']['range']['10-19'], 
-                step=10000
-            )
-            config['commission']['range']['20-29'] = st.number_input(
-                "20~29대", 
-                value=config['commission']['range']['20-29'], 
-                step=10000
-            )
-            config['commission']['range']['30+'] = st.number_input(
-                "30대 이상", 
-                value=config['commission']['range']['30+'], 
-                step=10000
+            # 구간별 수수료 설정 (시작 대수부터 다음 구간 시작 전까지 적용)
+            tiers = config_tiers(config['commission'])
+            tier_count = st.number_input(
+                "구간 수",
+                min_value=1,
+                value=len(tiers),
+                step=1,
+                key="tier_count_input"
             )
+            new_tiers = []
+            for i in range(tier_count):
+                if i < len(tiers):
+                    default = tiers[i]
+                else:
+                    default = {"min_devices": new_tiers[-1]["min_devices"] + 10, "amount": new_tiers[-1]["amount"]}
+                col1, col2 = st.columns(2)
+                with col1:
+                    min_devices = st.number_input(
+                        f"{i + 1}구간 시작 대수",
+                        min_value=1,
+                        value=default["min_devices"],
+                        step=1,
+                        key=f"tier_min_{i}"
+                    )
+                with col2:
+                    amount = st.number_input(
+                        f"{i + 1}구간 추가 수수료",
+                        min_value=0,
+                        value=default["amount"],
+                        step=10000,
+                        key=f"tier_amount_{i}"
+                    )
+                new_tiers.append({"min_devices": min_devices, "amount": amount})
+            
+            # 예전 형식(range)이면 같은 위치에 tiers 로 교체
+            config['commission'] = {
+                ("tiers" if key == "range" else key): (new_tiers if key in ("range", "tiers") else value)
+                for key, value in config['commission'].items()
+            }
+            tier_error = None
+            try:
+                tier_preview = compile_tiers(config['commission'])
+                st.caption(" / ".join(f"{label} `{amount:,}`원" for label, amount in zip(tier_preview.labels, tier_preview.amounts)))
+            except ValueError as e:
+                tier_error = str(e)
+                st.error(tier_error)
             
             st.markdown("---")
             
@@ -799,16 +804,202 @@ def main():
             
             st.markdown("---")
             
+            # 저장 전 변경 영향 미리보기 (최근 견적을 현재 설정/수정 중인 설정으로 다시 계산)
+            if st.toggle("변경 영향 미리보기", key="show_impact_preview", disabled=tier_error is not None):
+                import charts
+                from breakdown import markdown_table
+                
+                population = st.radio(
+                    "대상 견적",
+                    ["최근 견적", "대표 조합"],
+                    index=0 if len(recent_quotes) else 1,
+                    horizontal=True,
+                    key="impact_population"
+                )
+                st.caption(f"최근 견적: 이 서버에서 계산된 최근 `{len(recent_quotes):,}`건 / 대표 조합: 1~100대 모든 옵션 조합")
+                inputs = recent_quotes.inputs() if population == "최근 견적" else representative_inputs()
+                impact = impact_summary(inputs, load_config(), config)
+                if impact is None:
+                    st.info("아직 계산된 견적이 없습니다. 대표 조합으로 확인해주세요.")
+                elif impact["changed"] == 0:
+                    st.success(f"견적 `{impact['quotes']:,}`건 모두 기기당 금액이 바뀌지 않습니다.")
+                else:
+                    st.markdown(
+                        f"견적 `{impact['quotes']:,}`건 중 `{impact['changed']:,}`건 변동 "
+                        f"(인상 `{impact['increased']:,}`건 / 인하 `{impact['decreased']:,}`건), "
+                        f"평균 총 수수료 변동 `{impact['commission_change']:+,.0f}`원"
+                    )
+                    st.caption(
+                        f"기기당 월 변동(부가세별도): 평균 `{impact['mean']:+,.0f}`원, 중앙값 `{impact['median']:+,.0f}`원, "
+                        f"5%~95% `{impact['p5']:+,.0f}`~`{impact['p95']:+,.0f}`원, 최소 `{impact['min']:+,.0f}`원, 최대 `{impact['max']:+,.0f}`원"
+                    )
+                    st.altair_chart(charts.impact_histogram_chart(*impact["histogram"]), use_container_width=True)
+                    st.markdown(markdown_table(
+                        ["구간", "견적 수", "평균 변동"],
+                        [[row["tier"], f"`{row['quotes']:,}`", f"`{row['mean_change']:+,.0f}`원"] for row in impact["by_tier"]]
+                    ))
+            
+            st.markdown("---")
+            
+            # 정책 적용 시작일 (오늘 이후로 지정하면 예약 저장)
+            st.subheader("정책 적용")
+            today = datetime.date.today()
+            col1, col2 = st.columns(2)
+            with col1:
+                effective_from = st.date_input("적용 시작일", value=today, key="policy_effective_from")
+            with col2:
+                policy_name = st.text_input("정책 이름", placeholder=policy_label(effective_from), key="policy_label_input")
+            
+            # 정책 이력 (적용 시작일 순)
+            if st.toggle("정책 이력", key="show_policy_history"):
+                from breakdown import markdown_table
+                
+                rows = []
+                for item in reversed(get_policy_store().policies()):
+                    if item.effective_from > today:
+                        status = "예약"
+                    elif policy is not None and item.id == policy.id:
+                        status = "적용 중"
+                    else:
+                        status = "-"
+                    rows.append([f"`{item.id}`", item.label, f"{item.effective_from:%Y-%m-%d}", item.saved_at or "-", status])
+                st.markdown(markdown_table(["번호", "정책", "적용 시작일", "저장 시각", "상태"], rows))
+            
+            st.markdown("---")
+            
+            # 견적표 상태
+            table = current_table()
+            if table is not None:
+                st.caption(f"견적표: 테이블 `{table.max_store_devices}`개까지, 생성 `{table.build_seconds * 1000:,.1f}`ms, 메모리 `{table.nbytes / 1024:,.0f}`KB (설정 버전 `{table.version}`)")
+            cache_stats = quote_cache.stats()
+            cache_requests = cache_stats["hits"] + cache_stats["misses"]
+            if cache_requests:
+                st.caption(f"견적 캐시: `{cache_stats['entries']:,}`/`{cache_stats['max_entries']:,}`개, 적중률 `{cache_stats['hits'] / cache_requests:.1%}`, 제거 `{cache_stats['evictions']:,}`회")
+            
+            # 세션 메모리 현황 (레플리카 규모 산정용)
+            if st.toggle("세션 메모리 현황", key="show_session_report"):
+                from breakdown import markdown_table
+                
+                summary = registry.summary()
+                st.caption(f"세션 `{summary['sessions']}`개, 계산 결과 `{summary['results']}`개 (견적 캐시 `{summary['cached_quotes']}`개), 세션 상태 합계 `{summary['state_bytes'] / 1024:,.1f}`KB")
+                st.markdown(markdown_table(
+                    ["세션", "유휴 시간", "세션 상태", "계산 결과"],
+                    [
+                        [
+                            f"`{row['session_id'][:8]}`" + (" (현재)" if row["session_id"] == session_id else ""),
+                            f"`{row['idle_seconds']:,.0f}`초",
+                            f"`{row['state_bytes']:,}`B",
+                            f"`{row['result_bytes']:,}`B" if row["result_bytes"] else "-"
+                        ]
+                        for row in registry.report()
+                    ]
+                ))
+            
             # 저장 버튼
             if st.button("설정 저장", type="primary", use_container_width=True):
-                save_config(config)
-                
-                # 설정 변경 시 세션 상태 초기화
-                for key in ["calculation_done", "input_changed", "commission"]:
-                    if key in st.session_state:
-                        del st.session_state[key]
+                if tier_error:
+                    st.error(f"저장하지 못했습니다: {tier_error}")
+                    st.stop()
+                saved = get_policy_store().append(config, effective_from, policy_name or None)
                 
-                st.success("설정이 저장되었습니다. 메인 페이지로 돌아가서 다시 계산해주세요.")
+                # 오늘 적용되는 정책이 된 경우에만 현재 설정에 반영
+                if get_policy_store().effective(today).id == saved.id:
+                    save_config(config)
+                    
+                    # 설정 변경 시 세션 상태 초기화
+                    for key in ["calculation_done", "input_changed"]:
+                        if key in st.session_state:
+                            del st.session_state[key]
+                    registry.clear(session_id)
+                    
+                    st.success("설정이 저장되었습니다. 메인 페이지로 돌아가서 다시 계산해주세요.")
+                elif effective_from > today:
+                    st.success(f"{saved.label}이 {effective_from:%Y-%m-%d}부터 적용되도록 예약되었습니다.")
+                else:
+                    st.success(f"{saved.label}이 이력에 저장되었습니다. 이후 날짜의 정책이 있어 현재 설정은 바뀌지 않습니다.")
+    
+    # 견적 분석 페이지 (견적 기록 집계)
+    elif st.session_state.page == "analytics":
+        st.title("견적 분석")
+        
+        admin_code = st.text_input("관리자 코드를 입력하세요:", type="password", key="analytics_admin_code")
+        
+        if admin_code == config['admin_code']:
+            import analytics
+            import charts
+            from breakdown import markdown_table
+            
+            months = analytics.available_months()
+            if not months:
+                st.info("아직 견적 기록이 없습니다. 계산하기로 계산한 견적이 쌓이면 이곳에서 볼 수 있습니다.")
+                st.stop()
+            
+            # 기간/알림판/결제방식 선택
+            if len(months) > 1:
+                start, end = st.select_slider(
+                    "기간",
+                    options=months,
+                    value=(months[max(len(months) - 12, 0)], months[-1]),
+                    format_func=analytics.month_label,
+                    key="analytics_months"
+                )
+            else:
+                start = end = months[0]
+            col1, col2 = st.columns(2)
+            with col1:
+                board_filter = st.radio("알림판", ["전체", "15인치", "10인치"], horizontal=True, key="analytics_board")
+            with col2:
+                device_filter = st.radio("결제방식", ["전체", "후불형", "선불형"], horizontal=True, key="analytics_device")
+            
+            summary = analytics.summarize(
+                start=start,
+                end=end,
+                board_type=None if board_filter == "전체" else board_filter,
+                device_type=None if device_filter == "전체" else device_filter,
+            )
+            if summary is None:
+                st.info("선택한 조건의 견적이 없습니다.")
+                st.stop()
+            
+            monthly = summary["monthly"]
+            rows = [{"month": analytics.month_label(month), **row} for month, row in zip(monthly.index, monthly.to_dict("records"))]
+            total_devices = sum(row["average_devices"] * row["quotes"] for row in rows)
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("견적 수", f"{summary['quotes']:,}건")
+            col2.metric("평균 테이블 수", f"{total_devices / summary['quotes']:,.1f}대")
+            col3.metric("평균 기기당 월 금액", f"{monthly['per_device_sum'].sum() / summary['quotes']:,.0f}원")
+            
+            st.markdown("##### 월별 평균 기기당 금액 (부가세별도)")
+            st.altair_chart(charts.monthly_chart(rows, {"average_per_device": "기기당 월 금액"}, "원"), use_container_width=True)
+            
+            st.markdown("##### 월별 옵션 선택률")
+            st.altair_chart(charts.monthly_chart(
+                rows, {f"{name}_rate": label for name, label in analytics.OPTION_NAMES.items()}, "선택률", ".0%"
+            ), use_container_width=True)
+            
+            st.markdown("##### 테이블 수 분포")
+            st.altair_chart(charts.device_distribution_chart(summary["devices"]), use_container_width=True)
+            
+            st.markdown(markdown_table(
+                ["월", "견적 수", "평균 테이블 수", "기기당 월 금액"] + list(analytics.OPTION_NAMES.values()),
+                [
+                    [row["month"], f"{row['quotes']:,}", f"{row['average_devices']:,.1f}", f"{row['average_per_device']:,.0f}원"]
+                    + [f"{row[name + '_rate']:.1%}" for name in analytics.OPTION_NAMES]
+                    for row in rows
+                ]
+            ))
+            st.caption("지금 쓰는 중인 기록 파일(최근 최대 1시간)은 닫힌 뒤에 반영됩니다.")
+
+# 페이지별 재실행 시간 기록 (HIORDER_PROFILE 설정 시 일부 재실행은 프로파일 저장)
+def run():
+    start_exporters()
+    started = time.perf_counter()
+    try:
+        with profiled(rerun_tags):
+            main()
+    finally:
+        RERUN_SECONDS.observe(time.perf_counter() - started, page=st.session_state.get("page", "main"))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    run() 
\ No newline at end of file
@@ -0,0 +1,69 @@
+import datetime
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from benchmarks.bench_quote import _batch_inputs
+from benchmarks.timing import measure
+from config_store import load_config
+from pricing import OUTPUT_COLUMNS, quote_arrays
+
+# 합성 견적 기록 크기 (세그먼트 수 × 세그먼트 행 수)
+SEGMENTS = 20
+SEGMENT_ROWS = 100000
+
+
+# quote_log 와 같은 형식의 합성 세그먼트 (최근 12개월에 고르게 분포)
+def write_synthetic_log(directory, segments=SEGMENTS, rows=SEGMENT_ROWS, seed=0):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from quote_log import _schema
+
+    config = load_config()
+    schema = _schema()
+    rng = np.random.default_rng(seed)
+    started = datetime.datetime(2025, 11, 1)
+    span = (datetime.datetime(2026, 11, 1) - started).total_seconds()
+    for segment in range(segments):
+        inputs = _batch_inputs(rows)
+        quotes = quote_arrays(inputs, config)
+        offsets = np.sort(rng.random(rows)) * span / segments + segment * span / segments
+        columns = {
+            "logged_at": (np.datetime64(started, "ms") + (offsets * 1000).astype("timedelta64[ms]")),
+            "session_id": np.full(rows, f"bench-{segment}"),
+            "config_version": np.ones(rows, dtype=np.int64),
+            **inputs,
+            "custom_commission": np.full(rows, np.nan),
+            **{name: quotes[name] for name in OUTPUT_COLUMNS},
+            "elapsed_ms": rng.random(rows),
+        }
+        table = pa.table({field.name: pa.array(columns[field.name], type=field.type, from_pandas=True) for field in schema})
+        pq.write_table(table, os.path.join(directory, f"quotes-20260101-000000-0-{segment + 1:04d}.parquet"),
+                       row_group_size=SEGMENT_ROWS // 10)
+
+
+# 분석 페이지 집계 (처음 읽기 / 세그먼트 캐시 사용)
+def run():
+    import analytics
+
+    directory = tempfile.mkdtemp(prefix="hiorder-analytics-")
+    try:
+        write_synthetic_log(directory)
+        rows = SEGMENTS * SEGMENT_ROWS
+
+        def cold():
+            analytics.clear_cache()
+            analytics.summarize(directory)
+
+        return {
+            f"analytics.summarize_cold_{rows}": measure(cold, repeat=3),
+            f"analytics.summarize_cached_{rows}": measure(lambda: analytics.summarize(directory), repeat=20),
+            f"analytics.summarize_month_{rows}": measure(
+                lambda: analytics.summarize(directory, start=202603, end=202603, board_type="15인치"), repeat=20),
+        }
+    finally:
+        analytics.clear_cache()
+        shutil.rmtree(directory, ignore_errors=True)
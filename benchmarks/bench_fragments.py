@@ -0,0 +1,165 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.bench_render import APP_PATH
+from benchmarks.timing import measure
+
+ROOT = os.path.dirname(APP_PATH)
+SERVER_TIMEOUT = 60
+
+# AppTest 는 항상 전체를 다시 실행하므로, 조각 재실행은 실제 Streamlit 서버에 웹소켓으로 붙어
+# 브라우저와 같은 재실행 요청(BackMsg)을 보내 잰다. 요청부터 실행 종료 메시지까지의 시간이다.
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless", "true", "--server.port", str(port),
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env={**os.environ, "HIORDER_QUOTE_LOG_DIR": ""},
+    )
+    deadline = time.monotonic() + SERVER_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Streamlit 서버가 시작되지 않았습니다.")
+
+
+# 브라우저 대신 재실행 요청을 보내는 세션
+# - 그려진 위젯의 ID 와 그 위젯이 속한 조각 ID 를 키(또는 라벨)로 기억한다
+# - 위젯 값은 브라우저처럼 바꾼 값을 모두 모아 매번 보낸다 (버튼은 한 번만)
+class Session:
+    def __init__(self, port):
+        from tornado.ioloop import IOLoop
+
+        self._loop = IOLoop()
+        self._url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self._connection = self._loop.run_sync(self._connect)
+        self.widgets = {}
+        self.fragments = {}
+        self.texts = []
+        self._values = {}
+
+    async def _connect(self):
+        from tornado.websocket import websocket_connect
+
+        return await websocket_connect(self._url, subprotocols=["streamlit"])
+
+    def _remember(self, delta):
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "markdown":
+            self.texts.append(element.markdown.body)
+            return
+        widget = getattr(element, kind, None) if kind else None
+        widget_id = getattr(widget, "id", "")
+        if not widget_id:
+            return
+        name = widget_id.split("-", 2)[-1] if widget_id.startswith("$$ID-") else widget_id
+        for key in (name, getattr(widget, "label", None)):
+            if key:
+                self.widgets[key] = widget_id
+                self.fragments[key] = delta.fragment_id
+
+    async def _rerun(self, states, fragment_id):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        message.rerun_script.widget_states.widgets.extend(states)
+        if fragment_id:
+            message.rerun_script.fragment_id = fragment_id
+        await self._connection.write_message(message.SerializeToString(), binary=True)
+
+        finished = []
+        while True:
+            data = await self._connection.read_message()
+            if data is None:
+                raise RuntimeError("서버 연결이 끊어졌습니다.")
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._remember(forward.delta)
+            elif kind == "script_finished":
+                status = ForwardMsg.ScriptFinishedStatus.Name(forward.script_finished)
+                finished.append(status)
+                if status != "FINISHED_EARLY_FOR_RERUN":
+                    return finished
+
+    # 재실행 한 번 - 반환값은 실행 종료 상태 목록 (조각 재실행이 전체 재실행을 부르면 2개 이상)
+    def rerun(self, fragment_id=None, trigger=None, **values):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        for key, value in values.items():
+            state = WidgetState(id=self.widgets[key])
+            if isinstance(value, bool):
+                state.bool_value = value
+            elif isinstance(value, int):
+                state.int_value = value
+            else:
+                state.double_value = value
+            self._values[key] = state
+        states = list(self._values.values())
+        if trigger is not None:
+            states.append(WidgetState(id=self.widgets[trigger], trigger_value=True))
+        self.texts = []
+        return self._loop.run_sync(lambda: self._rerun(states, fragment_id))
+
+    def close(self):
+        self._connection.close()
+        self._loop.close()
+
+
+# 같은 조작을 전체 재실행 / 조각 재실행으로 보내 비교
+def _compare(session, name, key, values):
+    results = {}
+    toggle = [0]
+
+    def change(fragment_id):
+        toggle[0] += 1
+        statuses = session.rerun(fragment_id, **{key: values[toggle[0] % len(values)]})
+        if fragment_id and statuses[-1] != "FINISHED_FRAGMENT_RUN_SUCCESSFULLY":
+            raise RuntimeError(f"{name}: 조각만 다시 실행되지 않았습니다 ({statuses})")
+
+    results[f"fragments.{name}_full"] = measure(lambda: change(None), repeat=20, warmup=2)
+    results[f"fragments.{name}_fragment"] = measure(lambda: change(session.fragments[key]), repeat=20, warmup=2)
+    return results
+
+
+def run():
+    port = _free_port()
+    process = _start_server(port)
+    session = None
+    try:
+        session = Session(port)
+        session.rerun()
+        session.rerun(trigger="계산하기")
+        session.rerun(custom_commission_checkbox=True)
+
+        results = {}
+        results.update(_compare(session, "custom_commission", "custom_commission_amount_input", [1500000, 1600000]))
+        results.update(_compare(session, "basic_detail", "show_basic_detail", [True, False]))
+        results.update(_compare(session, "store_device_count", "store_device_count_input", [10, 11]))
+        return results
+    finally:
+        if session is not None:
+            session.close()
+        process.terminate()
+        process.wait(timeout=10)
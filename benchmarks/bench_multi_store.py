@@ -0,0 +1,43 @@
+import time
+
+import pandas as pd
+
+from benchmarks.bench_quote import _batch_inputs
+from benchmarks.timing import measure
+from config_store import get_store
+
+# 체인 매장 목록 크기
+STORES = (2000, 20000)
+
+
+# 올린 파일과 같은 CSV 내용
+def _store_csv(rows):
+    return pd.DataFrame(_batch_inputs(rows)).to_csv(index=False).encode("utf-8")
+
+
+# 매장 목록 업로드 → 체인 합계 (스레드 / 프로세스 풀)
+def run():
+    import multi_store
+
+    config = get_store().get()
+    results = {}
+    threshold = multi_store.PROCESS_MIN_ROWS
+    try:
+        for rows in STORES:
+            data = _store_csv(rows)
+            results[f"multi_store.load_{rows}"] = measure(lambda: multi_store.load_stores(data, "stores.csv"), repeat=5)
+            stores = multi_store.load_stores(data, "stores.csv")
+            for executor, process_rows in (("thread", 0), ("process", 1)):
+                multi_store.PROCESS_MIN_ROWS = process_rows
+
+                def quote():
+                    job = multi_store.MultiStoreJob(stores, config, 1)
+                    while not job.done():
+                        time.sleep(0.001)
+                    job.summary()
+
+                # warmup 으로 프로세스 시작 비용은 빠진다
+                results[f"multi_store.quote_{executor}_{rows}"] = measure(quote, repeat=5)
+    finally:
+        multi_store.PROCESS_MIN_ROWS = threshold
+    return results
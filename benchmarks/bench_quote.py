@@ -0,0 +1,58 @@
+import numpy as np
+
+from benchmarks.timing import measure
+from config_store import load_config, thaw
+from impact import impact_summary
+from policies import compare_quotes, get_policy_store
+from pricing import calculate_commission, calculate_lump_sum_devices, calculate_quote, quote_arrays
+from quote_table import get_quote
+from schedule import TERMS, monthly_schedule, schedule_arrays
+
+BATCH_ROWS = 10000
+# 관리자 변경 영향 미리보기 대상 (최근 견적 최대 보관 수)
+IMPACT_ROWS = 50000
+
+
+def _batch_inputs(rows):
+    rng = np.random.default_rng(0)
+    return {
+        "store_device_count": rng.integers(1, 80, rows),
+        "board_type": rng.choice(["15인치", "10인치"], rows),
+        "device_type": rng.choice(["후불형", "선불형"], rows),
+        "use_shinhan": rng.random(rows) < 0.3,
+        "use_tanggua": rng.random(rows) < 0.2,
+        "use_internet_new": rng.random(rows) < 0.1,
+        "use_internet_kt": rng.random(rows) < 0.2,
+    }
+
+
+# 견적 계산 마이크로 벤치마크
+def run():
+    config = load_config()
+    inputs = _batch_inputs(BATCH_ROWS)
+    policies = get_policy_store()
+    policy = policies.effective()
+    impact_inputs = _batch_inputs(IMPACT_ROWS)
+    draft = thaw(config)
+    draft['commission']['basic1'] += 10000
+    quote = get_quote(10, "15인치", "후불형", config, use_shinhan=True)
+    batch_quotes = quote_arrays(inputs, config)
+
+    return {
+        "quote.calculate_commission": measure(
+            lambda: calculate_commission(11, config, True, False, True, True), number=10000),
+        "quote.calculate_lump_sum_devices": measure(
+            lambda: calculate_lump_sum_devices(10, "normal", 1754000, config), number=10000),
+        "quote.calculate_quote": measure(
+            lambda: calculate_quote(10, "15인치", "후불형", config, use_shinhan=True), number=10000),
+        "quote.get_quote": measure(
+            lambda: get_quote(10, "15인치", "후불형", config, use_shinhan=True), number=10000),
+        f"quote.quote_arrays_{BATCH_ROWS}": measure(lambda: quote_arrays(inputs, config), number=5),
+        "quote.policy_effective": measure(lambda: policies.effective("2026-05-01"), number=10000),
+        "quote.policy_quote": measure(
+            lambda: policy.quote(10, "15인치", "후불형", use_shinhan=True), number=10000),
+        f"quote.compare_quotes_{BATCH_ROWS}": measure(lambda: compare_quotes(inputs, config, policy.config), number=5),
+        f"quote.impact_summary_{IMPACT_ROWS}": measure(lambda: impact_summary(impact_inputs, config, draft), number=5),
+        "quote.monthly_schedule_60": measure(lambda: list(monthly_schedule(quote, 60)), number=1000),
+        f"quote.schedule_arrays_{BATCH_ROWS}": measure(lambda: schedule_arrays(batch_quotes, TERMS), number=5),
+    }
@@ -0,0 +1,82 @@
+import os
+
+from benchmarks.timing import measure
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+ADMIN_CODE_KEY = "admin_code"
+
+
+def _button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+
+def _new_app():
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(APP_PATH, default_timeout=30).run()
+
+
+def _calculated(at):
+    _button(at, "계산하기").click().run()
+    return at
+
+
+def setup_main_initial():
+    return _new_app()
+
+
+def setup_main_result():
+    return _calculated(_new_app())
+
+
+def setup_main_custom():
+    at = _calculated(_new_app())
+    at.checkbox(key="custom_commission_checkbox").check().run()
+    at.number_input(key="custom_commission_amount_input").set_value(1500000).run()
+    return at
+
+
+def _expanded(at):
+    at.toggle(key="show_basic_detail").set_value(True).run()
+    if "show_custom_detail" in [toggle.key for toggle in at.toggle]:
+        at.toggle(key="show_custom_detail").set_value(True).run()
+    return at
+
+
+def setup_main_result_expanded():
+    return _expanded(setup_main_result())
+
+
+def setup_main_custom_expanded():
+    return _expanded(setup_main_custom())
+
+
+def setup_admin():
+    from config_store import load_config
+
+    at = _new_app()
+    _button(at, "⚙️ 관리자").click().run()
+    at.text_input[0].set_value(load_config()[ADMIN_CODE_KEY]).run()
+    return at
+
+
+# 페이지 상태별 main() 재실행 시나리오 (자세히 보기 접힘/펼침)
+SCENARIOS = {
+    "render.main_initial": setup_main_initial,
+    "render.main_result": setup_main_result,
+    "render.main_result_expanded": setup_main_result_expanded,
+    "render.main_custom": setup_main_custom,
+    "render.main_custom_expanded": setup_main_custom_expanded,
+    "render.admin": setup_admin,
+}
+
+
+# AppTest 로 각 상태에서 main() 재실행 시간을 측정
+def run(repeat=20):
+    results = {}
+    for name, setup in SCENARIOS.items():
+        at = setup()
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].message}")
+        results[name] = measure(at.run, repeat=repeat, warmup=2)
+    return results
@@ -0,0 +1,81 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_PATH = os.path.join(ROOT, "benchmarks", "results", "importtime.json")
+TOP_MODULES = 25
+
+
+# python -X importtime 출력 → {모듈: (self_us, cumulative_us, depth)}
+def parse_importtime(stderr):
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def _import_once(module):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+# 새 프로세스에서 반복 import 하여 모듈별 누적 시간 중앙값을 구한다
+def profile(module="app", repeat=5):
+    runs = [_import_once(module) for _ in range(repeat)]
+    names = set().union(*runs)
+    cumulative = {
+        name: statistics.median(run[name][1] for run in runs if name in run) / 1000
+        for name in names
+    }
+    top_level = sorted(
+        (name for name in names if runs[0].get(name, (0, 0, 99))[2] <= 1),
+        key=lambda name: -cumulative[name],
+    )
+    totals = sorted(run[module][1] / 1000 for run in runs)
+    return {
+        "module": module,
+        "repeat": repeat,
+        "total_ms": statistics.median(totals),
+        "min_ms": totals[0],
+        "modules_loaded": len(names),
+        "heavy_loaded": {name: name in names for name in ("pandas", "pyarrow", "jinja2", "altair")},
+        "top_level_ms": {name: round(cumulative[name], 2) for name in top_level[:TOP_MODULES]},
+    }
+
+
+# report_path 를 주면 모듈별 보고서도 저장한다 (benchmarks.run 에서는 결과 파일에만 기록)
+def run(repeat=5, report_path=None):
+    report = profile("app", repeat)
+    if report_path:
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return {
+        "startup.import_app": {
+            "median_ms": report["total_ms"],
+            "p90_ms": report["total_ms"],
+            "min_ms": report["min_ms"],
+            "repeat": repeat,
+            "number": 1,
+        }
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="app.py import 시간 보고서")
+    parser.add_argument("--output", default=REPORT_PATH, help="보고서 저장 경로 (기본: benchmarks/results/importtime.json)")
+    args = parser.parse_args()
+    result = run(report_path=args.output)["startup.import_app"]
+    print(f"import app: {result['median_ms']:.1f}ms (최소 {result['min_ms']:.1f}ms) → {os.path.relpath(args.output, ROOT)}")
@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+
+from benchmarks.bench_render import APP_PATH, _button
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(ROOT, "benchmarks", "results", "load.json")
+
+# AppTest 는 실행할 때마다 프로세스 전역 Runtime 을 교체하므로 재실행은 한 번에 하나씩만 가능하다.
+# Streamlit 서버도 GIL 때문에 계산 위주의 재실행은 사실상 하나씩 처리되므로,
+# 대기 시간을 포함한 지연 시간은 레플리카 하나가 버티는 세션 수를 가늠하는 데 쓸 수 있다.
+# (웹소켓/protobuf 전송 비용은 포함되지 않으므로 실제보다 약간 낙관적인 값)
+_run_lock = threading.Lock()
+_current_session = ["load-test"]
+
+BOARD_OPTIONS = ["15인치", "10인치"]
+DEVICE_OPTIONS = ["후불형", "선불형"]
+OPTION_CHECKBOXES = ["use_shinhan_checkbox", "use_tanggua_checkbox", "use_internet_new_checkbox", "use_internet_kt_checkbox"]
+
+
+# 가상 사용자마다 다른 세션 ID 로 실행되도록 AppTest 의 고정 세션 ID 를 바꾼다
+def _patch_session_ids():
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    if getattr(LocalScriptRunner, "_load_test_patched", False):
+        return
+    original = LocalScriptRunner.__init__
+
+    def __init__(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        self._session_id = _current_session[0]
+
+    LocalScriptRunner.__init__ = __init__
+    LocalScriptRunner._load_test_patched = True
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        # /proc 이 없으면 최대 사용량으로 대신한다 (리눅스 KB, macOS 바이트)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+# 가상 사용자 한 명 - 화면 조작 → 재실행을 반복한다
+class VirtualUser:
+    def __init__(self, session_id, rng):
+        self.session_id = session_id
+        self.rng = rng
+        self.at = None
+        self.latencies = []
+        self.service_times = []
+        self.errors = 0
+
+    def _rerun(self, interact=None):
+        requested = time.perf_counter()
+        with _run_lock:
+            _current_session[0] = self.session_id
+            started = time.perf_counter()
+            if self.at is None:
+                from streamlit.testing.v1 import AppTest
+
+                self.at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+            else:
+                interact(self.at)
+                self.at.run()
+            finished = time.perf_counter()
+        self.latencies.append(finished - requested)
+        self.service_times.append(finished - started)
+        if self.at.exception:
+            self.errors += 1
+
+    # 현재 화면에서 가능한 조작 하나를 고른다
+    def _next_action(self):
+        rng = self.rng
+        calculated = "custom_commission_checkbox" in [checkbox.key for checkbox in self.at.checkbox]
+        actions = [
+            lambda at: at.radio(key="board_type_radio").set_value(rng.choice(BOARD_OPTIONS)),
+            lambda at: at.radio(key="device_type_radio").set_value(rng.choice(DEVICE_OPTIONS)),
+            lambda at: at.number_input(key="store_device_count_input").set_value(rng.randint(1, 60)),
+            lambda at: at.checkbox(key=rng.choice(OPTION_CHECKBOXES)).set_value(rng.random() < 0.5),
+            lambda at: _button(at, "계산하기").click(),
+            lambda at: _button(at, "계산하기").click(),
+        ]
+        if calculated:
+            actions.append(lambda at: at.checkbox(key="custom_commission_checkbox").set_value(rng.random() < 0.5))
+        return rng.choice(actions)
+
+    def run(self, deadline, think_seconds):
+        self._rerun()
+        while time.perf_counter() < deadline:
+            # 사람이 화면을 보는 시간 (평균 think_seconds 인 지수분포)
+            time.sleep(self.rng.expovariate(1 / think_seconds) if think_seconds > 0 else 0)
+            if time.perf_counter() >= deadline:
+                break
+            self._rerun(self._next_action())
+
+
+# 동시 사용자 수 하나에 대한 부하 측정
+def run_level(users, duration, think_seconds, seed):
+    from sessions import registry
+
+    rss_before = rss_mb()
+    deadline = time.perf_counter() + duration
+    virtual_users = [VirtualUser(f"load-{users}-{i}", random.Random(seed * 1000 + i)) for i in range(users)]
+    threads = [threading.Thread(target=user.run, args=(deadline, think_seconds)) for user in virtual_users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = [value for user in virtual_users for value in user.latencies]
+    service_times = [value for user in virtual_users for value in user.service_times]
+    summary = registry.summary()
+    return {
+        "users": users,
+        "reruns": len(latencies),
+        "reruns_per_sec": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "service_p50_ms": statistics.median(service_times) * 1000,
+        "errors": sum(user.errors for user in virtual_users),
+        "rss_mb": rss_mb(),
+        "rss_growth_mb": rss_mb() - rss_before,
+        "session_state_kb": summary["state_bytes"] / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="동시 사용자 수를 늘려 가며 재실행 지연 시간을 측정합니다.")
+    parser.add_argument("--users", default="1,2,4,8,16", help="동시 사용자 수 목록 (기본: 1,2,4,8,16)")
+    parser.add_argument("--duration", type=float, default=20, help="단계별 측정 시간(초) (기본: 20)")
+    parser.add_argument("--think", type=float, default=1.0, help="조작 사이 평균 대기 시간(초) (기본: 1.0)")
+    parser.add_argument("--slo-ms", type=float, default=1000, help="p99 허용 지연 시간(ms) (기본: 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=RESULTS_PATH, help="결과 저장 경로")
+    args = parser.parse_args(argv)
+
+    # 설정 파일 등 상대 경로 기준을 저장소 루트로 맞춘다
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    _patch_session_ids()
+    # 첫 실행의 import 비용이 첫 단계에 섞이지 않도록 미리 한 번 실행
+    VirtualUser("load-warmup", random.Random(args.seed))._rerun()
+
+    levels = []
+    print(f"{'사용자':>6} {'재실행/초':>10} {'p50(ms)':>10} {'p99(ms)':>10} {'처리(ms)':>10} {'RSS(MB)':>10} {'증가(MB)':>10} {'오류':>6}")
+    for users in [int(value) for value in args.users.split(",")]:
+        level = run_level(users, args.duration, args.think, args.seed)
+        levels.append(level)
+        print(f"{level['users']:>6} {level['reruns_per_sec']:>10.1f} {level['p50_ms']:>10.1f} {level['p99_ms']:>10.1f} "
+              f"{level['service_p50_ms']:>10.1f} {level['rss_mb']:>10.1f} {level['rss_growth_mb']:>+10.1f} {level['errors']:>6}")
+
+    # p99 가 처음 허용치를 넘기 직전 단계
+    capacity = None
+    for level in levels:
+        if level["p99_ms"] > args.slo_ms:
+            break
+        capacity = level["users"]
+    if capacity is None:
+        print(f"가장 작은 단계도 p99 {args.slo_ms:,.0f}ms 를 넘었습니다.")
+    elif capacity == levels[-1]["users"]:
+        print(f"측정한 모든 단계가 p99 {args.slo_ms:,.0f}ms 이내입니다. 더 큰 --users 로 다시 측정하세요.")
+    else:
+        print(f"p99 {args.slo_ms:,.0f}ms 이내 최대 동시 사용자: {capacity}명")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"think_seconds": args.think, "duration": args.duration, "slo_ms": args.slo_ms, "levels": levels},
+                  f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {os.path.relpath(args.output, ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SUITES = ["quote", "render", "startup", "analytics", "multi_store", "fragments"]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suites(suites):
+    results = {}
+    if "quote" in suites:
+        from benchmarks import bench_quote
+        results.update(bench_quote.run())
+    if "render" in suites:
+        from benchmarks import bench_render
+        results.update(bench_render.run())
+    if "startup" in suites:
+        from benchmarks import importtime
+        results.update(importtime.run())
+    if "analytics" in suites:
+        from benchmarks import bench_analytics
+        results.update(bench_analytics.run())
+    if "multi_store" in suites:
+        from benchmarks import bench_multi_store
+        results.update(bench_multi_store.run())
+    if "fragments" in suites:
+        from benchmarks import bench_fragments
+        results.update(bench_fragments.run())
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+# 기준 결과와 비교 - 최소값이 threshold 이상 느려진 항목 목록 반환
+# 중앙값은 다른 프로세스 부하에 따라 흔들려서, 방해가 가장 적었던 실행(최소값)끼리 비교한다
+def compare(current, baseline, threshold, key="min_ms"):
+    regressions = []
+    print(f"{'항목':<40} {'기준(ms)':>12} {'현재(ms)':>12} {'변화':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<40} {'-':>12} {result[key]:>12.4f} {'신규':>8}")
+            continue
+        change = result[key] / base[key] - 1
+        marker = " !" if change > threshold else ""
+        print(f"{name:<40} {base[key]:>12.4f} {result[key]:>12.4f} {change:>+8.1%}{marker}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="견적 계산/페이지 렌더링 벤치마크")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="실행할 묶음 (기본: 전체)")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"), help="결과 저장 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 기준(baseline.json)으로 저장")
+    parser.add_argument("--compare", nargs="?", const=os.path.join(RESULTS_DIR, "baseline.json"),
+                        help="기준 결과와 비교 (기본: benchmarks/results/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="느려짐으로 판단할 비율 (기본: 0.2)")
+    args = parser.parse_args(argv)
+
+    # 설정 파일 등 상대 경로 기준을 저장소 루트로 맞춘다
+    os.chdir(ROOT)
+    current = run_suites(args.suite or SUITES)
+
+    output = os.path.join(RESULTS_DIR, "baseline.json") if args.save_baseline else args.output
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {os.path.relpath(output, ROOT)}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"느려진 항목 {len(regressions)}개: {', '.join(regressions)}")
+            return 1
+    else:
+        for name, result in current["results"].items():
+            print(f"{name:<40} {result['median_ms']:>12.4f}ms (p90 {result['p90_ms']:.4f}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
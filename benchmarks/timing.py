@@ -0,0 +1,24 @@
+import statistics
+import time
+
+
+# 호출 1회 시간 측정 (반복 측정 후 통계)
+def measure(func, repeat=20, number=1, warmup=1):
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "p90_ms": samples[min(len(samples) - 1, int(len(samples) * 0.9))] * 1000,
+        "min_ms": samples[0] * 1000,
+        "repeat": repeat,
+        "number": number,
+    }
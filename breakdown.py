@@ -0,0 +1,156 @@
+import os
+
+import jinja2
+
+from pricing import DEVICE_KEYS
+from quote_cache import cached
+from quote_table import get_quote
+from schedule import TERMS, contract_totals, term_note
+from tiers import tier_index
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# 이 행 수 이하의 표는 pandas 없이 마크다운 표로 그린다
+SMALL_TABLE_ROWS = 20
+
+# 템플릿은 프로세스당 한 번만 컴파일한다
+_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+)
+_env.filters["comma"] = lambda value: f"{value:,}"
+_env.filters["won"] = lambda value: f"{value:,.0f}"
+_macros = _env.get_template("breakdown.md.j2").module
+
+
+# 견적서 등 다른 템플릿도 같은 필터(comma, won)로 렌더링
+def get_template(name):
+    return _env.get_template(name)
+
+
+def _lump_sum_price(inputs, config):
+    return config['prices']['store_device'][DEVICE_KEYS[inputs["device_type"]]]['lump_sum']
+
+
+# 수수료 항목 (이름, 금액) - 화면 표와 견적서가 같이 쓴다
+def commission_items(q, inputs, config):
+    fees = config['commission']
+    total_devices = q["total_devices"]
+    items = [("기본 수수료", total_devices * (fees['basic1'] + fees['basic2']))]
+
+    # 구간별 추가 수수료
+    tiers = tier_index(config)
+    range_bonus = tiers.amount(total_devices)
+    range_text = tiers.label(total_devices)
+    if range_bonus > 0:
+        items.append((f"구간별 보너스 ({range_text})", range_bonus))
+
+    if inputs["use_shinhan"]:
+        items.append(("신한은행 주거래 보너스", fees['shinhan_bonus']))
+    if inputs["use_tanggua"]:
+        items.append(("땡겨요 앱 설치 보너스", fees['tanggua_bonus']))
+    if inputs["use_internet_new"]:
+        items.append(("인터넷 신규 신청 보너스", fees['internet_new']))
+        items.append(("KT 인터넷 기본 수수료", fees['internet_kt']))
+    elif inputs["use_internet_kt"]:
+        items.append(("기존 KT 인터넷 보너스", fees['internet_kt']))
+
+    items.append(("총 수수료", q['commission']))
+    return items
+
+
+# 약정 기간별 총 비용 (기간, 총액, 설명)
+def term_totals(q):
+    return [(term, total, term_note(term)) for term, total in contract_totals(q, TERMS).items()]
+
+
+def commission_rows(q, inputs, config):
+    return ["구분", "금액"], [[label, f"`{amount:,}`원"] for label, amount in commission_items(q, inputs, config)]
+
+
+# 월 비용 항목 (이름, 계산식, 금액) - 할인은 음수
+def monthly_items(q, inputs, config):
+    items = [
+        ("1. 월 서비스 이용료", f"`{config['service_fee']:,}`원 × `{q['total_devices']}`대", q['monthly_service_fee']),
+        ("2. 알림판 할부금", f"{inputs['board_type']} 할부금 (`{q['board_monthly']:,}`원)", q['board_monthly']),
+        ("3. 매장용 기기 할부금", f"`{q['device_monthly']:,}`원 × `{q['remaining_devices']}`대", q['store_device_monthly']),
+        ("4. 부가세 10%", "(1 + 2 + 3) × 0.1", q['total_monthly'] * 0.1),
+    ]
+    if q["internet_discount"] > 0:
+        items.append(("5. 인터넷 결합 할인", "월 고정 할인", -q['internet_discount']))
+    items.append(("월 총액", "(1 + 2 + 3) × 1.1 - 5", q['final_monthly']))
+    return items
+
+
+def monthly_rows(q, inputs, config):
+    rows = [
+        [label, formula, f"-`{-amount:,.0f}`원" if amount < 0 else f"`{amount:,.0f}`원"]
+        for label, formula, amount in monthly_items(q, inputs, config)
+    ]
+    return ["구분", "계산식", "금액"], rows
+
+
+def markdown_table(header, rows):
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    lines += ["| " + " | ".join(str(cell) for cell in row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+# 작은 표는 마크다운 블록, 큰 표만 st.table 블록
+def _table(header_rows):
+    header, rows = header_rows
+    if len(rows) <= SMALL_TABLE_ROWS:
+        return ("markdown", markdown_table(header, rows))
+    return ("table", (header, rows))
+
+
+# 기본 계산 자세히 보기 내용 (블록 목록)
+def basic_breakdown(inputs, config, version):
+    def build(inputs):
+        q = get_quote(config=config, **inputs)
+        lump_sum_price = _lump_sum_price(inputs, config)
+        return (
+            ("info", "이 섹션은 기본 계산 방식으로 산출된 결과를 상세하게 보여줍니다."),
+            ("markdown", _macros.basic_info(q, inputs) + "\n" + _macros.basic_commission(q, config['commission'])),
+            _table(commission_rows(q, inputs, config)),
+            ("markdown", _macros.lump_sum(q, inputs, lump_sum_price)),
+            _table(monthly_rows(q, inputs, config)),
+            ("markdown", _macros.per_device(q, lump_sum_price, term_totals(q))),
+        )
+
+    return cached("basic_breakdown", inputs, version, build)
+
+
+# 수수료별도적용 자세히 보기 내용 (블록 목록)
+def custom_breakdown(inputs, custom_commission, config, version):
+    def build(inputs):
+        original = get_quote(config=config, **inputs)
+        q = get_quote(config=config, custom_commission=custom_commission, **inputs)
+        lump_sum_price = _lump_sum_price(inputs, config)
+        suffix = " (수수료별도적용)"
+        return (
+            ("info", "이 섹션은 사용자가 직접 설정한 수수료 금액으로 계산한 결과를 보여줍니다."),
+            ("markdown", _macros.basic_info(q, inputs, suffix) + "\n" + _macros.custom_commission(q, original)),
+            ("markdown", _macros.lump_sum(q, inputs, lump_sum_price, suffix, original)),
+            _table(monthly_rows(q, inputs, config)),
+            ("markdown", _macros.per_device(q, lump_sum_price, term_totals(q), suffix, original)),
+        )
+
+    return cached("custom_breakdown", inputs, version, build, custom_commission)
+
+
+def render(blocks):
+    import streamlit as st
+
+    for kind, content in blocks:
+        if kind == "info":
+            st.info(content)
+        elif kind == "markdown":
+            st.markdown(content)
+        else:
+            import pandas as pd
+
+            header, rows = content
+            st.table(pd.DataFrame(rows, columns=header))
@@ -0,0 +1,192 @@
+import argparse
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from config_store import ConfigStore
+from policies import POLICY_PATH, PolicyStore, compare_quotes
+from pricing import BOARD_KEYS, DEVICE_KEYS, INPUT_COLUMNS, OUTPUT_COLUMNS, quote_arrays
+
+BOOL_COLUMNS = ["use_shinhan", "use_tanggua", "use_internet_new", "use_internet_kt"]
+INPUT_TYPES = {
+    "store_device_count": pa.int64(),
+    "board_type": pa.string(),
+    "device_type": pa.string(),
+    "custom_commission": pa.float64(),
+    **{name: pa.bool_() for name in BOOL_COLUMNS},
+}
+FLOAT_COLUMNS = ["total_monthly_with_tax", "final_monthly", "per_device_monthly", "per_device_tax_excluded"]
+# 비교 정책으로 다시 계산한 값 (--compare-date)
+COMPARE_COLUMNS = ["compare_commission", "compare_per_device_tax_excluded", "commission_change", "per_device_change"]
+
+
+def _file_format(path, explicit):
+    if explicit:
+        return explicit
+    return "parquet" if os.path.splitext(path)[1].lower() in (".parquet", ".pq") else "csv"
+
+
+# 입력 파일을 RecordBatch 단위로 읽는다
+def iter_batches(path, file_format, chunk_rows):
+    if file_format == "parquet":
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        yield parquet_file.schema_arrow
+        yield from parquet_file.iter_batches(batch_size=chunk_rows)
+        return
+
+    # CSV 는 블록 크기로 나눠 읽는다 (행 길이를 대략 64바이트로 가정)
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=max(chunk_rows * 64, 1 << 20)),
+        # 빈 칸은 null 로 읽어 기본값을 채운다 (문자열 컬럼도 "" 가 아니라 null)
+        convert_options=pacsv.ConvertOptions(column_types=INPUT_TYPES, strings_can_be_null=True),
+    )
+    yield reader.schema
+    yield from reader
+
+
+def output_schema(input_schema, compare=False):
+    # 수수료 직접 지정 컬럼이 있으면 수수료 관련 값이 실수가 될 수 있다
+    custom = "custom_commission" in input_schema.names
+    fields = list(input_schema)
+    for name in OUTPUT_COLUMNS + (COMPARE_COLUMNS if compare else []):
+        if name in FLOAT_COLUMNS or "per_device" in name or (custom and "commission" in name):
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.int64()))
+    return pa.schema(fields)
+
+
+# 잘못된 입력 행 확인 - 처음 걸린 행 번호(파일 기준, 1부터)와 컬럼을 알려준다
+def _check_rows(name, invalid, first_row, message):
+    if invalid.any():
+        row = first_row + int(np.flatnonzero(invalid)[0])
+        raise ValueError(f"{row}번째 행: {name} {message}")
+
+
+# first_row: 이 묶음의 첫 행 번호 (파일 기준, 1부터)
+def quote_batch(batch, config, schema, compare_config=None, first_row=1):
+    inputs = {}
+    for name in INPUT_COLUMNS:
+        if name not in batch.schema.names:
+            continue
+        column = batch.column(name)
+        if name in BOOL_COLUMNS or name in ("board_type", "device_type"):
+            column = column.fill_null(INPUT_COLUMNS[name])
+        elif name == "store_device_count":
+            _check_rows(name, column.is_null().to_numpy(zero_copy_only=False), first_row, "값이 비어 있습니다.")
+        inputs[name] = column.to_numpy(zero_copy_only=False)
+        if name == "store_device_count":
+            _check_rows(name, inputs[name] < 1, first_row, "는 1 이상이어야 합니다.")
+    for name, keys in (("board_type", BOARD_KEYS), ("device_type", DEVICE_KEYS)):
+        if name in inputs:
+            _check_rows(name, ~np.isin(inputs[name], list(keys)), first_row,
+                        f"값을 알 수 없습니다. ({', '.join(label for label in keys if label != keys[label])} 중 하나)")
+    if "custom_commission" in inputs:
+        inputs["custom_commission"] = inputs["custom_commission"].astype(np.float64)
+        # NaN(빈 칸)은 정책 수수료
+        _check_rows("custom_commission", inputs["custom_commission"] < 0, first_row, "은 0 이상이어야 합니다.")
+
+    if compare_config is None:
+        result = quote_arrays(inputs, config)
+    else:
+        comparison = compare_quotes(inputs, config, compare_config)
+        result = dict(comparison["base"])
+        result["compare_commission"] = comparison["other"]["commission"]
+        result["compare_per_device_tax_excluded"] = comparison["other"]["per_device_tax_excluded"]
+        result["commission_change"] = comparison["commission_change"]
+        result["per_device_change"] = comparison["per_device_change"]
+    names = schema.names[batch.num_columns:]
+    arrays = list(batch.columns) + [pa.array(result[name], type=schema.field(name).type) for name in names]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _Writer:
+    def __init__(self, path, file_format, schema):
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(path, schema)
+        else:
+            self._writer = pacsv.CSVWriter(path, schema)
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # 리눅스는 KB, macOS 는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run(input_path, output_path, config, input_format=None, output_format=None, chunk_rows=100000,
+        compare_config=None):
+    batches = iter_batches(input_path, _file_format(input_path, input_format), chunk_rows)
+    input_schema = next(batches)
+    if "store_device_count" not in input_schema.names:
+        raise ValueError("입력 파일에 store_device_count 컬럼이 필요합니다.")
+
+    schema = output_schema(input_schema, compare=compare_config is not None)
+    writer = _Writer(output_path, _file_format(output_path, output_format), schema)
+    rows = 0
+    started = time.perf_counter()
+    try:
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            writer.write(quote_batch(batch, config, schema, compare_config, first_row=rows + 1))
+            rows += batch.num_rows
+    except BaseException:
+        # 중간에 실패하면 일부만 쓴 출력 파일을 남기지 않는다
+        writer.close()
+        os.remove(output_path)
+        raise
+    writer.close()
+    return rows, time.perf_counter() - started
+
+
+def _policy_config(path, date):
+    policy = PolicyStore(path).effective(date)
+    if policy is None:
+        raise ValueError(f"{date} 에 적용되는 정책이 없습니다.")
+    print(f"{date}: {policy.label} (적용 시작 {policy.effective_from.isoformat()})", file=sys.stderr)
+    return policy.config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="리드 파일(CSV/Parquet)의 견적을 일괄 계산합니다.")
+    parser.add_argument("input", help="입력 파일 (.csv 또는 .parquet)")
+    parser.add_argument("output", help="출력 파일 (.csv 또는 .parquet)")
+    parser.add_argument("--config", default="config.json", help="정책 설정 파일 (기본: config.json)")
+    parser.add_argument("--input-format", choices=["csv", "parquet"], help="입력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--output-format", choices=["csv", "parquet"], help="출력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--chunk-rows", type=int, default=100000, help="한 번에 처리할 행 수 (기본: 100000)")
+    parser.add_argument("--policies", default=POLICY_PATH, help="정책 이력 파일 (기본: policies.jsonl)")
+    parser.add_argument("--policy-date", help="이 날짜(YYYY-MM-DD)에 적용되는 정책으로 계산 (기본: --config)")
+    parser.add_argument("--compare-date", help="이 날짜의 정책으로도 계산해 비교 컬럼 추가")
+    args = parser.parse_args(argv)
+
+    try:
+        config = ConfigStore(args.config).get() if args.policy_date is None else _policy_config(args.policies, args.policy_date)
+        compare_config = None if args.compare_date is None else _policy_config(args.policies, args.compare_date)
+        rows, elapsed = run(args.input, args.output, config, args.input_format, args.output_format, args.chunk_rows,
+                            compare_config)
+    except (OSError, ValueError, KeyError, pa.ArrowInvalid) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"{rows:,}행 처리, {elapsed:,.2f}초 ({rate:,.0f}행/초), 최대 메모리 {peak_rss_mb():,.1f}MB", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
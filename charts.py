@@ -0,0 +1,97 @@
+import altair as alt
+
+
+# 수수료별 기기당 월 예상 금액 계단형 차트 (현재 적용 수수료 표시)
+# 수수료 금액을 바꿀 때마다 다시 그리므로 Altair 객체(생성/검증에 수십 ms) 대신 Vega-Lite 명세를 바로 만든다
+def commission_sweep_chart(sweep, current_commission):
+    rows = [
+        {
+            "수수료": int(commission),
+            "기기당 월 예상 금액": round(float(price)),
+            "일시불 처리 대수": int(devices),
+            "잔여 수수료": int(remaining),
+            "구간 시작": bool(is_breakpoint),
+        }
+        for commission, price, devices, remaining, is_breakpoint in zip(
+            sweep["custom_commission"],
+            sweep["per_device_tax_excluded"],
+            sweep["actual_devices"],
+            sweep["remaining_commission"],
+            sweep["is_breakpoint"],
+        )
+    ]
+    tooltip = [
+        {"field": "수수료", "type": "quantitative", "format": ","},
+        {"field": "기기당 월 예상 금액", "type": "quantitative", "format": ","},
+        {"field": "일시불 처리 대수", "type": "quantitative"},
+        {"field": "잔여 수수료", "type": "quantitative", "format": ","},
+    ]
+    x = {"field": "수수료", "type": "quantitative"}
+    y = {"field": "기기당 월 예상 금액", "type": "quantitative"}
+    return {
+        "data": {"values": rows},
+        "height": 220,
+        "layer": [
+            {
+                "mark": {"type": "line", "interpolate": "step-after"},
+                "encoding": {
+                    "x": {**x, "axis": {"format": "~s", "title": "수수료(원)"}},
+                    "y": {**y, "scale": {"zero": False}, "axis": {"format": ",", "title": "기기당 월(부가세별도)"}},
+                },
+            },
+            # 일시불 처리 대수가 바뀌는 지점만 점으로 표시
+            {
+                "transform": [{"filter": {"field": "구간 시작", "equal": True}}],
+                "mark": {"type": "point", "filled": True, "size": 30},
+                "encoding": {"x": x, "y": y, "tooltip": tooltip},
+            },
+            {
+                "data": {"values": [{"수수료": int(current_commission)}]},
+                "mark": {"type": "rule", "color": "rgb(0, 113, 255)", "strokeDash": [4, 4]},
+                "encoding": {"x": x},
+            },
+        ],
+    }
+
+
+# 기기당 월 예상 금액 변동 분포 (numpy 로 미리 나눈 구간별 건수)
+def impact_histogram_chart(counts, edges):
+    rows = [
+        {"시작": float(low), "끝": float(high), "건수": int(count)}
+        for count, low, high in zip(counts, edges[:-1], edges[1:])
+    ]
+    return alt.Chart(alt.Data(values=rows)).mark_bar().encode(
+        x=alt.X("시작:Q", axis=alt.Axis(format=",", title="기기당 월 변동(원, 부가세별도)")),
+        x2="끝:Q",
+        y=alt.Y("건수:Q", axis=alt.Axis(format=",", title="견적 수")),
+        tooltip=[
+            alt.Tooltip("시작:Q", format=",.0f"),
+            alt.Tooltip("끝:Q", format=",.0f"),
+            alt.Tooltip("건수:Q", format=","),
+        ],
+    ).properties(height=200)
+
+
+# 월별 추이 (컬럼 여러 개를 한 차트에 선으로)
+def monthly_chart(rows, series, value_title, value_format=","):
+    data = [
+        {"월": row["month"], "항목": name, "값": float(row[column])}
+        for row in rows
+        for column, name in series.items()
+    ]
+    return alt.Chart(alt.Data(values=data)).mark_line(point=True).encode(
+        x=alt.X("월:O", axis=alt.Axis(title=None, labelAngle=0)),
+        y=alt.Y("값:Q", scale=alt.Scale(zero=False), axis=alt.Axis(format=value_format, title=value_title)),
+        color=alt.Color("항목:N", legend=alt.Legend(title=None, orient="bottom")),
+        tooltip=[alt.Tooltip("월:O"), alt.Tooltip("항목:N"), alt.Tooltip("값:Q", format=value_format)],
+    ).properties(height=220)
+
+
+# 테이블 수별 견적 건수
+def device_distribution_chart(devices):
+    data = [{"테이블 수": int(count), "건수": int(quotes)} for count, quotes in devices.items()]
+    return alt.Chart(alt.Data(values=data)).mark_bar().encode(
+        x=alt.X("테이블 수:Q", bin=alt.Bin(step=1), axis=alt.Axis(title="테이블 수(대)")),
+        y=alt.Y("sum(건수):Q", axis=alt.Axis(format=",", title="견적 수")),
+        tooltip=[alt.Tooltip("테이블 수:Q", bin=alt.Bin(step=1)), alt.Tooltip("sum(건수):Q", format=",", title="건수")],
+    ).properties(height=220)
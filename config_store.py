@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+from types import MappingProxyType
+
+from metrics import CONFIG_LOAD_SECONDS, CONFIG_RELOADS, CONFIG_SAVE_SECONDS, registry as metrics_registry
+
+CONFIG_PATH = 'config.json'
+
+
+# 중첩 dict/list → 읽기 전용 스냅샷 (세션 간 공유)
+def freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+# 읽기 전용 스냅샷 → 수정 가능한 dict/list (관리자 페이지 편집용)
+def thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+# 프로세스 전역 설정 캐시
+# - 파일이 바뀌었을 때만 다시 읽고 파싱한다 (watchdog 감시, 없으면 mtime 비교)
+# - 다시 읽을 때마다 version 이 1씩 올라간다
+class ConfigStore:
+    def __init__(self, path=CONFIG_PATH):
+        self.path = os.path.abspath(path)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = 0
+        self._mtime = None
+        self._stale = True
+        self._observer = None
+        self._listeners = []
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    # watchdog 으로 설정 파일 변경 감시 (설치되지 않았으면 mtime 비교로 대체)
+    def _start_watcher(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return
+
+        store = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ('opened', 'closed_no_write'):
+                    return
+                paths = [getattr(event, 'src_path', None), getattr(event, 'dest_path', None)]
+                if store.path in [os.path.abspath(p) for p in paths if p]:
+                    store.invalidate()
+
+        observer = Observer()
+        observer.daemon = True
+        try:
+            observer.schedule(_Handler(), os.path.dirname(self.path), recursive=False)
+            observer.start()
+        except OSError:
+            return
+        self._observer = observer
+
+    # 파일 내용이 실제로 바뀐 경우에만 다시 읽도록 표시
+    def invalidate(self):
+        if self._file_mtime() != self._mtime:
+            self._stale = True
+
+    # 설정 변경 시 호출할 함수 등록 (callback(snapshot, version))
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+        if self._snapshot is not None:
+            callback(self._snapshot, self._version)
+
+    def _publish(self, raw, reason):
+        self._snapshot = freeze(raw)
+        self._version += 1
+        CONFIG_RELOADS.inc(reason=reason)
+        self._stale = False
+        for callback in list(self._listeners):
+            callback(self._snapshot, self._version)
+
+    def _needs_reload(self):
+        if self._snapshot is None or self._stale:
+            return True
+        # 감시가 불가능한 환경에서는 mtime 비교
+        return self._observer is None and self._file_mtime() != self._mtime
+
+    def get(self):
+        if self._needs_reload():
+            with self._lock:
+                if self._needs_reload():
+                    if self._observer is None and self._snapshot is None:
+                        self._start_watcher()
+                    # 파싱 도중 파일이 바뀌면 다음 호출에서 다시 읽도록 mtime 을 먼저 기록
+                    self._mtime = self._file_mtime()
+                    self._stale = False
+                    try:
+                        with open(self.path, 'r', encoding='utf-8') as f:
+                            raw = json.load(f)
+                    except json.JSONDecodeError:
+                        # 쓰는 도중인 파일을 읽은 경우 이전 스냅샷을 유지하고 다음 호출에서 재시도
+                        if self._snapshot is None:
+                            raise
+                        self._stale = True
+                        return self._snapshot
+                    self._publish(raw, "reload")
+        return self._snapshot
+
+    @property
+    def version(self):
+        self.get()
+        return self._version
+
+    def save(self, config):
+        raw = thaw(config)
+        with self._lock:
+            # 도커에서는 config.json 파일 자체가 마운트되므로 교체하지 않고 그 자리에 쓴다
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(raw, f, indent=2, ensure_ascii=False)
+            # 저장 즉시 새 스냅샷으로 교체 (감시 이벤트를 기다리지 않음)
+            self._mtime = self._file_mtime()
+            self._publish(raw, "save")
+        return self._version
+
+
+_store = ConfigStore()
+
+
+def get_store():
+    return _store
+
+
+metrics_registry.gauge("hiorder_config_version", "현재 설정 스냅샷 버전", lambda: _store._version)
+
+
+def load_config():
+    with CONFIG_LOAD_SECONDS.time():
+        return _store.get()
+
+
+def save_config(config):
+    with CONFIG_SAVE_SECONDS.time():
+        return _store.save(config)
+
+
+def config_version():
+    return _store.version
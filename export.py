@@ -0,0 +1,212 @@
+import datetime
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+from breakdown import commission_items, get_template, monthly_items
+from metrics import registry as metrics_registry
+from pricing import DEVICE_KEYS
+from quote_cache import cache as quote_cache, cached
+from quote_table import get_quote
+from schedule import TERMS, contract_totals, term_note
+
+# 견적서를 만드는 작업 스레드 수
+EXPORT_WORKERS = int(os.environ.get("HIORDER_EXPORT_WORKERS", "2"))
+
+FORMATS = {
+    "xlsx": ("엑셀", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "html": ("인쇄용 HTML", "text/html"),
+}
+
+EXPORT_SECONDS = metrics_registry.histogram("hiorder_export_seconds", "견적서 생성 시간", labels=("format",))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="hiorder-export")
+    return _executor
+
+
+def _plain(text):
+    return text.replace("`", "")
+
+
+def _option_names(inputs):
+    names = []
+    if inputs["use_shinhan"]:
+        names.append("신한은행 주거래")
+    if inputs["use_tanggua"]:
+        names.append("땡겨요 앱 설치")
+    if inputs["use_internet_new"]:
+        names.append("인터넷 신규")
+    elif inputs["use_internet_kt"]:
+        names.append("기존 KT 인터넷")
+    return ", ".join(names) or "없음"
+
+
+# 견적서 내용 - "기본 계산 자세히 보기"와 같은 계산/항목을 숫자 그대로 담는다
+# 표 한 줄: (항목, 설명, 값, 단위) - 값이 None 이면 설명만 있는 줄
+def quote_document(inputs, config):
+    q = get_quote(config=config, **inputs)
+    lump_sum_price = config['prices']['store_device'][DEVICE_KEYS[inputs["device_type"]]]['lump_sum']
+    sections = [
+        ("기본 정보", [
+            ("알림판", f"{inputs['board_type']} 1대", None, None),
+            ("매장용 기기", f"{inputs['device_type']} {inputs['store_device_count']}대", None, None),
+            ("총 기기 수", f"{q['total_devices']}대", None, None),
+            ("추가 조건", _option_names(inputs), None, None),
+        ]),
+        ("수수료", [(label, "", amount, "원") for label, amount in commission_items(q, inputs, config)]),
+        ("일시불 처리", [
+            ("매장용 기기 일시불 가격", "", lump_sum_price, "원"),
+            ("일시불 처리 대수", f"min(⌊{q['commission']:,} ÷ {lump_sum_price:,}⌋, {inputs['store_device_count']})",
+             q['actual_devices'], "대"),
+            ("일시불 처리 비용", f"{q['actual_devices']}대 × {lump_sum_price:,}원", q['actual_devices'] * lump_sum_price, "원"),
+            ("남은 수수료", "", q['remaining_commission'], "원"),
+        ]),
+        ("월 비용", [(label, _plain(formula), amount, "원") for label, formula, amount in monthly_items(q, inputs, config)]),
+        ("기기당 월 예상 금액", [
+            ("부가세포함", f"{q['final_monthly']:,.0f}원 ÷ {q['total_devices']}대", q['per_device_monthly'], "원"),
+            ("부가세별도", "", q['per_device_tax_excluded'], "원"),
+        ]),
+        ("약정 기간별 총 비용", [
+            (f"{term}개월 총 비용", term_note(term) or f"{q['final_monthly']:,.0f}원 × {term}개월", total, "원")
+            for term, total in contract_totals(q, TERMS).items()
+        ]),
+    ]
+    return {
+        "title": "하이오더 견적서",
+        "created": datetime.date.today().isoformat(),
+        "sections": sections,
+    }
+
+
+def _cell_ref(column, row):
+    return f"{'ABC'[column]}{row}"
+
+
+def _xlsx_cell(column, row, value, style=0):
+    ref = _cell_ref(column, row)
+    if value is None or value == "":
+        return f'<c r="{ref}" s="{style}"/>' if style else ""
+    if isinstance(value, str):
+        return f'<c r="{ref}" t="inlineStr" s="{style}"><is><t>{escape(value)}</t></is></c>'
+    return f'<c r="{ref}" s="{style}"><v>{round(float(value))}</v></c>'
+
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="견적서" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # 스타일 0: 기본, 1: 굵게(제목), 2: 천 단위 구분 + "원", 3: 굵게 + 배경(구분 행), 4: 천 단위 구분
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="#,##0&quot;원&quot;"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="맑은 고딕"/></font>'
+        '<font><b/><sz val="11"/><name val="맑은 고딕"/></font></fonts>'
+        '<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+        '<fill><patternFill patternType="solid"><fgColor rgb="FFE8F1FF"/></patternFill></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+        '<cellXfs count="5"><xf/><xf fontId="1" applyFont="1"/><xf numFmtId="164" applyNumberFormat="1"/>'
+        '<xf fontId="1" fillId="2" applyFont="1" applyFill="1"/><xf numFmtId="3" applyNumberFormat="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+
+# 엑셀 파일 (표준 라이브러리 zipfile 로 최소 구성의 SpreadsheetML 작성)
+def render_xlsx(document):
+    rows = [f'<row r="1">{_xlsx_cell(0, 1, document["title"], 1)}{_xlsx_cell(2, 1, document["created"])}</row>']
+    number = 2
+    for title, items in document["sections"]:
+        number += 1
+        rows.append(f'<row r="{number}">' + "".join(_xlsx_cell(column, number, value, 3)
+                                                    for column, value in enumerate([title, "", ""])) + "</row>")
+        for label, description, amount, unit in items:
+            number += 1
+            style = 2 if unit == "원" else 4
+            rows.append(f'<row r="{number}">{_xlsx_cell(0, number, label)}{_xlsx_cell(1, number, description)}'
+                        f'{_xlsx_cell(2, number, amount, style)}</row>')
+    sheet = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<cols><col min="1" max="1" width="26" customWidth="1"/><col min="2" max="2" width="40" customWidth="1"/>'
+        '<col min="3" max="3" width="18" customWidth="1"/></cols>'
+        f'<sheetData>{"".join(rows)}</sheetData>'
+        '</worksheet>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC.items():
+            archive.writestr(name, content)
+        archive.writestr("xl/worksheets/sheet1.xml", sheet)
+    return buffer.getvalue()
+
+
+# 인쇄용 HTML (브라우저에서 인쇄 → PDF 로 저장)
+def render_html(document):
+    return get_template("quote_document.html.j2").render(document=document).encode("utf-8")
+
+
+RENDERERS = {"xlsx": render_xlsx, "html": render_html}
+
+
+def _render(file_format, inputs, config):
+    with EXPORT_SECONDS.time(format=file_format):
+        return RENDERERS[file_format](quote_document(inputs, config))
+
+
+# 견적서 생성 요청 - 작업 스레드에서 만들고 Future 를 돌려준다
+# 같은 (입력값, 설정 버전) 의 요청은 견적 캐시에서 같은 Future 를 공유하므로 한 번만 만든다
+def request_export(file_format, inputs, config, version):
+    def build(normalized):
+        return _get_executor().submit(_render, file_format, normalized, config)
+
+    future = cached(f"export_{file_format}", inputs, version, build)
+    if future.done() and future.exception() is not None:
+        # 실패한 결과는 캐시에 남기지 않고 다음 요청에서 다시 만든다
+        quote_cache.discard(f"export_{file_format}", inputs, version)
+    return future
+
+
+def file_name(file_format, inputs):
+    return f"하이오더_견적서_{inputs['board_type']}_{inputs['device_type']}_{inputs['store_device_count']}대.{file_format}"
@@ -0,0 +1,84 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from metrics import RERUN_SECONDS, registry as metrics_registry
+from profiling import profiled
+
+FRAGMENT_SECONDS = metrics_registry.histogram("hiorder_fragment_seconds", "화면 조각 실행 시간", labels=("fragment",))
+
+# 세션 상태에 두는 조각별 의존 키 (마지막 전체 실행에서 그려진 조각만)
+DEPENDENCIES_KEY = "_fragment_dependencies"
+
+# 스크립트 스레드별로 지금 기록 중인 조각 재실행 (안에서 호출된 조각은 따로 세지 않는다)
+_recording = threading.local()
+
+
+# 조각만 다시 실행 중인지 (전체 실행 중 조각 함수가 그대로 호출된 경우는 False)
+def fragment_rerun():
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+# 전체 실행 시작 시 호출 - 이번 실행에서 그려지는 조각만 의존 키를 다시 등록한다
+def begin_run():
+    if not fragment_rerun():
+        st.session_state[DEPENDENCIES_KEY] = {}
+
+
+# 재실행 프로파일 태그 - 페이지, 펼친 항목(show_*), 조각만 다시 실행했으면 그 조각 이름
+def rerun_tags(fragment_name=None):
+    tags = {
+        "page": st.session_state.get("page", "main"),
+        "open": sorted(key for key, value in st.session_state.to_dict().items() if key.startswith("show_") and value is True),
+        "calculation_done": bool(st.session_state.get("calculation_done")),
+    }
+    if fragment_name is not None:
+        tags["fragment"] = fragment_name
+    return tags
+
+
+# 조각만 다시 실행되면 run() 을 거치지 않으므로 여기서 재실행 시간/프로파일을 기록한다
+@contextmanager
+def _fragment_interaction(name):
+    _recording.active = True
+    started = time.perf_counter()
+    try:
+        with profiled(lambda: rerun_tags(name)):
+            yield
+    finally:
+        _recording.active = False
+        RERUN_SECONDS.observe(time.perf_counter() - started, page=st.session_state.get("page", "main"))
+
+
+# 화면 조각 - 조각 안의 위젯이 바뀌면 이 함수만 다시 실행된다
+# depends_on: 이 조각이 읽는 세션 키
+# 조각만 다시 실행하는 중에 다른 조각이 의존하는 키가 바뀌면 전체를 다시 실행해 그 조각도 갱신한다
+def fragment(*depends_on):
+    def decorator(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            partial = fragment_rerun()
+            dependencies = st.session_state.setdefault(DEPENDENCIES_KEY, {})
+            if not partial:
+                dependencies[name] = depends_on
+            watched = {key for other, keys in dependencies.items() if other != name for key in keys}
+            before = {key: st.session_state.get(key) for key in watched}
+
+            interaction = partial and not getattr(_recording, "active", False)
+            with _fragment_interaction(name) if interaction else nullcontext():
+                with FRAGMENT_SECONDS.time(fragment=name):
+                    func(*args, **kwargs)
+
+            if partial and any(st.session_state.get(key) != value for key, value in before.items()):
+                st.rerun()
+
+        return st.fragment(body)
+
+    return decorator
@@ -0,0 +1,123 @@
+import os
+import threading
+
+import numpy as np
+
+from policies import compare_quotes
+from pricing import BOARD_KEYS, BOARD_LABELS, DEVICE_KEYS, DEVICE_LABELS
+from quote_cache import normalize_inputs
+from quote_table import BOARD_AXIS, DEVICE_AXIS
+from tiers import tier_index
+
+# 보관할 최근 견적 수 (넘으면 오래된 것부터 덮어쓴다)
+RECENT_CAPACITY = int(os.environ.get("HIORDER_RECENT_QUOTES", "50000"))
+# 대표 조합의 최대 테이블 수
+REPRESENTATIVE_MAX_DEVICES = 100
+HISTOGRAM_BINS = 30
+
+FLAG_FIELDS = ("use_shinhan", "use_tanggua", "use_internet_new", "use_internet_kt")
+_BOARD_NAMES = np.array([BOARD_LABELS[key] for key in BOARD_AXIS])
+_DEVICE_NAMES = np.array([DEVICE_LABELS[key] for key in DEVICE_AXIS])
+
+
+# 최근 계산된 견적 입력값 (프로세스 전역 순환 버퍼, 컬럼별 numpy 배열)
+class RecentQuotes:
+    def __init__(self, capacity=RECENT_CAPACITY):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._count = np.zeros(capacity, dtype=np.int32)
+        self._board = np.zeros(capacity, dtype=np.int8)
+        self._device = np.zeros(capacity, dtype=np.int8)
+        self._flags = {name: np.zeros(capacity, dtype=bool) for name in FLAG_FIELDS}
+        self._next = 0
+        self._size = 0
+
+    def record(self, inputs):
+        inputs = normalize_inputs(inputs)
+        with self._lock:
+            position = self._next
+            self._count[position] = inputs["store_device_count"]
+            self._board[position] = BOARD_AXIS.index(BOARD_KEYS[inputs["board_type"]])
+            self._device[position] = DEVICE_AXIS.index(DEVICE_KEYS[inputs["device_type"]])
+            for name in FLAG_FIELDS:
+                self._flags[name][position] = inputs[name]
+            self._next = (position + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def __len__(self):
+        return self._size
+
+    # quote_arrays 에 넘길 수 있는 입력 배열 (복사본)
+    def inputs(self):
+        with self._lock:
+            size = self._size
+            return {
+                "store_device_count": self._count[:size].astype(np.int64),
+                "board_type": _BOARD_NAMES[self._board[:size]],
+                "device_type": _DEVICE_NAMES[self._device[:size]],
+                **{name: values[:size].copy() for name, values in self._flags.items()},
+            }
+
+
+# 대표 조합 - 테이블 1~max_store_devices 대 × 알림판 × 결제방식 × 신한 × 땡겨요 × 인터넷(없음/기존KT/신규)
+def representative_inputs(max_store_devices=REPRESENTATIVE_MAX_DEVICES):
+    grid = np.meshgrid(
+        np.arange(1, max_store_devices + 1),
+        np.arange(len(BOARD_AXIS)),
+        np.arange(len(DEVICE_AXIS)),
+        [False, True],
+        [False, True],
+        [0, 1, 2],
+        indexing="ij",
+    )
+    count, board, device, shinhan, tanggua, internet = (axis.ravel() for axis in grid)
+    return {
+        "store_device_count": count,
+        "board_type": _BOARD_NAMES[board],
+        "device_type": _DEVICE_NAMES[device],
+        "use_shinhan": shinhan,
+        "use_tanggua": tanggua,
+        "use_internet_new": internet == 2,
+        "use_internet_kt": internet >= 1,
+    }
+
+
+# 같은 견적 목록을 현재 설정/수정 중인 설정으로 다시 계산해 기기당 금액(부가세별도) 변동 분포를 요약
+def impact_summary(inputs, live_config, draft_config, bins=HISTOGRAM_BINS):
+    compared = compare_quotes(inputs, live_config, draft_config)
+    delta = compared["per_device_change"]
+    rows = len(delta)
+    if rows == 0:
+        return None
+
+    changed = np.abs(delta) >= 0.5
+    counts, edges = np.histogram(delta, bins=bins if changed.any() else 1)
+
+    # 수정 중인 설정의 구간별 (건수, 평균 변동)
+    tiers = tier_index(draft_config)
+    positions = np.searchsorted(np.array(tiers.bounds, dtype=np.int64), compared["other"]["total_devices"], side="right")
+    labels = (f"{tiers.bounds[0]}대 미만" if tiers.bounds else "전체",) + tiers.labels
+    by_tier = []
+    for position, label in enumerate(labels):
+        mask = positions == position
+        if mask.any():
+            by_tier.append({"tier": label, "quotes": int(mask.sum()), "mean_change": float(delta[mask].mean())})
+
+    return {
+        "quotes": rows,
+        "changed": int(changed.sum()),
+        "increased": int((delta >= 0.5).sum()),
+        "decreased": int((delta <= -0.5).sum()),
+        "mean": float(delta.mean()),
+        "p5": float(np.percentile(delta, 5)),
+        "median": float(np.median(delta)),
+        "p95": float(np.percentile(delta, 95)),
+        "min": float(delta.min()),
+        "max": float(delta.max()),
+        "histogram": (counts, edges),
+        "by_tier": by_tier,
+        "commission_change": float(compared["commission_change"].mean()),
+    }
+
+
+recent_quotes = RecentQuotes()
@@ -0,0 +1,241 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 지연 시간 구간 (초)
+DEFAULT_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_PORT = os.environ.get("HIORDER_METRICS_PORT")
+METRICS_FILE = os.environ.get("HIORDER_METRICS_FILE")
+FLUSH_SECONDS = float(os.environ.get("HIORDER_METRICS_INTERVAL", "15"))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(name, "") for name in self.label_names), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}_total{_labels(self.label_names, key)} {value}" for key, value in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # 레이블 값별 [구간별 건수..., +Inf 건수], 합계
+        self._counts = {}
+        self._sums = {}
+
+    def observe(self, seconds, **labels):
+        self.labels(**labels).observe(seconds)
+
+    # 레이블 값을 고정한 기록용 객체 (자주 호출되는 곳에서 미리 만들어 둔다)
+    def labels(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            if key not in self._counts:
+                self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = [0.0]
+            return _HistogramChild(self, self._counts[key], self._sums[key])
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        return sum(self._counts.get(tuple(labels.get(name, "") for name in self.label_names), ()))
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key][0]) for key, counts in self._counts.items())
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("_buckets", "_lock", "_counts", "_sum")
+
+    def __init__(self, histogram, counts, total):
+        self._buckets = histogram.buckets
+        self._lock = histogram._lock
+        self._counts = counts
+        self._sum = total
+
+    def observe(self, seconds):
+        position = bisect.bisect_left(self._buckets, seconds)
+        with self._lock:
+            self._counts[position] += 1
+            self._sum[0] += seconds
+
+
+# 값을 읽을 때마다 함수를 호출하는 게이지 (활성 세션 수 등)
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def samples(self):
+        try:
+            return [f"{self.name} {self.read()}"]
+        except Exception:
+            return []
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    # 같은 이름을 다시 등록하면 읽는 함수만 교체 (app.py 재실행 대비)
+    def gauge(self, name, help, read):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Gauge(name, help, read)
+            metric.read = read
+            return metric
+
+    # Prometheus 텍스트 형식
+    def render(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+RERUN_SECONDS = registry.histogram("hiorder_rerun_seconds", "페이지 재실행(main) 시간", labels=("page",))
+QUOTE_SECONDS = registry.histogram("hiorder_quote_seconds", "화면 견적 요청 시간, 캐시 미스만 (table: 견적표 조회, compute: 즉석 계산)", labels=("source",))
+CONFIG_LOAD_SECONDS = registry.histogram("hiorder_config_load_seconds", "load_config 호출 시간")
+CONFIG_SAVE_SECONDS = registry.histogram("hiorder_config_save_seconds", "save_config 호출 시간")
+CONFIG_RELOADS = registry.counter("hiorder_config_reloads", "설정 스냅샷 교체 횟수 (reload: 파일 변경, save: 관리자 저장)", labels=("reason",))
+CACHE_REQUESTS = registry.counter("hiorder_cache_requests", "캐시 조회 횟수", labels=("cache", "result"))
+CACHE_EVICTIONS = registry.counter("hiorder_cache_evictions", "캐시 항목 제거 횟수 (lru: 용량 초과, ttl: 만료, invalidate: 설정 변경)", labels=("cache", "reason"))
+
+
+def _serve(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="hiorder-metrics-http", daemon=True).start()
+    return server
+
+
+# node_exporter textfile 수집기용 파일 (주기적으로 통째로 교체)
+def flush(path):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(temp_path, path)
+
+
+def _flush_forever(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush(path)
+        except OSError:
+            pass
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+# 환경 변수에 따라 HTTP 엔드포인트/파일 내보내기 시작 (프로세스당 한 번)
+def start_exporters(port=METRICS_PORT, path=METRICS_FILE, interval=FLUSH_SECONDS):
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+        if port:
+            try:
+                _serve(int(port))
+            except OSError:
+                # 같은 포트를 다른 프로세스가 쓰고 있으면 파일 내보내기만 사용
+                pass
+        if path:
+            threading.Thread(target=_flush_forever, args=(path, interval), name="hiorder-metrics-file", daemon=True).start()
@@ -0,0 +1,225 @@
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from bulk_quote import BOOL_COLUMNS, INPUT_TYPES
+from config_store import thaw
+from metrics import registry as metrics_registry
+from pricing import BOARD_KEYS, BOARD_LABELS, DEVICE_KEYS, DEVICE_LABELS, INPUT_COLUMNS, quote_arrays
+from schedule import TERMS, contract_totals
+
+# 한 번에 계산하는 매장 수 (진행률이 이 단위로 올라간다)
+CHUNK_ROWS = int(os.environ.get("HIORDER_MULTI_STORE_CHUNK", "250"))
+# 매장 목록 최대 행 수
+MAX_STORES = int(os.environ.get("HIORDER_MULTI_STORE_MAX", "20000"))
+# 작업 스레드/프로세스 수
+WORKERS = int(os.environ.get("HIORDER_MULTI_STORE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# 이 매장 수 이상이면 프로세스 풀로 나눈다 (0: 사용 안 함)
+# 견적 계산은 numpy 벡터 연산이라 2만 매장도 스레드 한 개로 수십 ms 라서
+# 프로세스 시작(spawn)/전달 비용이 더 크다 - benchmarks 의 multi_store 묶음 참고
+PROCESS_MIN_ROWS = int(os.environ.get("HIORDER_MULTI_STORE_PROCESS_ROWS", "0"))
+NAME_COLUMN = "store_name"
+QUOTE_COLUMNS = ["store_device_count", "board_type", "device_type"] + BOOL_COLUMNS + ["custom_commission"]
+# 매장별 결과 표에 넣는 계산 결과 컬럼
+RESULT_COLUMNS = ["total_devices", "commission", "actual_devices", "remaining_commission", "final_monthly",
+                  "per_device_tax_excluded"]
+# 약정 기간별 합계에 쓰는 월 비용 항목 (매장 합계로 한 번에 계산)
+MONTHLY_COLUMNS = ["monthly_service_fee", "board_monthly", "store_device_monthly", "internet_discount"]
+
+MULTI_STORE_SECONDS = metrics_registry.histogram("hiorder_multi_store_seconds", "여러 매장 견적 계산 시간", labels=("executor",))
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(kind):
+    with _executor_lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            if kind == "process":
+                # Streamlit 서버는 스레드가 많아 fork 대신 spawn 으로 띄운다
+                executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="hiorder-multi-store")
+            _executors[kind] = executor
+    return executor
+
+
+# 작업 프로세스/스레드에서 실행 - 매장 묶음 하나의 견적 (numpy 배열)
+def quote_chunk(columns, config):
+    return {name: np.asarray(values) for name, values in quote_arrays(columns, config).items()}
+
+
+# 예시 파일 (화면에서 내려받기)
+def template_csv():
+    rows = [
+        ["강남점", 12, "15인치", "후불형", True, False, True, True, ""],
+        ["역삼점", 8, "10인치", "선불형", False, True, False, True, ""],
+        ["판교점", 20, "15인치", "후불형", True, True, False, False, "250000"],
+    ]
+    header = [NAME_COLUMN] + QUOTE_COLUMNS
+    lines = [",".join(header)] + [",".join(str(value).lower() if isinstance(value, bool) else str(value) for value in row)
+                                  for row in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# 올린 매장 목록(CSV/Parquet) → 매장별 입력값 DataFrame
+# 빈 칸은 기본값 (15인치, 후불형, 옵션 없음, 수수료 자동), 인터넷 신규는 기존 KT 포함
+def load_stores(data, file_name):
+    try:
+        if os.path.splitext(file_name)[1].lower() in (".parquet", ".pq"):
+            table = pq.read_table(io.BytesIO(data))
+        else:
+            table = pacsv.read_csv(
+                io.BytesIO(data),
+                # 빈 칸은 null 로 읽어 기본값을 채운다 (문자열 컬럼도 "" 가 아니라 null)
+                convert_options=pacsv.ConvertOptions(column_types={**INPUT_TYPES, NAME_COLUMN: pa.string()},
+                                                     strings_can_be_null=True),
+            )
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"파일을 읽지 못했습니다: {e}") from e
+
+    if "store_device_count" not in table.column_names:
+        raise ValueError("store_device_count 컬럼이 필요합니다.")
+    if table.num_rows == 0:
+        raise ValueError("매장이 없습니다.")
+    if table.num_rows > MAX_STORES:
+        raise ValueError(f"한 번에 {MAX_STORES:,}개 매장까지 계산할 수 있습니다. ({table.num_rows:,}개)")
+
+    frame = table.to_pandas()
+    stores = pd.DataFrame(index=pd.RangeIndex(len(frame)))
+    if NAME_COLUMN in frame:
+        names = frame[NAME_COLUMN].astype("string")
+        stores[NAME_COLUMN] = names.where(names.notna() & (names.str.strip() != ""), "")
+    else:
+        stores[NAME_COLUMN] = ""
+    stores[NAME_COLUMN] = [name or f"매장 {position + 1}" for position, name in enumerate(stores[NAME_COLUMN])]
+
+    count = frame["store_device_count"]
+    if count.isna().any() or (count < 1).any():
+        row = int(np.flatnonzero(count.isna().to_numpy() | (count < 1).to_numpy())[0]) + 1
+        raise ValueError(f"{row}번째 매장: store_device_count 는 1 이상이어야 합니다.")
+    stores["store_device_count"] = count.astype(np.int64)
+
+    for name, labels, keys in (("board_type", BOARD_LABELS, BOARD_KEYS), ("device_type", DEVICE_LABELS, DEVICE_KEYS)):
+        values = frame[name].fillna(INPUT_COLUMNS[name]) if name in frame else pd.Series(INPUT_COLUMNS[name], index=stores.index)
+        unknown = ~values.isin(list(keys))
+        if unknown.any():
+            row = int(np.flatnonzero(unknown.to_numpy())[0]) + 1
+            raise ValueError(f"{row}번째 매장: 알 수 없는 {name} 값 '{values[unknown].iloc[0]}' ({', '.join(labels.values())} 중 하나)")
+        stores[name] = values.map(lambda value: labels[keys[value]])
+
+    for name in BOOL_COLUMNS:
+        stores[name] = frame[name].fillna(False).astype(bool) if name in frame else False
+    stores["use_internet_kt"] |= stores["use_internet_new"]
+    stores["custom_commission"] = (frame["custom_commission"].astype(np.float64) if "custom_commission" in frame
+                                   else np.nan)
+    negative = (stores["custom_commission"] < 0).to_numpy()
+    if negative.any():
+        row = int(np.flatnonzero(negative)[0]) + 1
+        raise ValueError(f"{row}번째 매장: custom_commission 은 0 이상이어야 합니다.")
+    return stores
+
+
+# 매장 목록 하나의 계산 작업
+# - 묶음(CHUNK_ROWS)마다 작업을 나눠 제출하고, 화면은 끝난 묶음 수로 진행률만 본다
+# - 결과 표/합계는 다 끝난 뒤 한 번만 만든다
+class MultiStoreJob:
+    def __init__(self, stores, config, version, chunk_rows=CHUNK_ROWS):
+        self.stores = stores
+        self.version = version
+        self.rows = len(stores)
+        self.executor = "process" if 0 < PROCESS_MIN_ROWS <= self.rows else "thread"
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self._lock = threading.Lock()
+        self._results = None
+        self._summary = None
+
+        # 프로세스로 보낼 때는 읽기 전용 스냅샷을 일반 dict 로 바꿔야 pickle 할 수 있다
+        task_config = thaw(config) if self.executor == "process" else config
+        executor = _get_executor(self.executor)
+        columns = {name: stores[name].to_numpy() for name in QUOTE_COLUMNS}
+        self._chunks = []
+        for start in range(0, self.rows, chunk_rows):
+            stop = min(start + chunk_rows, self.rows)
+            future = executor.submit(quote_chunk, {name: values[start:stop] for name, values in columns.items()}, task_config)
+            self._chunks.append((start, stop, future))
+        # 전부 제출한 뒤에 등록 (이미 끝난 묶음은 바로 호출된다)
+        for _, _, future in self._chunks:
+            future.add_done_callback(self._chunk_done)
+
+    def _chunk_done(self, _future):
+        with self._lock:
+            if self.elapsed is not None or not self.done():
+                return
+            self.elapsed = time.perf_counter() - self.started
+        MULTI_STORE_SECONDS.observe(self.elapsed, executor=self.executor)
+
+    def done_rows(self):
+        return sum(stop - start for start, stop, future in self._chunks if future.done())
+
+    def done(self):
+        return all(future.done() for _, _, future in self._chunks)
+
+    def error(self):
+        for _, _, future in self._chunks:
+            if future.done() and not future.cancelled() and future.exception() is not None:
+                return future.exception()
+        return None
+
+    # 다른 목록을 올리면 아직 시작하지 않은 묶음은 취소한다
+    def cancel(self):
+        for _, _, future in self._chunks:
+            future.cancel()
+
+    # 매장별 입력값 + 계산 결과
+    def results(self):
+        with self._lock:
+            if self._results is None:
+                outputs = {name: np.concatenate([future.result()[name] for _, _, future in self._chunks])
+                           for name in RESULT_COLUMNS}
+                self._results = self.stores.assign(**outputs)
+            return self._results
+
+    # 체인 합계
+    def summary(self):
+        with self._lock:
+            if self._summary is not None:
+                return self._summary
+        results = self.results()
+        total_devices = int(results["total_devices"].sum())
+        commission = float(results["commission"].sum())
+        remaining_commission = float(results["remaining_commission"].sum())
+        monthly = float(results["final_monthly"].sum())
+        # 월 비용 항목별 체인 합계 → 약정 기간별 총 비용
+        components = {name: float(sum(future.result()[name].sum() for _, _, future in self._chunks))
+                      for name in MONTHLY_COLUMNS}
+        summary = {
+            "stores": self.rows,
+            "total_devices": total_devices,
+            "commission": commission,
+            "actual_devices": int(results["actual_devices"].sum()),
+            "lump_sum_amount": commission - remaining_commission,
+            "remaining_commission": remaining_commission,
+            "monthly": monthly,
+            "contract_totals": contract_totals(components, TERMS),
+            "per_device_tax_excluded": float(results["per_device_tax_excluded"].mul(results["total_devices"]).sum())
+                                       / total_devices,
+        }
+        with self._lock:
+            self._summary = summary
+        return summary
+
+    # 매장별 결과 CSV (내려받기용, 엑셀에서 바로 열리도록 BOM 포함)
+    def results_csv(self):
+        return self.results().to_csv(index=False).encode("utf-8-sig")
@@ -0,0 +1,198 @@
+import bisect
+import datetime
+import json
+import os
+import threading
+
+from config_store import freeze, get_store, load_config, save_config, thaw
+from pricing import calculate_quote, quote_arrays
+from tiers import compile_tiers
+
+POLICY_PATH = os.environ.get("HIORDER_POLICY_PATH", "policies.jsonl")
+
+
+def parse_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+
+# 정책 이름 (지정하지 않으면 적용 시작 월로 "N월정책")
+def policy_label(effective_from, label=None):
+    return label or f"{effective_from.month}월정책"
+
+
+# 정책 한 건 - 불러올 때 읽기 전용 설정과 구간 색인을 한 번만 만든다
+class Policy:
+    def __init__(self, policy_id, effective_from, config, label=None, saved_at=None):
+        self.id = policy_id
+        self.effective_from = parse_date(effective_from)
+        self.label = policy_label(self.effective_from, label)
+        self.saved_at = saved_at
+        self.config = freeze(config)
+        self.tiers = compile_tiers(self.config['commission'])
+        self._table = None
+        self._table_lock = threading.Lock()
+
+    # 이 정책의 견적표 (처음 단건 조회할 때 생성)
+    def table(self):
+        if self._table is None:
+            from quote_table import QuoteTable
+            with self._table_lock:
+                if self._table is None:
+                    self._table = QuoteTable(self.config, self.id)
+        return self._table
+
+    # calculate_quote 와 같은 인자 - 표 범위 안이면 조회, 아니면 즉석 계산
+    def quote(self, store_device_count, board_type, device_type, use_shinhan=False,
+              use_tanggua=False, use_internet_new=False, use_internet_kt=False, custom_commission=None):
+        table = self.table()
+        if custom_commission is None and table.covers(store_device_count):
+            return table.lookup(store_device_count, board_type, device_type, use_shinhan,
+                                use_tanggua, use_internet_new, use_internet_kt)
+        return calculate_quote(store_device_count, board_type, device_type, self.config, use_shinhan,
+                               use_tanggua, use_internet_new, use_internet_kt, custom_commission)
+
+    def quote_arrays(self, inputs):
+        return quote_arrays(inputs, self.config)
+
+    def to_json(self):
+        return {
+            "id": self.id,
+            "effective_from": self.effective_from.isoformat(),
+            "label": self.label,
+            "saved_at": self.saved_at,
+            "config": thaw(self.config),
+        }
+
+
+# 정책 이력 (추가만 하는 JSON Lines 파일)
+# - 파일이 늘어난 부분만 읽어 색인에 더한다
+# - (적용 시작일, id) 순으로 정렬해 두고 날짜로 이분 탐색한다 (같은 날짜면 나중에 저장한 정책)
+class PolicyStore:
+    def __init__(self, path=POLICY_PATH):
+        self.path = os.path.abspath(path)
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._keys = []
+        self._policies = []
+        self._by_id = {}
+        self.skipped = 0
+
+    def _reset(self):
+        self._offset = 0
+        self._keys = []
+        self._policies = []
+        self._by_id = {}
+        self.skipped = 0
+
+    def _add(self, policy):
+        key = (policy.effective_from, policy.id)
+        position = bisect.bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._policies.insert(position, policy)
+        self._by_id[policy.id] = policy
+
+    def refresh(self):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size == self._offset:
+            return
+        with self._lock:
+            if size < self._offset:
+                # 파일이 줄었으면 (교체/초기화) 처음부터 다시 읽는다
+                self._reset()
+            if size == self._offset:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+            # 쓰는 중인 마지막 줄은 다음에 읽는다
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                    self._add(Policy(raw["id"], raw["effective_from"], raw["config"], raw.get("label"), raw.get("saved_at")))
+                except (ValueError, KeyError, TypeError):
+                    self.skipped += 1
+            self._offset += end
+
+    def policies(self):
+        self.refresh()
+        return list(self._policies)
+
+    def get(self, policy_id):
+        self.refresh()
+        return self._by_id.get(policy_id)
+
+    # 해당 날짜에 적용되는 정책 (없으면 None)
+    def effective(self, date=None):
+        self.refresh()
+        date = parse_date(date) if date is not None else datetime.date.today()
+        position = bisect.bisect_right(self._keys, (date, float("inf"))) - 1
+        return self._policies[position] if position >= 0 else None
+
+    # 정책 추가 - 이미 저장된 줄은 고치지 않는다
+    def append(self, config, effective_from, label=None):
+        effective_from = parse_date(effective_from)
+        self.refresh()
+        with self._lock:
+            policy = Policy(
+                max(self._by_id, default=0) + 1,
+                effective_from,
+                thaw(config),
+                label,
+                datetime.datetime.now().isoformat(timespec="seconds"),
+            )
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(policy.to_json(), ensure_ascii=False) + "\n")
+        self.refresh()
+        return self._by_id.get(policy.id, policy)
+
+
+_store = PolicyStore()
+_applied = None
+
+
+def get_policy_store():
+    return _store
+
+
+def current_policy():
+    return _store.effective()
+
+
+# 예약된 정책의 적용 시작일이 지났으면 config.json 에 반영
+# config.json 이 적용 시작일 이후에 수정됐다면 (관리자 저장/직접 수정) 그대로 둔다
+def apply_due_policy(today=None):
+    global _applied
+    today = today or datetime.date.today()
+    policy = _store.effective(today)
+    if policy is None or _applied == (today, policy.id):
+        return policy
+
+    started = datetime.datetime.combine(policy.effective_from, datetime.time()).timestamp()
+    try:
+        modified = os.path.getmtime(get_store().path)
+    except FileNotFoundError:
+        modified = None
+    if modified is None or (modified < started and thaw(load_config()) != thaw(policy.config)):
+        save_config(policy.config)
+    _applied = (today, policy.id)
+    return policy
+
+
+# 같은 견적 목록을 두 정책(설정)으로 다시 계산해 비교
+def compare_quotes(inputs, base_config, other_config):
+    before = quote_arrays(inputs, base_config)
+    after = quote_arrays(inputs, other_config)
+    return {
+        "base": before,
+        "other": after,
+        "commission_change": after["commission"] - before["commission"],
+        "per_device_change": after["per_device_tax_excluded"] - before["per_device_tax_excluded"],
+    }
@@ -0,0 +1,270 @@
+import math
+
+import numpy as np
+
+from tiers import tier_index
+
+# 화면 라벨 → 설정 키 매핑
+BOARD_KEYS = {"15인치": "inch15", "10인치": "inch10", "inch15": "inch15", "inch10": "inch10"}
+DEVICE_KEYS = {"후불형": "normal", "선불형": "calc", "normal": "normal", "calc": "calc"}
+# 설정 키 → 화면 라벨
+BOARD_LABELS = {"inch15": "15인치", "inch10": "10인치"}
+DEVICE_LABELS = {"normal": "후불형", "calc": "선불형"}
+
+VAT_RATE = 1.1
+
+# 일괄 계산 입력 컬럼 (기본값)
+INPUT_COLUMNS = {
+    "store_device_count": None,
+    "board_type": "15인치",
+    "device_type": "후불형",
+    "use_shinhan": False,
+    "use_tanggua": False,
+    "use_internet_new": False,
+    "use_internet_kt": False,
+    "custom_commission": np.nan,
+}
+
+# 일괄 계산 결과 컬럼
+OUTPUT_COLUMNS = [
+    "total_devices",
+    "commission",
+    "actual_devices",
+    "remaining_commission",
+    "monthly_service_fee",
+    "board_monthly",
+    "device_monthly",
+    "remaining_devices",
+    "store_device_monthly",
+    "total_monthly",
+    "total_monthly_with_tax",
+    "internet_discount",
+    "final_monthly",
+    "per_device_monthly",
+    "per_device_tax_excluded",
+]
+
+
+# 수수료 계산 함수
+def calculate_commission(total_devices, config, use_shinhan, use_internet_new, use_internet_kt, use_tanggua=False):
+    commission = 0
+
+    # 기본 수수료
+    commission += total_devices * (config['commission']['basic1'] + config['commission']['basic2'])
+
+    # 구간별 추가 수수료
+    commission += tier_index(config).amount(total_devices)
+
+    # 신한은행 주거래 통장
+    if use_shinhan:
+        commission += config['commission']['shinhan_bonus']
+
+    # 땡겨요 어플 설치
+    if use_tanggua:
+        commission += config['commission']['tanggua_bonus']
+
+    # 인터넷 신규/기존KT 수수료
+    if use_internet_new:
+        commission += config['commission']['internet_new'] + config['commission']['internet_kt']
+    elif use_internet_kt:
+        commission += config['commission']['internet_kt']
+
+    return commission
+
+
+# 일시불 처리 가능 대수 계산
+def calculate_lump_sum_devices(store_device_count, device_type, commission, config):
+    if device_type == "normal":
+        lump_sum_price = config['prices']['store_device']['normal']['lump_sum']
+    else:  # calc
+        lump_sum_price = config['prices']['store_device']['calc']['lump_sum']
+
+    possible_devices = math.floor(commission / lump_sum_price)
+    actual_devices = min(possible_devices, store_device_count)
+    remaining_commission = commission - (actual_devices * lump_sum_price)
+
+    return actual_devices, remaining_commission
+
+
+# 단일 견적 계산 (계산하기 버튼과 동일한 순서)
+def calculate_quote(store_device_count, board_type, device_type, config, use_shinhan=False,
+                    use_tanggua=False, use_internet_new=False, use_internet_kt=False, custom_commission=None):
+    board_key = BOARD_KEYS[board_type]
+    device_key = DEVICE_KEYS[device_type]
+
+    # 총 기기 수 (알림판 1대 + 매장용 기기)
+    total_devices = store_device_count + 1
+
+    # 수수료 계산 (수수료별도적용 시 지정 금액 사용)
+    if custom_commission is None:
+        commission = calculate_commission(total_devices, config, use_shinhan, use_internet_new, use_internet_kt, use_tanggua)
+    else:
+        commission = custom_commission
+
+    # 일시불 처리 가능 대수 계산
+    actual_devices, remaining_commission = calculate_lump_sum_devices(store_device_count, device_key, commission, config)
+
+    # 월 비용 계산
+    monthly_service_fee = total_devices * config['service_fee']
+    board_monthly = config['prices']['board'][board_key]
+
+    # 매장용 기기 월 할부금 (일시불 처리 후 남은 기기만)
+    device_monthly = config['prices']['store_device'][device_key]['monthly']
+    remaining_devices = store_device_count - actual_devices
+    store_device_monthly = remaining_devices * device_monthly
+
+    # 총 월 비용 (부가세 적용)
+    total_monthly = monthly_service_fee + board_monthly + store_device_monthly
+    total_monthly_with_tax = total_monthly * VAT_RATE
+
+    # 인터넷 결합 할인 적용 (부가세 적용 후 차감)
+    internet_discount = config['internet']['monthly_discount'] if (use_internet_new or use_internet_kt) else 0
+    final_monthly = total_monthly_with_tax - internet_discount
+
+    # 기기당 월 예상 금액
+    per_device_monthly = final_monthly / total_devices
+
+    return {
+        "total_devices": total_devices,
+        "commission": commission,
+        "actual_devices": actual_devices,
+        "remaining_commission": remaining_commission,
+        "monthly_service_fee": monthly_service_fee,
+        "board_monthly": board_monthly,
+        "device_monthly": device_monthly,
+        "remaining_devices": remaining_devices,
+        "store_device_monthly": store_device_monthly,
+        "total_monthly": total_monthly,
+        "total_monthly_with_tax": total_monthly_with_tax,
+        "internet_discount": internet_discount,
+        "final_monthly": final_monthly,
+        "per_device_monthly": per_device_monthly,
+        "per_device_tax_excluded": per_device_monthly / VAT_RATE,
+    }
+
+
+# 라벨/키 배열 → 불리언 마스크
+def _key_mask(values, keys, target):
+    values = np.asarray(values)
+    mask = np.zeros(values.shape, dtype=bool)
+    known = np.zeros(values.shape, dtype=bool)
+    for label, key in keys.items():
+        matches = values == label
+        known |= matches
+        if key == target:
+            mask |= matches
+    if not known.all():
+        raise KeyError(values[~known][0])
+    return mask
+
+
+# 견적 일괄 계산 (벡터화)
+# inputs: INPUT_COLUMNS 키를 가진 dict(배열/스칼라) 또는 DataFrame
+# custom_commission 이 NaN 인 행은 정책 수수료를 사용
+def quote_arrays(inputs, config):
+    store_device_count = np.asarray(inputs["store_device_count"], dtype=np.int64)
+    size = store_device_count.shape
+
+    def column(name):
+        if name in inputs:
+            return np.broadcast_to(np.asarray(inputs[name]), size)
+        return np.full(size, INPUT_COLUMNS[name])
+
+    is_inch10 = _key_mask(column("board_type"), BOARD_KEYS, "inch10")
+    is_calc = _key_mask(column("device_type"), DEVICE_KEYS, "calc")
+    use_shinhan = column("use_shinhan").astype(bool)
+    use_tanggua = column("use_tanggua").astype(bool)
+    use_internet_new = column("use_internet_new").astype(bool)
+    use_internet_kt = column("use_internet_kt").astype(bool)
+    custom_commission = column("custom_commission").astype(np.float64)
+
+    fees = config['commission']
+    prices = config['prices']
+    normal = prices['store_device']['normal']
+    calc = prices['store_device']['calc']
+
+    # 총 기기 수 (알림판 1대 + 매장용 기기)
+    total_devices = store_device_count + 1
+
+    # 수수료 계산
+    commission = total_devices * (fees['basic1'] + fees['basic2'])
+    commission = commission + tier_index(config).amounts_for(total_devices)
+    commission = commission + np.where(use_shinhan, fees['shinhan_bonus'], 0)
+    commission = commission + np.where(use_tanggua, fees['tanggua_bonus'], 0)
+    commission = commission + np.where(
+        use_internet_new,
+        fees['internet_new'] + fees['internet_kt'],
+        np.where(use_internet_kt, fees['internet_kt'], 0),
+    )
+    has_custom = ~np.isnan(custom_commission)
+    if has_custom.any():
+        commission = np.where(has_custom, custom_commission, commission)
+
+    # 일시불 처리 가능 대수 계산
+    lump_sum_price = np.where(is_calc, calc['lump_sum'], normal['lump_sum'])
+    possible_devices = np.floor(commission / lump_sum_price).astype(np.int64)
+    actual_devices = np.minimum(possible_devices, store_device_count)
+    remaining_commission = commission - actual_devices * lump_sum_price
+
+    # 월 비용 계산
+    monthly_service_fee = total_devices * config['service_fee']
+    board_monthly = np.where(is_inch10, prices['board']['inch10'], prices['board']['inch15'])
+    device_monthly = np.where(is_calc, calc['monthly'], normal['monthly'])
+    remaining_devices = store_device_count - actual_devices
+    store_device_monthly = remaining_devices * device_monthly
+
+    total_monthly = monthly_service_fee + board_monthly + store_device_monthly
+    total_monthly_with_tax = total_monthly * VAT_RATE
+    internet_discount = np.where(use_internet_new | use_internet_kt, config['internet']['monthly_discount'], 0)
+    final_monthly = total_monthly_with_tax - internet_discount
+    per_device_monthly = final_monthly / total_devices
+
+    return {
+        "total_devices": total_devices,
+        "commission": commission,
+        "actual_devices": actual_devices,
+        "remaining_commission": remaining_commission,
+        "monthly_service_fee": monthly_service_fee,
+        "board_monthly": board_monthly,
+        "device_monthly": device_monthly,
+        "remaining_devices": remaining_devices,
+        "store_device_monthly": store_device_monthly,
+        "total_monthly": total_monthly,
+        "total_monthly_with_tax": total_monthly_with_tax,
+        "internet_discount": internet_discount,
+        "final_monthly": final_monthly,
+        "per_device_monthly": per_device_monthly,
+        "per_device_tax_excluded": per_device_monthly / VAT_RATE,
+    }
+
+
+# DataFrame 입력 → 입력 컬럼 + 결과 컬럼 DataFrame
+def quote_frame(df, config):
+    import pandas as pd
+
+    inputs = {name: df[name].to_numpy() for name in INPUT_COLUMNS if name in df.columns}
+    result = quote_arrays(inputs, config)
+    return pd.concat([df.reset_index(drop=True), pd.DataFrame(result)], axis=1)
+
+
+# 일시불 처리 대수가 바뀌는 수수료 지점 (0 포함, max_commission 이하)
+def commission_breakpoints(store_device_count, device_type, config, max_commission):
+    lump_sum_price = config['prices']['store_device'][DEVICE_KEYS[device_type]]['lump_sum']
+    steps = min(store_device_count, max_commission // lump_sum_price)
+    return np.arange(steps + 1, dtype=np.int64) * lump_sum_price
+
+
+# 수수료 0..max_commission 전 구간 견적 (한 번의 벡터 계산)
+# 구간 시작점과 다음 구간 직전 값을 모두 계산해 계단/톱니 모양을 그대로 표현한다
+def commission_sweep(inputs, config, max_commission):
+    breakpoints = commission_breakpoints(inputs["store_device_count"], inputs["device_type"], config, max_commission)
+    before_next = breakpoints[1:] - 1
+    commissions = np.unique(np.concatenate([breakpoints, before_next, [max_commission]]))
+
+    size = len(commissions)
+    sweep_inputs = {name: np.full(size, value) for name, value in inputs.items()}
+    sweep_inputs["custom_commission"] = commissions.astype(np.float64)
+    result = quote_arrays(sweep_inputs, config)
+    result["custom_commission"] = commissions
+    result["is_breakpoint"] = np.isin(commissions, breakpoints)
+    return result
@@ -0,0 +1,145 @@
+import datetime
+import glob
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# HIORDER_PROFILE=1 이면 재실행 일부를 cProfile + tracemalloc 으로 기록한다
+ENABLED = os.environ.get("HIORDER_PROFILE", "").lower() in ("1", "true", "yes")
+# 기록할 재실행 비율 (0~1)
+SAMPLE_RATE = float(os.environ.get("HIORDER_PROFILE_SAMPLE", "0.1"))
+PROFILE_DIR = os.environ.get("HIORDER_PROFILE_DIR", "profiles")
+# 보관할 최대 기록 수 (오래된 것부터 삭제)
+MAX_PROFILES = int(os.environ.get("HIORDER_PROFILE_KEEP", "200"))
+# 메모리 할당 상위 몇 줄을 남길지
+TOP_ALLOCATIONS = 20
+
+# tracemalloc 은 프로세스 전체에 하나뿐이므로 한 번에 한 재실행만 기록한다
+_busy = threading.Lock()
+_sequence = itertools.count(1)
+
+
+def _rotate(directory, keep):
+    profiles = sorted(glob.glob(os.path.join(directory, "*.prof")))
+    for path in profiles[:max(len(profiles) - keep, 0)]:
+        for stale in (path, path[:-len(".prof")] + ".json"):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def _write(directory, tags, profiler, snapshot, peak, elapsed):
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    name = f"{stamp}-{os.getpid()}-{next(_sequence)}-{tags.get('page', 'unknown')}"
+    base = os.path.join(directory, name)
+
+    profiler.dump_stats(base + ".prof")
+    allocations = [
+        {"line": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+    ]
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump({
+            "tags": tags,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "allocations": allocations,
+        }, f, indent=2, ensure_ascii=False)
+    _rotate(directory, MAX_PROFILES)
+    return base
+
+
+# 재실행 한 번을 기록 - tags 는 끝난 뒤 호출해 페이지/펼친 항목을 얻는 함수
+@contextmanager
+def profiled(tags, enabled=ENABLED, sample_rate=SAMPLE_RATE, directory=PROFILE_DIR):
+    if not enabled or random.random() >= sample_rate or not _busy.acquire(blocking=False):
+        yield
+        return
+
+    # 기록하지 않는 재실행에는 import 비용도 들지 않게 한다
+    import cProfile
+    import tracemalloc
+
+    # 이미 다른 용도로 추적 중이면 (PYTHONTRACEMALLOC 등) 끄지 않고 최대값만 다시 잰다
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        if was_tracing:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if not was_tracing:
+                tracemalloc.stop()
+            try:
+                _write(directory, tags(), profiler, snapshot, peak, elapsed)
+            except OSError:
+                pass
+    finally:
+        _busy.release()
+
+
+def _load_meta(path):
+    with open(path[:-len(".prof")] + ".json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 저장된 기록을 조건(페이지/펼친 항목)별로 합쳐 출력
+def main(argv=None):
+    import argparse
+    import pstats
+
+    parser = argparse.ArgumentParser(description="재실행 프로파일 기록을 합쳐서 보여줍니다.")
+    parser.add_argument("directory", nargs="?", default=PROFILE_DIR, help="기록 폴더 (기본: profiles)")
+    parser.add_argument("--page", help="이 페이지의 기록만 (main/admin)")
+    parser.add_argument("--open", action="append", default=[], help="이 항목을 펼친 기록만 (예: show_basic_detail)")
+    parser.add_argument("--fragment", help="이 조각만 다시 실행한 기록만 (예: breakdown_section)")
+    parser.add_argument("--sort", default="cumulative", help="정렬 기준 (기본: cumulative)")
+    parser.add_argument("--top", type=int, default=25, help="출력할 함수 수 (기본: 25)")
+    args = parser.parse_args(argv)
+
+    selected = []
+    for path in sorted(glob.glob(os.path.join(args.directory, "*.prof"))):
+        try:
+            meta = _load_meta(path)
+        except (OSError, ValueError):
+            continue
+        tags = meta["tags"]
+        if args.page and tags.get("page") != args.page:
+            continue
+        if not set(args.open) <= set(tags.get("open", [])):
+            continue
+        if args.fragment and tags.get("fragment") != args.fragment:
+            continue
+        selected.append((path, meta))
+
+    if not selected:
+        print("조건에 맞는 기록이 없습니다.", file=sys.stderr)
+        return 1
+
+    elapsed = sorted(meta["elapsed_ms"] for _, meta in selected)
+    peaks = sorted(meta["peak_memory_kb"] for _, meta in selected)
+    print(f"기록 {len(selected)}개, 재실행 중앙값 {elapsed[len(elapsed) // 2]:,.1f}ms (최대 {elapsed[-1]:,.1f}ms), "
+          f"최대 메모리 중앙값 {peaks[len(peaks) // 2]:,.1f}KB")
+    stats = pstats.Stats(*[path for path, _ in selected])
+    stats.sort_stats(args.sort).print_stats(args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from config_store import get_store
+from metrics import CACHE_EVICTIONS, CACHE_REQUESTS, registry as metrics_registry
+from pricing import BOARD_KEYS, BOARD_LABELS, DEVICE_KEYS, DEVICE_LABELS
+
+# 보관할 최대 항목 수 (넘으면 가장 오래 쓰지 않은 것부터 제거)
+MAX_ENTRIES = int(os.environ.get("HIORDER_QUOTE_CACHE_SIZE", "4096"))
+# 항목 유지 시간(초)
+TTL_SECONDS = float(os.environ.get("HIORDER_QUOTE_CACHE_TTL", "3600"))
+
+CACHE_NAME = "quote"
+
+
+# 같은 견적이 되는 입력은 같은 키가 되도록 정리
+# (설정 키 → 화면 라벨, 인터넷 신규는 기존 KT 포함)
+def normalize_inputs(inputs):
+    use_internet_new = bool(inputs.get("use_internet_new", False))
+    return {
+        "store_device_count": int(inputs["store_device_count"]),
+        "board_type": BOARD_LABELS[BOARD_KEYS[inputs["board_type"]]],
+        "device_type": DEVICE_LABELS[DEVICE_KEYS[inputs["device_type"]]],
+        "use_shinhan": bool(inputs.get("use_shinhan", False)),
+        "use_tanggua": bool(inputs.get("use_tanggua", False)),
+        "use_internet_new": use_internet_new,
+        "use_internet_kt": use_internet_new or bool(inputs.get("use_internet_kt", False)),
+    }
+
+
+# 프로세스 전역 견적 캐시 (모든 세션이 공유)
+# - 키: (종류, 정리한 입력값, 추가 인자, 설정 버전)
+# - LRU + TTL, 설정이 바뀌면 통째로 비운다
+# - 값은 읽기 전용 객체만 넣는다 (QuoteResult, 블록 튜플 등)
+class QuoteCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS, name=CACHE_NAME):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self._lock = threading.Lock()
+        # 키 → (만료 시각, 값)
+        self._entries = OrderedDict()
+        self._version = None
+
+    # build(normalized_inputs) 로 만든 값을 캐시해서 반환
+    def get(self, kind, inputs, version, build, *extra):
+        normalized = normalize_inputs(inputs)
+        key = (kind, tuple(normalized.values()), extra, version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                    return entry[1]
+                del self._entries[key]
+                CACHE_EVICTIONS.inc(cache=self.name, reason="ttl")
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+
+        value = build(normalized)
+        with self._lock:
+            # 그 사이 다른 세션이 먼저 만들었으면 그 값을 공유한다
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[1]
+            # 계산 도중 설정이 바뀌었으면 이전 버전 결과는 넣지 않는다
+            if self._version is not None and version != self._version:
+                return value
+            self._entries[key] = (now + self.ttl_seconds, value)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            CACHE_EVICTIONS.inc(evicted, cache=self.name, reason="lru")
+        return value
+
+    # 항목 하나 제거 (실패한 결과 등)
+    def discard(self, kind, inputs, version, *extra):
+        key = (kind, tuple(normalize_inputs(inputs).values()), extra, version)
+        with self._lock:
+            self._entries.pop(key, None)
+
+    # 설정 변경 시 호출 (ConfigStore.subscribe)
+    def invalidate(self, snapshot=None, version=None):
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._version = version
+        if removed:
+            CACHE_EVICTIONS.inc(removed, cache=self.name, reason="invalidate")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": CACHE_REQUESTS.value(cache=self.name, result="hit"),
+            "misses": CACHE_REQUESTS.value(cache=self.name, result="miss"),
+            "evictions": sum(CACHE_EVICTIONS.value(cache=self.name, reason=reason) for reason in ("lru", "ttl", "invalidate")),
+        }
+
+
+cache = QuoteCache()
+get_store().subscribe(cache.invalidate)
+
+metrics_registry.gauge("hiorder_quote_cache_entries", "견적 캐시 항목 수", lambda: len(cache))
+
+
+def cached(kind, inputs, version, build, *extra):
+    return cache.get(kind, inputs, version, build, *extra)
@@ -0,0 +1,279 @@
+import atexit
+import datetime
+import glob
+import itertools
+import os
+import queue
+import sys
+import threading
+import time
+
+from metrics import registry as metrics_registry
+from pricing import OUTPUT_COLUMNS
+from sessions import INPUT_FIELDS
+
+# 견적 기록 폴더 (빈 값이면 기록하지 않음)
+LOG_DIR = os.environ.get("HIORDER_QUOTE_LOG_DIR", "quote_log")
+# 기록 대기열 크기 - 가득 차면 재실행을 기다리게 하지 않고 버린다
+QUEUE_SIZE = int(os.environ.get("HIORDER_QUOTE_LOG_QUEUE", "10000"))
+# 한 번에 쓰는 최대 행 수 (Parquet 행 그룹 하나)
+BATCH_ROWS = 1000
+# 쌓인 행이 BATCH_ROWS 보다 적어도 이 시간(초)마다 쓴다
+FLUSH_SECONDS = float(os.environ.get("HIORDER_QUOTE_LOG_FLUSH", "5"))
+# 세그먼트 교체 기준 (행 수 또는 시간)
+SEGMENT_ROWS = int(os.environ.get("HIORDER_QUOTE_LOG_SEGMENT_ROWS", "100000"))
+SEGMENT_SECONDS = float(os.environ.get("HIORDER_QUOTE_LOG_SEGMENT_SECONDS", "3600"))
+# 이 행 수보다 작은 세그먼트는 압축 단계에서 합친다
+COMPACT_ROWS = int(os.environ.get("HIORDER_QUOTE_LOG_COMPACT_ROWS", "1000000"))
+
+# 쓰는 중인 세그먼트 (닫혀야 .parquet 로 이름이 바뀌고 읽을 수 있다)
+IN_PROGRESS = ".inprogress"
+COMPACT_LOCK = ".compact.lock"
+# 압축 도중 프로세스가 죽어 남은 잠금 파일은 이 시간(초)이 지나면 무시한다
+STALE_LOCK_SECONDS = 3600
+
+FLOAT_OUTPUTS = ("total_monthly_with_tax", "final_monthly", "per_device_monthly", "per_device_tax_excluded")
+COLUMNS = ("logged_at", "session_id", "config_version") + INPUT_FIELDS + ("custom_commission",) + tuple(OUTPUT_COLUMNS) + ("elapsed_ms",)
+
+
+def _schema():
+    import pyarrow as pa
+
+    types = {
+        "logged_at": pa.timestamp("ms"),
+        "session_id": pa.string(),
+        "config_version": pa.int64(),
+        "store_device_count": pa.int64(),
+        "board_type": pa.string(),
+        "device_type": pa.string(),
+        "custom_commission": pa.float64(),
+        "elapsed_ms": pa.float64(),
+    }
+    for name in INPUT_FIELDS:
+        types.setdefault(name, pa.bool_())
+    for name in OUTPUT_COLUMNS:
+        types[name] = pa.float64() if name in FLOAT_OUTPUTS else pa.int64()
+    return pa.schema([(name, types[name]) for name in COLUMNS])
+
+
+def segment_paths(directory=LOG_DIR):
+    return sorted(glob.glob(os.path.join(directory, "quotes-*.parquet")))
+
+
+# 백그라운드 기록기
+# - log() 는 대기열에 넣기만 한다 (가득 차면 버리고 개수만 센다)
+# - 기록 스레드가 모아서 Parquet 행 그룹으로 쓰고, 행 수/시간이 넘으면 세그먼트를 닫고 새로 연다
+class QuoteLog:
+    def __init__(self, directory=LOG_DIR, queue_size=QUEUE_SIZE, batch_rows=BATCH_ROWS, flush_seconds=FLUSH_SECONDS,
+                 segment_rows=SEGMENT_ROWS, segment_seconds=SEGMENT_SECONDS):
+        self.directory = directory
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._writer = None
+        self._segment_path = None
+        self._segment_rows = 0
+        self._segment_started = 0.0
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="hiorder-quote-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    # 계산 결과 한 건 기록 (재실행을 막지 않음)
+    def log(self, result, session_id=None, elapsed=None):
+        if self._thread is None:
+            self._start()
+        row = (
+            datetime.datetime.now(),
+            session_id,
+            result.version,
+            *(getattr(result, name) for name in INPUT_FIELDS),
+            result.custom_commission,
+            *(getattr(result, name) for name in OUTPUT_COLUMNS),
+            elapsed * 1000 if elapsed is not None else None,
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            QUOTE_LOG_ROWS.inc(result="dropped")
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        rows = []
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                row = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                row = ()
+            if row is None:
+                break
+            if row:
+                rows.append(row)
+            if len(rows) >= self.batch_rows or time.monotonic() >= deadline:
+                self._flush(rows)
+                rows = []
+                deadline = time.monotonic() + self.flush_seconds
+        self._flush(rows)
+        self._close_segment()
+
+    def _flush(self, rows):
+        if rows:
+            try:
+                self._write(rows)
+            except Exception as e:
+                # 디스크 오류 등으로 기록하지 못해도 계산기는 계속 동작해야 한다
+                QUOTE_LOG_ROWS.inc(len(rows), result="failed")
+                print(f"견적 기록 실패: {e}", file=sys.stderr)
+        if self._writer is not None and (self._segment_rows >= self.segment_rows
+                                         or time.monotonic() - self._segment_started >= self.segment_seconds):
+            self._close_segment()
+
+    def _write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _schema()
+        table = pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)],
+            schema=schema,
+        )
+        if self._writer is None:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            self._segment_path = os.path.join(self.directory, f"quotes-{stamp}-{os.getpid()}-{next(self._sequence)}.parquet")
+            self._writer = pq.ParquetWriter(self._segment_path + IN_PROGRESS, schema)
+            self._segment_rows = 0
+            self._segment_started = time.monotonic()
+        self._writer.write_table(table)
+        self._segment_rows += len(rows)
+        QUOTE_LOG_ROWS.inc(len(rows), result="written")
+
+    # 세그먼트를 닫아 읽을 수 있게 한다
+    def _close_segment(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(self._segment_path + IN_PROGRESS, self._segment_path)
+        self._writer = None
+        try:
+            compact(self.directory)
+        except OSError as e:
+            print(f"견적 기록 압축 실패: {e}", file=sys.stderr)
+
+    # 남은 행을 쓰고 세그먼트를 닫는다 (프로세스 종료 시 자동 호출)
+    def close(self, timeout=10):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+# 작은 세그먼트를 이어 붙여 COMPACT_ROWS 이하의 파일 하나로 합친다
+# - 여러 프로세스가 같은 폴더를 쓰면 잠금 파일을 만든 프로세스만 실행
+# - 합친 파일을 먼저 만든 뒤 원래 세그먼트를 지운다 (그 사이 읽으면 잠시 중복될 수 있음)
+def compact(directory=LOG_DIR, target_rows=COMPACT_ROWS):
+    import pyarrow.parquet as pq
+
+    lock_path = os.path.join(directory, COMPACT_LOCK)
+    try:
+        if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+            os.remove(lock_path)
+    except FileNotFoundError:
+        pass
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return []
+    os.close(fd)
+    try:
+        groups = []
+        group, group_rows = [], 0
+        for path in segment_paths(directory):
+            rows = pq.ParquetFile(path).metadata.num_rows
+            if rows >= target_rows or group_rows + rows > target_rows:
+                groups.append(group)
+                group, group_rows = [], 0
+            if rows < target_rows:
+                group.append(path)
+                group_rows += rows
+        groups.append(group)
+
+        compacted = []
+        for group in groups:
+            if len(group) < 2:
+                continue
+            # 이름 순서(시간 순서)가 유지되도록 첫 세그먼트 이름을 이어받는다
+            target = group[0] if group[0].endswith("-c.parquet") else group[0][:-len(".parquet")] + "-c.parquet"
+            temp_path = target + IN_PROGRESS
+            schema = pq.read_schema(group[0])
+            with pq.ParquetWriter(temp_path, schema) as writer:
+                for path in group:
+                    writer.write_table(pq.read_table(path, schema=schema))
+            os.replace(temp_path, target)
+            for path in group:
+                if path != target:
+                    os.remove(path)
+            compacted.append(target)
+        return compacted
+    finally:
+        os.remove(lock_path)
+
+
+quote_log = QuoteLog()
+
+QUOTE_LOG_ROWS = metrics_registry.counter("hiorder_quote_log_rows", "견적 기록 행 수 (written: 기록, dropped: 대기열 초과로 버림, failed: 쓰기 실패)", labels=("result",))
+metrics_registry.gauge("hiorder_quote_log_queue", "견적 기록 대기열 길이", quote_log.queue_depth)
+
+
+# 계산기에서 호출 - 기록 폴더가 지정되지 않았으면 아무것도 하지 않는다
+def log_quote(result, session_id=None, elapsed=None):
+    if LOG_DIR:
+        quote_log.log(result, session_id, elapsed)
+
+
+# 작은 세그먼트 합치기 / 세그먼트 현황
+def main(argv=None):
+    import argparse
+
+    import pyarrow.parquet as pq
+
+    parser = argparse.ArgumentParser(description="견적 기록 세그먼트를 합치거나 현황을 보여줍니다.")
+    parser.add_argument("command", choices=["compact", "status"])
+    parser.add_argument("directory", nargs="?", default=LOG_DIR or "quote_log", help="기록 폴더 (기본: quote_log)")
+    parser.add_argument("--target-rows", type=int, default=COMPACT_ROWS, help="합친 파일 최대 행 수")
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        compacted = compact(args.directory, args.target_rows)
+        for path in compacted:
+            print(f"{os.path.basename(path)}: {pq.ParquetFile(path).metadata.num_rows:,}행")
+        print(f"합친 파일 {len(compacted)}개")
+        return 0
+
+    paths = segment_paths(args.directory)
+    total = 0
+    for path in paths:
+        rows = pq.ParquetFile(path).metadata.num_rows
+        total += rows
+        print(f"{os.path.basename(path)}: {rows:,}행, {os.path.getsize(path) / 1024:,.0f}KB")
+    in_progress = glob.glob(os.path.join(args.directory, "*" + IN_PROGRESS))
+    print(f"세그먼트 {len(paths)}개, {total:,}행 (쓰는 중 {len(in_progress)}개)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
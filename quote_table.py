@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from config_store import get_store
+from pricing import BOARD_KEYS, DEVICE_KEYS, OUTPUT_COLUMNS, calculate_quote, quote_arrays
+
+# 미리 계산할 최대 테이블 수 (초과 시 즉석 계산)
+MAX_STORE_DEVICES = int(os.environ.get("HIORDER_QUOTE_TABLE_MAX", "500"))
+
+# 축 순서: 테이블 수, 알림판, 결제방식, 신한, 땡겨요, 인터넷(없음/기존KT/신규)
+BOARD_AXIS = ["inch15", "inch10"]
+DEVICE_AXIS = ["normal", "calc"]
+INTERNET_NONE, INTERNET_KT, INTERNET_NEW = 0, 1, 2
+
+
+def _internet_index(use_internet_new, use_internet_kt):
+    if use_internet_new:
+        return INTERNET_NEW
+    if use_internet_kt:
+        return INTERNET_KT
+    return INTERNET_NONE
+
+
+# 모든 입력 조합의 견적을 한 번에 계산해 둔 표
+class QuoteTable:
+    def __init__(self, config, version, max_store_devices=MAX_STORE_DEVICES):
+        started = time.perf_counter()
+
+        counts = np.arange(1, max_store_devices + 1)
+        grid = np.meshgrid(
+            counts,
+            np.array(BOARD_AXIS),
+            np.array(DEVICE_AXIS),
+            [False, True],
+            [False, True],
+            [INTERNET_NONE, INTERNET_KT, INTERNET_NEW],
+            indexing="ij",
+        )
+        count, board, device, shinhan, tanggua, internet = (axis.ravel() for axis in grid)
+        result = quote_arrays({
+            "store_device_count": count,
+            "board_type": board,
+            "device_type": device,
+            "use_shinhan": shinhan,
+            "use_tanggua": tanggua,
+            "use_internet_new": internet == INTERNET_NEW,
+            "use_internet_kt": internet != INTERNET_NONE,
+        }, config)
+
+        # 정수/실수 컬럼을 행 단위 행렬로 묶어 한 번의 인덱싱으로 한 행을 꺼낸다
+        self.int_columns = [name for name in OUTPUT_COLUMNS if result[name].dtype.kind == "i"]
+        self.float_columns = [name for name in OUTPUT_COLUMNS if result[name].dtype.kind != "i"]
+        self.int_rows = np.column_stack([result[name] for name in self.int_columns])
+        self.float_rows = np.column_stack([result[name] for name in self.float_columns])
+        self._names = self.int_columns + self.float_columns
+        self.shape = grid[0].shape
+        self._rows = {}
+        self.config = config
+        self.version = version
+        self.max_store_devices = max_store_devices
+        self.build_seconds = time.perf_counter() - started
+
+    @property
+    def nbytes(self):
+        return self.int_rows.nbytes + self.float_rows.nbytes
+
+    def covers(self, store_device_count):
+        return 1 <= store_device_count <= self.max_store_devices
+
+    def lookup(self, store_device_count, board_type, device_type, use_shinhan=False,
+               use_tanggua=False, use_internet_new=False, use_internet_kt=False):
+        row = store_device_count - 1
+        row = row * 2 + BOARD_AXIS.index(BOARD_KEYS[board_type])
+        row = row * 2 + DEVICE_AXIS.index(DEVICE_KEYS[device_type])
+        row = row * 2 + bool(use_shinhan)
+        row = row * 2 + bool(use_tanggua)
+        row = row * 3 + _internet_index(use_internet_new, use_internet_kt)
+        # 조회된 행만 파이썬 값으로 변환해 두고, 같은 행은 같은 dict 를 돌려준다 (호출하는 쪽은 바꾸지 않는다)
+        quote = self._rows.get(row)
+        if quote is None:
+            values = self.int_rows[row].tolist() + self.float_rows[row].tolist()
+            quote = self._rows[row] = dict(zip(self._names, values))
+        return quote
+
+
+_lock = threading.Lock()
+_table = None
+
+
+# 설정이 다시 로드/저장될 때마다 표를 새로 만든다
+def _rebuild(config, version):
+    global _table
+    table = QuoteTable(config, version)
+    with _lock:
+        if _table is None or _table.version < version:
+            _table = table
+
+
+def current_table():
+    get_store().get()
+    return _table
+
+
+def _covers(table, store_device_count, config, custom_commission):
+    return (custom_commission is None and table is not None and table.config is config
+            and table.covers(store_device_count))
+
+
+# 이 입력을 견적표에서 조회할 수 있는지 (지표 구분용)
+def in_table(store_device_count, config, custom_commission=None):
+    return _covers(_table, store_device_count, config, custom_commission)
+
+
+# calculate_quote 와 같은 인자 - 표 범위 안이면 조회, 아니면 즉석 계산
+# 조회 결과는 표가 들고 있는 dict 그대로이므로 바꾸지 않는다 (시간은 요청 단위로 호출하는 쪽에서 잰다)
+def get_quote(store_device_count, board_type, device_type, config, use_shinhan=False,
+              use_tanggua=False, use_internet_new=False, use_internet_kt=False, custom_commission=None):
+    table = _table
+    if _covers(table, store_device_count, config, custom_commission):
+        return table.lookup(store_device_count, board_type, device_type, use_shinhan,
+                            use_tanggua, use_internet_new, use_internet_kt)
+    return calculate_quote(store_device_count, board_type, device_type, config, use_shinhan,
+                           use_tanggua, use_internet_new, use_internet_kt, custom_commission)
+
+
+get_store().subscribe(_rebuild)
@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+
+from pricing import VAT_RATE
+
+# 판매 중인 약정 기간(개월)
+TERMS = (24, 36, 48, 60)
+DEFAULT_TERM = 36
+# 알림판/매장용 기기 할부 개월 수 (월 할부금은 이 기간 기준)
+# 약정이 더 짧으면 남은 할부금을 마지막 달에 정산하고, 더 길면 이후에는 서비스 이용료만 낸다
+INSTALLMENT_MONTHS = 36
+# 현재가치 계산용 연 할인율 기본값
+DISCOUNT_RATE = float(os.environ.get("HIORDER_DISCOUNT_RATE", "0.05"))
+
+# 월별 일정 컬럼
+COLUMNS = ["month", "service_fee", "board_installment", "device_installment", "installment_payoff", "vat",
+           "internet_discount", "total", "cumulative", "present_value", "cumulative_present_value"]
+COLUMN_LABELS = {
+    "month": "회차",
+    "service_fee": "서비스 이용료",
+    "board_installment": "알림판 할부금",
+    "device_installment": "매장용 기기 할부금",
+    "installment_payoff": "잔여 할부금 정산",
+    "vat": "부가세",
+    "internet_discount": "인터넷 결합 할인",
+    "total": "납부액",
+    "cumulative": "누적 납부액",
+    "present_value": "현재가치",
+    "cumulative_present_value": "누적 현재가치",
+}
+
+
+# 견적 결과(dict 또는 QuoteResult)에서 월 비용 항목
+def _component(quote, name):
+    return quote[name] if isinstance(quote, dict) else getattr(quote, name)
+
+
+# 약정 종료 때 정산하는 할부 개월 수
+def payoff_months(term):
+    return max(INSTALLMENT_MONTHS - term, 0)
+
+
+# 약정 기간이 할부 기간과 다를 때 붙이는 설명
+def term_note(term):
+    if term < INSTALLMENT_MONTHS:
+        return f"마지막 달에 잔여 할부금 {payoff_months(term)}개월분 정산"
+    if term > INSTALLMENT_MONTHS:
+        return f"{INSTALLMENT_MONTHS + 1}개월째부터 할부금 없음"
+    return ""
+
+
+# 월 할인 계수 (월말 납부, 연 복리)
+def discount_factor(month, annual_rate):
+    return (1 + annual_rate) ** (-month / 12)
+
+
+# 견적 하나의 월별 납부 일정 (한 달씩 만들어 돌려준다)
+# 월 비용 항목은 견적 계산 결과(서비스 이용료, 알림판/매장용 기기 할부금, 인터넷 결합 할인)를 그대로 쓴다
+def monthly_schedule(quote, term=DEFAULT_TERM, annual_rate=DISCOUNT_RATE):
+    service_fee = _component(quote, "monthly_service_fee")
+    board_monthly = _component(quote, "board_monthly")
+    device_monthly = _component(quote, "store_device_monthly")
+    internet_discount = _component(quote, "internet_discount")
+    payoff = (board_monthly + device_monthly) * payoff_months(term)
+
+    cumulative = 0
+    cumulative_present_value = 0
+    for month in range(1, term + 1):
+        installment = month <= INSTALLMENT_MONTHS
+        row = {
+            "month": month,
+            "service_fee": service_fee,
+            "board_installment": board_monthly if installment else 0,
+            "device_installment": device_monthly if installment else 0,
+            "installment_payoff": payoff if month == term else 0,
+            "internet_discount": internet_discount,
+        }
+        taxable = row["service_fee"] + row["board_installment"] + row["device_installment"] + row["installment_payoff"]
+        row["vat"] = taxable * (VAT_RATE - 1)
+        # 부가세 적용 후 할인 (월 총액과 같은 순서)
+        row["total"] = taxable * VAT_RATE - internet_discount
+        cumulative += row["total"]
+        row["cumulative"] = cumulative
+        row["present_value"] = row["total"] * discount_factor(month, annual_rate)
+        cumulative_present_value += row["present_value"]
+        row["cumulative_present_value"] = cumulative_present_value
+        yield row
+
+
+# 여러 견적 × 여러 약정 기간 납부 일정 (벡터화)
+# quotes: quote_arrays 결과처럼 월 비용 항목 배열을 가진 dict (스칼라도 가능)
+# 반환: cash_flow[견적, 약정, 회차] (약정 이후 회차는 0), 약정별 총액/현재가치/월 평균
+def schedule_arrays(quotes, terms=TERMS, annual_rate=DISCOUNT_RATE):
+    terms = np.asarray(terms, dtype=np.int64)
+    service_fee = np.atleast_1d(np.asarray(_component(quotes, "monthly_service_fee"), dtype=np.float64))
+    installment = np.atleast_1d(np.asarray(_component(quotes, "board_monthly"), dtype=np.float64)
+                                + np.asarray(_component(quotes, "store_device_monthly"), dtype=np.float64))
+    internet_discount = np.atleast_1d(np.asarray(_component(quotes, "internet_discount"), dtype=np.float64))
+
+    months = np.arange(1, terms.max() + 1)
+    active = (months[None, :] <= terms[:, None]).astype(np.float64)
+    # 회차별 할부금 개월 수 (할부 기간 안의 회차 + 마지막 달 정산분)
+    installment_count = active * (months <= INSTALLMENT_MONTHS)
+    installment_count += (months[None, :] == terms[:, None]) * np.maximum(INSTALLMENT_MONTHS - terms, 0)[:, None]
+
+    # 회차별 납부액 = (서비스 이용료 × 부가세 - 할인) × 약정 중 + 할부금 × 부가세 × 할부 개월 수
+    monthly_net = service_fee * VAT_RATE - internet_discount
+    installment_with_tax = installment * VAT_RATE
+    cash_flow = (monthly_net[:, None, None] * active + installment_with_tax[:, None, None] * installment_count)
+    # 총액/현재가치는 (견적 × 항목) @ (항목 × 약정) 으로 바로 계산
+    factors = discount_factor(months, annual_rate)
+    amounts = np.stack([monthly_net, installment_with_tax], axis=1)
+    total = amounts @ np.stack([active.sum(axis=1), installment_count.sum(axis=1)])
+    return {
+        "terms": terms,
+        "months": months,
+        "cash_flow": cash_flow,
+        "total": total,
+        "present_value": amounts @ np.stack([active @ factors, installment_count @ factors]),
+        "monthly_average": total / terms,
+    }
+
+
+# 약정 기간별 총 비용 (견적 하나)
+def contract_totals(quote, terms=TERMS):
+    return dict(zip((int(term) for term in terms), (float(total) for total in schedule_arrays(quote, terms)["total"][0])))
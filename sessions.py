@@ -0,0 +1,181 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from metrics import QUOTE_SECONDS, registry as metrics_registry
+from pricing import INPUT_COLUMNS, OUTPUT_COLUMNS
+from quote_cache import cache as quote_cache, cached
+from quote_table import get_quote, in_table
+
+# 이 시간(초) 동안 다시 실행되지 않은 세션의 계산 결과는 정리한다
+IDLE_SECONDS = int(os.environ.get("HIORDER_SESSION_IDLE_SECONDS", "1800"))
+# 유휴 세션 정리 주기(초)
+SWEEP_SECONDS = 60
+
+INPUT_FIELDS = tuple(name for name in INPUT_COLUMNS if name != "custom_commission")
+
+
+# 계산 결과 (입력값 + 결과값, 읽기 전용)
+# 입력값과 설정 버전이 같으면 모든 세션이 같은 객체를 공유한다
+class QuoteResult:
+    __slots__ = INPUT_FIELDS + tuple(OUTPUT_COLUMNS) + ("custom_commission", "version")
+
+    def __init__(self, inputs, quote, version, custom_commission=None):
+        for name in INPUT_FIELDS:
+            object.__setattr__(self, name, inputs[name])
+        for name in OUTPUT_COLUMNS:
+            object.__setattr__(self, name, quote[name])
+        object.__setattr__(self, "custom_commission", custom_commission)
+        object.__setattr__(self, "version", version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuoteResult 는 변경할 수 없습니다.")
+
+    def __delattr__(self, name):
+        raise AttributeError("QuoteResult 는 변경할 수 없습니다.")
+
+    @property
+    def inputs(self):
+        return {name: getattr(self, name) for name in INPUT_FIELDS}
+
+
+# (입력값, 수수료별도적용 금액, 설정 버전) 별 공유 결과 - 프로세스 전역 견적 캐시에 보관
+def quote_result(inputs, config, version, custom_commission=None):
+    if custom_commission is not None:
+        custom_commission = int(custom_commission)
+
+    # 견적 시간은 캐시에 없어 새로 만들 때 한 번만 기록한다
+    def build(normalized):
+        started = time.perf_counter()
+        result = QuoteResult(normalized, get_quote(config=config, custom_commission=custom_commission, **normalized),
+                             version, custom_commission)
+        source = "table" if in_table(normalized["store_device_count"], config, custom_commission) else "compute"
+        QUOTE_SECONDS.observe(time.perf_counter() - started, source=source)
+        return result
+
+    return cached("quote", inputs, version, build, custom_commission)
+
+
+# 객체가 참조하는 메모리 크기 (이미 센 객체는 다시 세지 않음)
+def deep_sizeof(obj, seen=None):
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) if obj.base is None else sys.getsizeof(obj) + obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for name in getattr(type(obj), "__slots__", ()):
+        if name != "__weakref__" and hasattr(obj, name):
+            size += deep_sizeof(getattr(obj, name), seen)
+    return size
+
+
+class _Entry:
+    __slots__ = ("last_seen", "result", "state_bytes")
+
+    def __init__(self):
+        self.last_seen = time.monotonic()
+        self.result = None
+        self.state_bytes = 0
+
+
+# 프로세스 전체 세션 목록 (세션별 계산 결과 + 마지막 실행 시각)
+class SessionRegistry:
+    def __init__(self, idle_seconds=IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._last_sweep = time.monotonic()
+
+    # 페이지가 다시 실행될 때마다 호출 - 세션 상태 크기를 기록하고 유휴 세션을 정리한다
+    # session_state 가 없으면 (조각만 다시 실행) 마지막으로 잰 크기를 그대로 둔다
+    def touch(self, session_id, session_state=None):
+        now = time.monotonic()
+        state_bytes = deep_sizeof(session_state) if session_state is not None else None
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                entry = self._entries[session_id] = _Entry()
+            entry.last_seen = now
+            if state_bytes is not None:
+                entry.state_bytes = state_bytes
+            if now - self._last_sweep >= SWEEP_SECONDS:
+                self._sweep(now)
+
+    def _sweep(self, now):
+        self._last_sweep = now
+        for session_id in [session_id for session_id, entry in self._entries.items()
+                           if now - entry.last_seen > self.idle_seconds]:
+            del self._entries[session_id]
+
+    # 최근 within 초 안에 실행된 세션 수
+    def active_count(self, within=300):
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for entry in self._entries.values() if now - entry.last_seen <= within)
+
+    def evict_idle(self):
+        with self._lock:
+            self._sweep(time.monotonic())
+
+    def store(self, session_id, result):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                entry = self._entries[session_id] = _Entry()
+            entry.result = result
+
+    def result(self, session_id):
+        entry = self._entries.get(session_id)
+        return entry.result if entry is not None else None
+
+    def clear(self, session_id):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                entry.result = None
+
+    # 세션별 메모리 현황 (세션 상태 크기는 마지막 실행 시점 기준)
+    def report(self):
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+        rows = [
+            {
+                "session_id": session_id,
+                "idle_seconds": now - entry.last_seen,
+                "state_bytes": entry.state_bytes,
+                "result_bytes": deep_sizeof(entry.result) if entry.result is not None else 0,
+            }
+            for session_id, entry in entries
+        ]
+        return sorted(rows, key=lambda row: row["idle_seconds"])
+
+    def summary(self):
+        rows = self.report()
+        return {
+            "sessions": len(rows),
+            "results": sum(1 for row in rows if row["result_bytes"]),
+            "cached_quotes": len(quote_cache),
+            "state_bytes": sum(row["state_bytes"] for row in rows),
+        }
+
+
+registry = SessionRegistry()
+
+metrics_registry.gauge("hiorder_active_sessions", "최근 5분 안에 실행된 세션 수", registry.active_count)
+metrics_registry.gauge("hiorder_sessions", "등록된 세션 수 (유휴 세션 정리 전)", lambda: len(registry._entries))
@@ -0,0 +1,83 @@
+import itertools
+
+import numpy as np
+
+from pricing import DEVICE_KEYS, VAT_RATE, quote_arrays
+
+BOARD_OPTIONS = ["15인치", "10인치"]
+DEVICE_OPTIONS = ["후불형", "선불형"]
+# (인터넷 신규, 기존 KT) - 신규 신청 시 KT 는 자동 포함
+INTERNET_OPTIONS = [(False, False), (False, True), (True, True)]
+
+
+# 옵션 조합 전체 (알림판 x 결제방식 x 신한 x 땡겨요 x 인터넷)
+def option_grid(store_device_count, board_types=None, device_types=None):
+    combos = list(itertools.product(
+        board_types or BOARD_OPTIONS,
+        device_types or DEVICE_OPTIONS,
+        [False, True],
+        [False, True],
+        INTERNET_OPTIONS,
+    ))
+    return {
+        "store_device_count": np.full(len(combos), store_device_count),
+        "board_type": np.array([combo[0] for combo in combos]),
+        "device_type": np.array([combo[1] for combo in combos]),
+        "use_shinhan": np.array([combo[2] for combo in combos]),
+        "use_tanggua": np.array([combo[3] for combo in combos]),
+        "use_internet_new": np.array([combo[4][0] for combo in combos]),
+        "use_internet_kt": np.array([combo[4][1] for combo in combos]),
+    }
+
+
+# 목표 기기당 월 금액을 맞추기 위해 필요한 최소 일시불 처리 대수
+# 기기당 월 = ((서비스료 + 알림판 + (n - k) × 기기 할부금) × 1.1 - 인터넷 할인) ÷ 총 기기 수 ≤ 목표
+# → k ≥ n - ⌊예산 ÷ 기기 할부금⌋ (예산 = (목표 × 총 기기 수 + 할인) ÷ 1.1 - 서비스료 - 알림판)
+# 모든 기기를 일시불 처리해도 목표를 넘으면 n + 1 (불가능)
+def required_lump_sum_devices(quotes, target, tax_included=False):
+    target_with_tax = target if tax_included else target * VAT_RATE
+    store_device_count = quotes["total_devices"] - 1
+    budget = (target_with_tax * quotes["total_devices"] + quotes["internet_discount"]) / VAT_RATE
+    budget = budget - quotes["monthly_service_fee"] - quotes["board_monthly"]
+    affordable = np.floor(budget / quotes["device_monthly"] + 1e-9).astype(np.int64)
+    required = np.maximum(store_device_count - affordable, 0)
+    return np.where(budget < 0, store_device_count + 1, required)
+
+
+# 목표 금액 역산 - 옵션 조합별 견적과 필요한 최소 수수료
+def solve(store_device_count, target, config, tax_included=False, board_types=None, device_types=None):
+    inputs = option_grid(store_device_count, board_types, device_types)
+    quotes = quote_arrays(inputs, config)
+
+    required_devices = required_lump_sum_devices(quotes, target, tax_included)
+    possible = required_devices <= store_device_count
+    lump_sum_price = np.where(
+        np.array([DEVICE_KEYS[device_type] == "calc" for device_type in inputs["device_type"]]),
+        config['prices']['store_device']['calc']['lump_sum'],
+        config['prices']['store_device']['normal']['lump_sum'],
+    )
+    # 일시불 대수는 ⌊수수료 ÷ 일시불가격⌋ 이므로 필요한 최소 수수료는 k × 일시불가격
+    required_commission = np.where(possible, required_devices * lump_sum_price, -1)
+    shortfall = np.where(possible, np.maximum(required_commission - quotes["commission"], 0), -1)
+
+    price = quotes["per_device_monthly"] if tax_included else quotes["per_device_tax_excluded"]
+    return {
+        **inputs,
+        **quotes,
+        "price": price,
+        "required_lump_sum_devices": required_devices,
+        "required_commission": required_commission,
+        "commission_shortfall": shortfall,
+        "meets_target": possible & (quotes["actual_devices"] >= required_devices),
+    }
+
+
+# 목표 금액을 만족하는 가장 저렴한 옵션 조합 (기기당 월 금액, 필요한 옵션 수 순)
+def cheapest_configurations(store_device_count, target, config, limit=5, tax_included=False,
+                            board_types=None, device_types=None):
+    result = solve(store_device_count, target, config, tax_included, board_types, device_types)
+    option_count = (result["use_shinhan"].astype(int) + result["use_tanggua"].astype(int)
+                    + result["use_internet_kt"].astype(int) + result["use_internet_new"].astype(int))
+    order = np.lexsort((option_count, result["price"]))
+    order = order[result["meets_target"][order]][:limit]
+    return [{name: values[i].item() for name, values in result.items()} for i in order]
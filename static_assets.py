@@ -0,0 +1,113 @@
+import glob
+import hashlib
+import os
+import re
+import sys
+import threading
+import urllib.request
+
+# Streamlit 정적 파일 폴더 (.streamlit/config.toml 의 enableStaticServing 으로 /app/static/ 에서 서비스)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+STYLESHEET = "hiorder.css"
+
+FONT_VERSION = "v1.3.9"
+FONT_URL = "https://cdn.jsdelivr.net/gh/orioncactus/pretendard@{version}/dist/web/static/woff2-subset/{name}"
+FONT_FILES = ["Pretendard-Regular.subset.woff2", "Pretendard-SemiBold.subset.woff2", "Pretendard-Bold.subset.woff2"]
+
+_lock = threading.Lock()
+_html = None
+
+
+def _content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+# static/hiorder.css → static/hiorder.<내용 해시>.css
+# 내용이 바뀌면 이름이 바뀌므로 브라우저는 예전 파일을 계속 캐시해도 된다
+def build_stylesheet(static_dir=STATIC_DIR):
+    with open(os.path.join(static_dir, STYLESHEET), "rb") as f:
+        data = f.read()
+    stem, extension = os.path.splitext(STYLESHEET)
+    name = f"{stem}.{_content_hash(data)}{extension}"
+    path = os.path.join(static_dir, name)
+    if not os.path.exists(path):
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+    # 이전 해시 파일 정리
+    for old in glob.glob(os.path.join(static_dir, f"{stem}.*{extension}")):
+        if os.path.basename(old) not in (name, STYLESHEET):
+            os.remove(old)
+    return name, data.decode("utf-8")
+
+
+# 이 Streamlit 버전이 /app/static/ 의 .css 를 text/css 로 보내는지
+# (1.42 의 tornado 핸들러는 이미지/PDF 외에는 text/plain + nosniff 로 보내 브라우저가 스타일시트를 거부한다)
+def _serves_css():
+    try:
+        from streamlit.web.server.app_static_file_handler import SAFE_APP_STATIC_FILE_EXTENSIONS
+    except ImportError:
+        # starlette 서버는 확장자로 Content-Type 을 정한다
+        return True
+    return ".css" in SAFE_APP_STATIC_FILE_EXTENSIONS
+
+
+# 주석/공백 제거 (본문에 넣을 때)
+def _minify(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,])\s*", r"\1", css).strip()
+
+
+# 페이지에 넣을 태그 (프로세스당 한 번 만든다)
+# - CSS 를 정적 파일로 보낼 수 있으면 <link> 한 줄만 재실행마다 보낸다
+# - 아니면 줄인 CSS 를 본문에 넣고, 폰트만 정적 파일로 받는다
+def stylesheet_html():
+    global _html
+    if _html is None:
+        with _lock:
+            if _html is None:
+                name, css = build_stylesheet()
+                if _serves_css():
+                    _html = f'<link rel="stylesheet" href="{STATIC_URL}/{name}">'
+                else:
+                    # 본문에 넣으면 상대 경로가 페이지 기준이 되므로 정적 파일 경로로 바꾼다
+                    css = css.replace("url('fonts/", f"url('{STATIC_URL}/fonts/")
+                    _html = f"<style>{_minify(css)}</style>"
+    return _html
+
+
+# 폰트 파일 받기 (도커 이미지 빌드 때 실행 - 실행 중에는 외부 CDN 에 접속하지 않는다)
+def fetch_fonts(static_dir=STATIC_DIR, version=FONT_VERSION):
+    font_dir = os.path.join(static_dir, "fonts")
+    os.makedirs(font_dir, exist_ok=True)
+    for name in FONT_FILES:
+        path = os.path.join(font_dir, name)
+        if os.path.exists(path):
+            continue
+        with urllib.request.urlopen(FONT_URL.format(version=version, name=name), timeout=60) as response:
+            data = response.read()
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        print(f"{name}: {len(data) / 1024:,.0f}KB")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="정적 파일(스타일시트, 폰트)을 준비합니다.")
+    parser.add_argument("command", choices=["build", "fonts"])
+    args = parser.parse_args(argv)
+
+    if args.command == "fonts":
+        fetch_fonts()
+    else:
+        name, _ = build_stylesheet()
+        print(name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import bisect
+import functools
+from types import MappingProxyType
+
+import numpy as np
+
+
+# 구간별 추가 수수료 색인
+# bounds[i] 대 이상 ~ bounds[i + 1] 대 미만 구간에 amounts[i] 적용 (첫 구간 미만은 0원)
+class TierIndex:
+    def __init__(self, bounds, amounts):
+        self.bounds = tuple(bounds)
+        self.amounts = tuple(amounts)
+        self.labels = tuple(
+            f"{low}-{high - 1}대" if high is not None else f"{low}대 이상"
+            for low, high in zip(self.bounds, self.bounds[1:] + (None,))
+        )
+        self._bounds_array = np.array(self.bounds, dtype=np.int64)
+        self._amounts_array = np.array((0,) + self.amounts, dtype=np.int64)
+        # 단건 계산용 대수별 금액 (마지막 구간 시작 대수까지, 그 이상은 마지막 구간 금액)
+        self._by_count = tuple(self._amount(count) for count in range(self.bounds[-1] + 1)) if self.bounds else (0,)
+        self._top = self.amounts[-1] if self.amounts else 0
+
+    def position(self, total_devices):
+        return bisect.bisect_right(self.bounds, total_devices) - 1
+
+    def _amount(self, total_devices):
+        position = self.position(total_devices)
+        return self.amounts[position] if position >= 0 else 0
+
+    def amount(self, total_devices):
+        if total_devices >= len(self._by_count):
+            return self._top
+        return self._by_count[total_devices] if total_devices >= 0 else 0
+
+    def label(self, total_devices):
+        position = self.position(total_devices)
+        return self.labels[position] if position >= 0 else None
+
+    def amounts_for(self, total_devices):
+        return self._amounts_array[np.searchsorted(self._bounds_array, total_devices, side="right")]
+
+
+# 예전 형식 {"5-9": ..., "30+": ...} → [{"min_devices": 5, "amount": ...}, ...]
+def tiers_from_range(ranges):
+    tiers = []
+    for key, amount in ranges.items():
+        low = key.rstrip("+").split("-")[0]
+        tiers.append({"min_devices": int(low), "amount": amount})
+    return sorted(tiers, key=lambda tier: tier["min_devices"])
+
+
+def config_tiers(commission):
+    if "tiers" in commission:
+        return commission["tiers"]
+    return tiers_from_range(commission["range"])
+
+
+def validate_tiers(tiers):
+    bounds = [tier["min_devices"] for tier in tiers]
+    if any(bound < 1 for bound in bounds):
+        raise ValueError("구간 시작 대수는 1 이상이어야 합니다.")
+    if any(low >= high for low, high in zip(bounds, bounds[1:])):
+        raise ValueError("구간 시작 대수는 오름차순이어야 하며 중복될 수 없습니다.")
+
+
+@functools.lru_cache(maxsize=32)
+def _compile(key):
+    return TierIndex([bound for bound, _ in key], [amount for _, amount in key])
+
+
+def compile_tiers(commission):
+    tiers = config_tiers(commission)
+    validate_tiers(tiers)
+    return _compile(tuple((tier["min_devices"], tier["amount"]) for tier in tiers))
+
+
+# 공유 스냅샷(읽기 전용) 별 구간 색인 - id(commission) → (commission, 색인)
+# 정책이 여러 개여도 스냅샷마다 한 번만 만든다
+_compiled = {}
+MAX_COMPILED = 64
+# 마지막으로 찾은 (스냅샷, 색인) - 대부분 같은 스냅샷을 연달아 조회한다
+_last = (None, None)
+
+
+def tier_index(config):
+    global _last
+    commission = config['commission']
+    last = _last
+    if last[0] is commission:
+        return last[1]
+    cached = _compiled.get(id(commission))
+    if cached is not None and cached[0] is commission:
+        _last = cached
+        return cached[1]
+    index = compile_tiers(commission)
+    if isinstance(commission, MappingProxyType):
+        if len(_compiled) >= MAX_COMPILED:
+            _compiled.clear()
+        _compiled[id(commission)] = _last = (commission, index)
+    return index